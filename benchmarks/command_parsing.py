@@ -0,0 +1,62 @@
+"""Measures the per-invocation overhead of parsing command arguments.
+
+Run with ``python -m benchmarks.command_parsing`` from the repository root.
+"""
+
+import asyncio
+import time
+import types
+import typing
+
+from discord.ext import commands
+from discord.ext.commands.view import StringView
+
+async def no_args(ctx):
+    pass
+
+async def positional(ctx, name: str, count: int, ratio: float):
+    pass
+
+async def defaults(ctx, name, count=1, *, reason='none given'):
+    pass
+
+async def var_positional(ctx, *numbers: int):
+    pass
+
+async def optional(ctx, count: typing.Optional[int] = 5, *, rest: str):
+    pass
+
+async def greedy(ctx, numbers: commands.Greedy[int], *, rest):
+    pass
+
+CASES = [
+    (no_args, ''),
+    (positional, 'hello 10 0.5'),
+    (defaults, 'hello 10 the rest of the message'),
+    (var_positional, '1 2 3 4 5 6 7 8'),
+    (optional, 'the rest of the message'),
+    (greedy, '1 2 3 4 the rest'),
+]
+
+def make_context(content):
+    message = types.SimpleNamespace(content=content, _state=None)
+    return commands.Context(prefix='!', view=StringView(content), bot=None, message=message)
+
+async def bench(command, content, iterations):
+    contexts = [make_context(content) for _ in range(iterations)]
+    parse = command._parse_arguments
+    start = time.perf_counter()
+    for ctx in contexts:
+        await parse(ctx)
+    return (time.perf_counter() - start) / iterations
+
+async def main(iterations=20000):
+    for func, content in CASES:
+        command = commands.Command(func)
+        # warm up
+        await bench(command, content, 100)
+        elapsed = await bench(command, content, iterations)
+        print('{:<16} {:>8.2f} us/invocation'.format(func.__name__, elapsed * 1e6))
+
+if __name__ == '__main__':
+    asyncio.run(main())
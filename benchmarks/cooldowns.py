@@ -0,0 +1,46 @@
+"""Measures the cost of looking up cooldown buckets with many active keys.
+
+Run with ``python -m benchmarks.cooldowns`` from the repository root.
+"""
+
+import time
+import types
+
+from discord.ext import commands
+
+BUCKETS = 1000000
+LOOKUPS = 10000
+
+def message(user_id):
+    return types.SimpleNamespace(author=types.SimpleNamespace(id=user_id))
+
+def main():
+    mapping = commands.CooldownMapping.from_cooldown(1, 60.0, commands.BucketType.user)
+    messages = [message(i) for i in range(BUCKETS)]
+    now = time.time()
+
+    start = time.perf_counter()
+    for i, msg in enumerate(messages):
+        mapping.update_rate_limit(msg, now + i * 1e-6)
+    elapsed = time.perf_counter() - start
+    print('filling {} buckets: {:.2f} us/message'.format(BUCKETS, elapsed / BUCKETS * 1e6))
+
+    # every bucket is still alive
+    current = now + 1.0
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        mapping.update_rate_limit(messages[i * 97 % BUCKETS], current)
+    elapsed = time.perf_counter() - start
+    print('lookups with {} live buckets: {:.2f} us/message'.format(len(mapping._cache), elapsed / LOOKUPS * 1e6))
+
+    # half of the buckets have expired
+    current = now + 60.0 + BUCKETS / 2 * 1e-6
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        mapping.update_rate_limit(message(BUCKETS + i), current)
+    elapsed = time.perf_counter() - start
+    print('lookups while expiring buckets: {:.2f} us/message ({} buckets left)'.format(elapsed / LOOKUPS * 1e6,
+                                                                                         len(mapping._cache)))
+
+if __name__ == '__main__':
+    main()
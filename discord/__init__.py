@@ -58,6 +58,8 @@ from .voice_client import VoiceClient
 from .audit_logs import AuditLogChanges, AuditLogEntry, AuditLogDiff
 from .raw_models import *
 from .team import *
+from .ratelimits import *
+from .metrics import *
 
 VersionInfo = namedtuple('VersionInfo', 'major minor micro releaselevel serial')
 
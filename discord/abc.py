@@ -28,7 +28,7 @@ import abc
 import copy
 import asyncio
 
-from .iterators import HistoryIterator
+from .iterators import HistoryIterator, HistoryExport
 from .context_managers import Typing
 from .enums import ChannelType
 from .errors import InvalidArgument, ClientException, HTTPException
@@ -179,6 +179,116 @@ class _Overwrites:
             'type': self.type,
         }
 
+def _fold_permissions(is_owner, everyone, role_values, everyone_overwrite, role_overwrites, member_overwrite):
+    # The current cases can be explained as:
+    # Guild owner get all permissions -- no questions asked. Otherwise...
+    # The @everyone role gets the first application.
+    # After that, the applied roles that the user has in the channel
+    # (or otherwise) are then OR'd together.
+    # After the role permissions are resolved, the member permissions
+    # have to take into effect.
+    # After all that is done.. you have to do the following:
+
+    # If manage permissions is True, then all permissions are set to True.
+
+    # The operation first takes into consideration the denied
+    # and then the allowed.
+
+    # The role values and overwrites are iterables of the ones that apply to
+    # the member so callers can decide how to look them up. Overwrites are
+    # (allow, deny) pairs.
+
+    if is_owner:
+        return Permissions.all()
+
+    base = Permissions(everyone)
+
+    # Apply guild roles that the member has.
+    for value in role_values:
+        base.value |= value
+
+    # Guild-wide Administrator -> True for everything
+    # Bypass all channel-specific overrides
+    if base.administrator:
+        return Permissions.all()
+
+    # Apply @everyone allow/deny first since it's special
+    if everyone_overwrite is not None:
+        base.handle_overwrite(*everyone_overwrite)
+
+    denies = 0
+    allows = 0
+
+    # Apply channel specific role permission overwrites
+    for allow, deny in role_overwrites:
+        denies |= deny
+        allows |= allow
+
+    base.handle_overwrite(allow=allows, deny=denies)
+
+    # Apply member specific permission overwrites
+    if member_overwrite is not None:
+        base.handle_overwrite(*member_overwrite)
+
+    # if you can't send a message in a channel then you can't have certain
+    # permissions as well
+    if not base.send_messages:
+        base.send_tts_messages = False
+        base.mention_everyone = False
+        base.embed_links = False
+        base.attach_files = False
+
+    # if you can't read a channel then you have no permissions there
+    if not base.read_messages:
+        denied = Permissions.all_channel()
+        base.value &= ~denied.value
+
+    return base
+
+class _PermissionResolver:
+    """Resolves channel permissions with the role values and overwrites
+    prepared once so that it can be reused for many members."""
+
+    __slots__ = ('channel', 'owner_id', 'everyone', 'role_values', 'everyone_overwrite',
+                 'role_overwrites', 'member_overwrites')
+
+    def __init__(self, channel):
+        guild = channel.guild
+        self.channel = channel
+        self.owner_id = guild.owner_id
+        self.everyone = guild.default_role.permissions.value
+        # role_id -> permission value
+        self.role_values = {role_id: role._permissions for role_id, role in guild._roles.items()}
+
+        overwrites = channel._overwrites
+        self.everyone_overwrite = None
+        # target_id -> (allow, deny)
+        self.role_overwrites = role_overwrites = {}
+        self.member_overwrites = member_overwrites = {}
+
+        if overwrites and overwrites[0].id == guild.id:
+            everyone = overwrites[0]
+            self.everyone_overwrite = (everyone.allow, everyone.deny)
+            overwrites = overwrites[1:]
+
+        for overwrite in overwrites:
+            if overwrite.type == 'role':
+                role_overwrites[overwrite.id] = (overwrite.allow, overwrite.deny)
+            elif overwrite.type == 'member':
+                # only the first member overwrite is applied
+                member_overwrites.setdefault(overwrite.id, (overwrite.allow, overwrite.deny))
+
+    def resolve(self, member):
+        roles = member._roles
+        get_value = self.role_values.get
+        get_overwrite = self.role_overwrites.get
+        base = _fold_permissions(self.owner_id == member.id, self.everyone,
+                                 (get_value(role_id, 0) for role_id in roles),
+                                 self.everyone_overwrite,
+                                 (pair for pair in map(get_overwrite, roles) if pair is not None),
+                                 self.member_overwrites.get(member.id))
+        return self.channel._finalize_permissions(base)
+
 class GuildChannel:
     """An ABC that details the common operations on a Discord guild channel.
 
@@ -463,81 +573,116 @@ class GuildChannel:
             The resolved permissions for the member.
         """
 
-        # The current cases can be explained as:
-        # Guild owner get all permissions -- no questions asked. Otherwise...
-        # The @everyone role gets the first application.
-        # After that, the applied roles that the user has in the channel
-        # (or otherwise) are then OR'd together.
-        # After the role permissions are resolved, the member permissions
-        # have to take into effect.
-        # After all that is done.. you have to do the following:
+        cache = self.guild._permission_cache
+        if cache is None:
+            return self._resolve_permissions(member)
 
-        # If manage permissions is True, then all permissions are set to True.
+        value = cache.get(self.id, member)
+        if value is None:
+            value = self._resolve_permissions(member).value
+            cache.set(self.id, member, value)
+        return Permissions(value)
 
-        # The operation first takes into consideration the denied
-        # and then the allowed.
+    def _resolve_permissions(self, member):
+        # unlike _PermissionResolver, nothing is prepared up front since
+        # that only pays off for many members
+        guild = self.guild
+        roles = member._roles
+        get_role = guild.get_role
 
-        if self.guild.owner_id == member.id:
-            return Permissions.all()
+        overwrites = self._overwrites
+        everyone_overwrite = None
+        if overwrites and overwrites[0].id == guild.id:
+            everyone_overwrite = (overwrites[0].allow, overwrites[0].deny)
+            overwrites = overwrites[1:]
 
-        default = self.guild.default_role
-        base = Permissions(default.permissions.value)
-        roles = member._roles
-        get_role = self.guild.get_role
+        member_overwrite = None
+        for overwrite in overwrites:
+            if overwrite.type == 'member' and overwrite.id == member.id:
+                member_overwrite = (overwrite.allow, overwrite.deny)
+                break
 
-        # Apply guild roles that the member has.
-        for role_id in roles:
-            role = get_role(role_id)
-            if role is not None:
-                base.value |= role._permissions
+        base = _fold_permissions(guild.owner_id == member.id, guild.default_role.permissions.value,
+                                 (role._permissions for role in map(get_role, roles) if role is not None),
+                                 everyone_overwrite,
+                                 ((o.allow, o.deny) for o in overwrites if o.type == 'role' and roles.has(o.id)),
+                                 member_overwrite)
+        return self._finalize_permissions(base)
 
-        # Guild-wide Administrator -> True for everything
-        # Bypass all channel-specific overrides
-        if base.administrator:
-            return Permissions.all()
+    def _finalize_permissions(self, base):
+        # channel types that imply denials override this
+        return base
 
-        # Apply @everyone allow/deny first since it's special
-        try:
-            maybe_everyone = self._overwrites[0]
-            if maybe_everyone.id == self.guild.id:
-                base.handle_overwrite(allow=maybe_everyone.allow, deny=maybe_everyone.deny)
-                remaining_overwrites = self._overwrites[1:]
-            else:
-                remaining_overwrites = self._overwrites
-        except IndexError:
-            remaining_overwrites = self._overwrites
+    def bulk_permissions_for(self, members=None):
+        """Handles permission resolution for many :class:`~discord.Member` at once.
 
-        denies = 0
-        allows = 0
+        This returns the same results as calling :meth:`permissions_for` for
+        every member, except that the role and overwrite lookups are only
+        prepared once for the channel.
 
-        # Apply channel specific role permission overwrites
-        for overwrite in remaining_overwrites:
-            if overwrite.type == 'role' and roles.has(overwrite.id):
-                denies |= overwrite.deny
-                allows |= overwrite.allow
+        .. versionadded:: 1.5
 
-        base.handle_overwrite(allow=allows, deny=denies)
+        Parameters
+        ----------
+        members: Optional[Iterable[:class:`~discord.Member`]]
+            The members to resolve permissions for. Defaults to every
+            member of the guild.
 
-        # Apply member specific permission overwrites
-        for overwrite in remaining_overwrites:
-            if overwrite.type == 'member' and overwrite.id == member.id:
-                base.handle_overwrite(allow=overwrite.allow, deny=overwrite.deny)
-                break
+        Returns
+        -------
+        Dict[:class:`~discord.Member`, :class:`~discord.Permissions`]
+            A mapping of each member to their resolved permissions.
+        """
+        if members is None:
+            members = self.guild.members
+
+        resolver = _PermissionResolver(self)
+        cache = self.guild._permission_cache
+        if cache is None:
+            return {member: resolver.resolve(member) for member in members}
+
+        result = {}
+        channel_id = self.id
+        for member in members:
+            value = cache.get(channel_id, member)
+            if value is None:
+                value = resolver.resolve(member).value
+                cache.set(channel_id, member, value)
+            result[member] = Permissions(value)
+        return result
 
-        # if you can't send a message in a channel then you can't have certain
-        # permissions as well
-        if not base.send_messages:
-            base.send_tts_messages = False
-            base.mention_everyone = False
-            base.embed_links = False
-            base.attach_files = False
+    def members_with_permissions(self, members=None, **perms):
+        r"""Returns the members that have all of the given permissions in this channel.
 
-        # if you can't read a channel then you have no permissions there
-        if not base.read_messages:
-            denied = Permissions.all_channel()
-            base.value &= ~denied.value
+        The permissions are resolved with :meth:`bulk_permissions_for`.
 
-        return base
+        .. versionadded:: 1.5
+
+        Parameters
+        ----------
+        members: Optional[Iterable[:class:`~discord.Member`]]
+            The members to filter. Defaults to every member of the guild.
+        \*\*perms
+            A mapping of permission names to the value they must have, e.g.
+            ``read_messages=True``.
+
+        Raises
+        -------
+        TypeError
+            An invalid permission name was passed.
+
+        Returns
+        -------
+        List[:class:`~discord.Member`]
+            The members whose resolved permissions match.
+        """
+        invalid = set(perms) - set(Permissions.VALID_FLAGS)
+        if invalid:
+            raise TypeError('Invalid permission(s): %s' % (', '.join(invalid)))
+
+        items = perms.items()
+        return [member for member, permissions in self.bulk_permissions_for(members).items()
+                if all(getattr(permissions, perm) == value for perm, value in items)]
 
     async def delete(self, *, reason=None):
         """|coro|
@@ -670,7 +815,7 @@ class GuildChannel:
         obj = cls(state=self._state, guild=self.guild, data=data)
 
         # temporarily add it to the cache
-        self.guild._channels[obj.id] = obj
+        self.guild._add_channel(obj)
         return obj
 
     async def clone(self, *, name=None, reason=None):
@@ -983,7 +1128,7 @@ class Messageable(metaclass=abc.ABCMeta):
         data = await state.http.pins_from(channel.id)
         return [state.create_message(channel=channel, data=m) for m in data]
 
-    def history(self, *, limit=100, before=None, after=None, around=None, oldest_first=None):
+    def history(self, *, limit=100, before=None, after=None, around=None, oldest_first=None, prefetch=0, raw=False):
         """Returns an :class:`~discord.AsyncIterator` that enables receiving the destination's message history.
 
         You must have :attr:`~Permissions.read_message_history` permissions to use this.
@@ -1025,6 +1170,18 @@ class Messageable(metaclass=abc.ABCMeta):
         oldest_first: Optional[:class:`bool`]
             If set to ``True``, return messages in oldest->newest order. Defaults to ``True`` if
             ``after`` is specified, otherwise ``False``.
+        prefetch: :class:`int`
+            The number of pages of 100 messages to request in the background while the
+            current page is being consumed. Defaults to ``0``, which requests each page
+            only once it is needed.
+
+            .. versionadded:: 1.5
+        raw: :class:`bool`
+            If set to ``True``, yield the raw message payloads as :class:`dict` instead of
+            constructing :class:`~discord.Message` objects. This is useful when archiving
+            large amounts of messages. Defaults to ``False``.
+
+            .. versionadded:: 1.5
 
         Raises
         ------
@@ -1035,10 +1192,80 @@ class Messageable(metaclass=abc.ABCMeta):
 
         Yields
         -------
-        :class:`~discord.Message`
-            The message with the message data parsed.
+        Union[:class:`~discord.Message`, :class:`dict`]
+            The message with the message data parsed, or the raw payload if ``raw`` is ``True``.
+        """
+        return HistoryIterator(self, limit=limit, before=before, after=after, around=around,
+                               oldest_first=oldest_first, prefetch=prefetch, raw=raw)
+
+    async def export_history(self, sink, *, after=None, before=None, partitions=16, concurrency=4, checkpoint=None):
+        """|coro|
+
+        Exports the destination's message history to a sink.
+
+        Unlike :meth:`history`, which has to request the pages one after another,
+        this splits the range of messages into snowflake intervals of equal duration
+        and fetches several of them concurrently. The messages are still written in
+        oldest->newest order. The requests share the rate limits of the other requests
+        made by the client.
+
+        You must have :attr:`~Permissions.read_message_history` permissions to use this.
+
+        .. versionadded:: 1.5
+
+        Examples
+        ---------
+
+        Exporting to a JSON lines file that can be resumed: ::
+
+            count = await channel.export_history('messages.jsonl', checkpoint='messages.checkpoint')
+
+        Processing the payloads as they arrive: ::
+
+            async def archive(payload):
+                await database.insert(payload)
+
+            await channel.export_history(archive, after=datetime.datetime(2020, 1, 1))
+
+        Parameters
+        -----------
+        sink: Union[Callable[[:class:`dict`], Any], :term:`py:file object`, :class:`str`]
+            Where to write the raw message payloads to. A callable or coroutine function
+            is called with every payload. A file object or a path, which is opened in
+            append mode, receives the payloads as JSON lines.
+        after: Optional[Union[:class:`~discord.abc.Snowflake`, :class:`datetime.datetime`]]
+            Export messages after this date or message. Defaults to the creation of the channel.
+            If a date is provided it must be a timezone-naive datetime representing UTC time.
+        before: Optional[Union[:class:`~discord.abc.Snowflake`, :class:`datetime.datetime`]]
+            Export messages before this date or message. Defaults to the current time.
+            If a date is provided it must be a timezone-naive datetime representing UTC time.
+        partitions: :class:`int`
+            The number of intervals to split the range into. More intervals keep the
+            concurrency up when the messages are unevenly spread over time.
+        concurrency: :class:`int`
+            The number of intervals fetched at the same time.
+        checkpoint: Optional[:class:`str`]
+            A path the ID of the last exported message is written to. If the file
+            already exists the export resumes after that message. Messages written
+            to the sink after the last checkpoint may be exported again on resume.
+
+        Raises
+        ------
+        ~discord.Forbidden
+            You do not have permissions to get channel message history.
+        ~discord.HTTPException
+            The request to get message history failed.
+        ValueError
+            ``partitions`` or ``concurrency`` is less than 1.
+
+        Returns
+        --------
+        :class:`int`
+            The number of messages exported.
         """
-        return HistoryIterator(self, limit=limit, before=before, after=after, around=around, oldest_first=oldest_first)
+        export = HistoryExport(self, sink, after=after, before=before, partitions=partitions,
+                               concurrency=concurrency, checkpoint=checkpoint)
+        return await export.run()
 
 
 class Connectable(metaclass=abc.ABCMeta):
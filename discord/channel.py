@@ -142,20 +142,16 @@ class TextChannel(discord.abc.Messageable, discord.abc.GuildChannel, Hashable):
     def _sorting_bucket(self):
         return ChannelType.text.value
 
-    def permissions_for(self, member):
-        base = super().permissions_for(member)
-
+    def _finalize_permissions(self, base):
         # text channels do not have voice related permissions
         denied = Permissions.voice()
         base.value &= ~denied.value
         return base
 
-    permissions_for.__doc__ = discord.abc.GuildChannel.permissions_for.__doc__
-
     @property
     def members(self):
         """List[:class:`Member`]: Returns all members that can see this channel."""
-        return [m for m in self.guild.members if self.permissions_for(m).read_messages]
+        return self.members_with_permissions(read_messages=True)
 
     def is_nsfw(self):
         """Checks if the channel is NSFW."""
@@ -627,9 +623,7 @@ class VoiceChannel(discord.abc.Connectable, discord.abc.GuildChannel, Hashable):
         """
         return {key: value for key, value in self.guild._voice_states.items() if value.channel.id == self.id}
 
-    def permissions_for(self, member):
-        base = super().permissions_for(member)
-
+    def _finalize_permissions(self, base):
         # voice channels cannot be edited by people who can't connect to them
         # It also implicitly denies all other voice perms
         if not base.connect:
@@ -638,8 +632,6 @@ class VoiceChannel(discord.abc.Connectable, discord.abc.GuildChannel, Hashable):
             base.value &= ~denied.value
         return base
 
-    permissions_for.__doc__ = discord.abc.GuildChannel.permissions_for.__doc__
-
     async def clone(self, *, name=None, reason=None):
         return await self._clone_impl({
             'bitrate': self.bitrate,
@@ -922,16 +914,12 @@ class StoreChannel(discord.abc.GuildChannel, Hashable):
         """:class:`ChannelType`: The channel's Discord type."""
         return ChannelType.store
 
-    def permissions_for(self, member):
-        base = super().permissions_for(member)
-
+    def _finalize_permissions(self, base):
         # store channels do not have voice related permissions
         denied = Permissions.voice()
         base.value &= ~denied.value
         return base
 
-    permissions_for.__doc__ = discord.abc.GuildChannel.permissions_for.__doc__
-
     def is_nsfw(self):
         """Checks if the channel is NSFW."""
         return self.nsfw
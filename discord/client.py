@@ -127,12 +127,81 @@ class Client:
 
         .. versionchanged:: 1.3
             Allow disabling the message cache and change the default size to ``1000``.
+    compact_member_threshold: Optional[:class:`int`]
+        The member count at which a guild stores its members in a compact form
+        instead of keeping a :class:`.Member` instance for every member. Members of
+        such guilds are created on access, which greatly reduces memory usage for
+        very large guilds at the cost of slower iteration over :attr:`.Guild.members`.
+        Defaults to ``None``, which disables the compact form.
+
+        .. versionadded:: 1.5
+    permission_cache_size: Optional[:class:`int`]
+        The maximum number of resolved channel permissions to memoize per guild for
+        :meth:`.abc.GuildChannel.permissions_for`. The cache is invalidated whenever roles,
+        member roles, channel overwrites or the guild owner change. Statistics are available
+        through :attr:`.Guild.permission_cache_info`. Defaults to ``None``, which disables
+        the cache.
+
+        .. versionadded:: 1.5
+    response_cache_size: Optional[:class:`int`]
+        The maximum number of REST responses to cache for methods such as :meth:`fetch_user`,
+        :meth:`fetch_channel`, :meth:`fetch_guild`, :meth:`.Guild.fetch_member`, :meth:`fetch_invite`
+        and :meth:`application_info`. Concurrent identical requests share a single request and
+        cached responses are dropped when a matching gateway update or delete event is received.
+        Statistics are available through :attr:`.response_cache_info`. Defaults to ``None``, which
+        disables the cache.
+
+        .. versionadded:: 1.5
+    response_cache_ttls: Optional[Mapping[:class:`str`, Optional[:class:`float`]]]
+        Overrides the number of seconds the responses of a route are cached for, keyed by the
+        route path of the API such as ``'/users/{user_id}'``. ``None`` disables caching the route.
+        By default users are cached for 60 seconds, the application info for 5 minutes and
+        channels, guilds, members and invites for 30 seconds.
+
+        .. versionadded:: 1.5
+    request_metrics: Optional[:class:`.RequestMetrics`]
+        Records a :class:`.RequestTrace` of every REST request, describing the time spent waiting
+        for rate limits, on the network and backing off from errors along with retry counts, status
+        codes and response sizes. Defaults to ``None``, which disables tracing entirely.
+
+        .. versionadded:: 1.5
+    max_cached_users: :class:`int`
+        The maximum number of users that are not members of any cached guild to keep
+        in the internal user cache. Users that are members of a cached guild are always
+        kept. The least recently used users are evicted first. This defaults to ``1000``.
+
+        .. versionadded:: 1.5
     loop: Optional[:class:`asyncio.AbstractEventLoop`]
         The :class:`asyncio.AbstractEventLoop` to use for asynchronous operations.
         Defaults to ``None``, in which case the default event loop is used via
         :func:`asyncio.get_event_loop()`.
     connector: :class:`aiohttp.BaseConnector`
-        The connector to use for connection pooling.
+        The connector to use for connection pooling. If this is given, the connection
+        pooling options below are ignored.
+    connection_limit: :class:`int`
+        The maximum number of simultaneous HTTP connections. Defaults to ``100``.
+
+        .. versionadded:: 1.5
+    connection_limit_per_host: :class:`int`
+        The maximum number of simultaneous HTTP connections to a single host, or ``0``
+        for no limit besides ``connection_limit``. Defaults to ``0``.
+
+        .. versionadded:: 1.5
+    keepalive_timeout: :class:`float`
+        The number of seconds to keep idle HTTP connections open for reuse. Defaults to ``60.0``.
+
+        .. versionadded:: 1.5
+    dns_cache_ttl: Optional[:class:`int`]
+        The number of seconds to cache DNS lookups for, or ``None`` to cache them forever.
+        Defaults to ``300``.
+
+        .. versionadded:: 1.5
+    happy_eyeballs_delay: Optional[:class:`float`]
+        The number of seconds to wait for a connection attempt before starting the next one
+        in parallel, as described in :rfc:`8305`, or ``None`` to connect sequentially. This
+        requires aiohttp 3.10 or later and is ignored otherwise. Defaults to ``0.25``.
+
+        .. versionadded:: 1.5
     proxy: Optional[:class:`str`]
         Proxy URL.
     proxy_auth: Optional[:class:`aiohttp.BasicAuth`]
@@ -195,6 +264,26 @@ class Client:
 
             In short, this makes it so the only member you can reliably query is the
             message author. Useful for bots that do not require any state.
+    allowed_events: Optional[Iterable[:class:`str`]]
+        The gateway event names (e.g. ``'MESSAGE_CREATE'``) that should be processed.
+        Events not in this set are dropped before being decoded and are not parsed
+        or dispatched, including :func:`on_socket_response`. Events required for the
+        connection and the guild cache to function, such as ``READY`` and ``GUILD_CREATE``,
+        are always processed. Defaults to ``None``, which processes every event.
+
+        .. versionadded:: 1.5
+
+        .. warning::
+
+            Filtering events that update the cache, such as ``GUILD_MEMBER_UPDATE`` or
+            ``CHANNEL_UPDATE``, will leave the cache out of date.
+
+        .. note::
+
+            With ``response_cache_size`` set, filtered events that make a cached response
+            stale, such as ``CHANNEL_UPDATE``, are still decoded to invalidate it. They are
+            not parsed or dispatched. ``PRESENCE_UPDATE`` is the exception since it is too
+            frequent, so cached users may be out of date until they expire.
     assume_unsync_clock: :class:`bool`
         Whether to assume the system clock is unsynced. This applies to the ratelimit handling
         code. If this is set to ``True``, the default, then the library uses the time to reset
@@ -203,6 +292,38 @@ class Client:
         sync your system clock to Google's NTP server.
 
         .. versionadded:: 1.3
+    global_rate_limit: Optional[:class:`float`]
+        The maximum number of HTTP requests per second to send across all routes. Requests
+        beyond this rate wait before being sent instead of running into Discord's global
+        rate limit. Statistics are available through :attr:`.global_rate_limit_info`.
+        Defaults to ``None``, which only handles the global rate limit once Discord reports it.
+        If ``rate_limit_store`` is given this must be passed to the store instead.
+
+        .. versionadded:: 1.5
+    rate_limit_store: Optional[:class:`.RateLimitStore`]
+        The store keeping track of Discord's rate limits. Passing a :class:`.SocketRateLimitStore`
+        allows several processes using the same token to share their rate limits. Defaults to
+        ``None``, in which case a :class:`.MemoryRateLimitStore` is used. A store passed here
+        is not closed along with the client, call :meth:`.RateLimitStore.close` once done with it.
+
+        .. versionadded:: 1.5
+    request_priorities: Optional[Mapping[Tuple[:class:`str`, :class:`str`], :class:`.RequestPriority`]]
+        Overrides the priority of HTTP requests waiting for a rate limit, keyed by the HTTP
+        method and the route path of the API, e.g. ``('DELETE', '/channels/{channel_id}/messages/{message_id}')``.
+        By default sending and editing messages is prioritised while deleting messages, reading
+        message history and editing member roles only uses the capacity left over.
+
+        .. versionadded:: 1.5
+    bulk_delete_window: Optional[:class:`float`]
+        The number of seconds to collect single message deletions, such as :meth:`.Message.delete`,
+        in the same channel before sending them together as one bulk deletion of up to 100 messages.
+        Messages older than 14 days are still deleted one by one and if the bulk deletion fails every
+        message is deleted on its own, so each deletion still raises its own errors. Note that a bulk
+        deletion does not report messages that were already deleted. This only applies to bot accounts
+        and requires the :attr:`~.Permissions.manage_messages` permission to be effective. Defaults to
+        ``None``, which disables coalescing.
+
+        .. versionadded:: 1.5
 
     Attributes
     -----------
@@ -222,7 +343,25 @@ class Client:
         proxy = options.pop('proxy', None)
         proxy_auth = options.pop('proxy_auth', None)
         unsync_clock = options.pop('assume_unsync_clock', True)
-        self.http = HTTPClient(connector, proxy=proxy, proxy_auth=proxy_auth, unsync_clock=unsync_clock, loop=self.loop)
+        global_rate_limit = options.pop('global_rate_limit', None)
+        rate_limit_store = options.pop('rate_limit_store', None)
+        request_priorities = options.pop('request_priorities', None)
+        bulk_delete_window = options.pop('bulk_delete_window', None)
+        response_cache_size = options.pop('response_cache_size', None)
+        response_cache_ttls = options.pop('response_cache_ttls', None)
+        request_metrics = options.pop('request_metrics', None)
+        connector_options = {}
+        for option, name in (('connection_limit', 'limit'), ('connection_limit_per_host', 'limit_per_host'),
+                             ('keepalive_timeout', 'keepalive_timeout'), ('dns_cache_ttl', 'ttl_dns_cache'),
+                             ('happy_eyeballs_delay', 'happy_eyeballs_delay')):
+            if option in options:
+                connector_options[name] = options.pop(option)
+        self.http = HTTPClient(connector, proxy=proxy, proxy_auth=proxy_auth, unsync_clock=unsync_clock, loop=self.loop,
+                               global_rate_limit=global_rate_limit, rate_limit_store=rate_limit_store,
+                               request_priorities=request_priorities,
+                               bulk_delete_window=bulk_delete_window, connector_options=connector_options,
+                               response_cache_size=response_cache_size, response_cache_ttls=response_cache_ttls,
+                               request_metrics=request_metrics)
 
         self._handlers = {
             'ready': self._handle_ready
@@ -239,6 +378,7 @@ class Client:
         self._closed = False
         self._ready = asyncio.Event()
         self._connection._get_websocket = self._get_websocket
+        self._connection._has_listeners = self._has_listeners
 
         if VoiceClient.warn_nacl:
             VoiceClient.warn_nacl = False
@@ -249,6 +389,9 @@ class Client:
     def _get_websocket(self, guild_id=None, *, shard_id=None):
         return self.ws
 
+    def _has_listeners(self, event):
+        return event in self._listeners or hasattr(self, 'on_' + event)
+
     async def _syncer(self, guilds):
         await self.ws.request_sync(guilds)
 
@@ -287,6 +430,51 @@ class Client:
         """
         return utils.SequenceProxy(self._connection._messages or [])
 
+    @property
+    def user_cache_info(self):
+        """:class:`tuple`: A named tuple of the user cache's ``hits``, ``misses``,
+        ``maxsize`` and ``currsize``, similar to :func:`functools.lru_cache`.
+
+        ``maxsize`` only counts users that are not members of a cached guild.
+
+        .. versionadded:: 1.5
+        """
+        return self._connection._users.info()
+
+    @property
+    def response_cache_info(self):
+        """Optional[:class:`tuple`]: A named tuple of the REST response cache's ``hits``, ``misses``,
+        ``maxsize`` and ``currsize``, similar to :func:`functools.lru_cache`. ``None`` if the
+        cache is disabled.
+
+        .. versionadded:: 1.5
+        """
+        return self.http.response_cache_info()
+
+    @property
+    def connection_info(self):
+        """:class:`tuple`: A named tuple of the number of HTTP connections that were ``created``,
+        how many requests ``reused`` an idle connection and how many requests were ``queued``
+        because the connection limit was reached.
+
+        .. versionadded:: 1.5
+        """
+        return self.http.connection_info()
+
+    @property
+    def global_rate_limit_info(self):
+        """Optional[:class:`tuple`]: A named tuple describing the client side global rate limit
+        set by the ``global_rate_limit`` option, or ``None`` if it is disabled. This is provided
+        by :meth:`.RateLimitStore.global_info`.
+
+        The tuple contains the number of ``requests`` that went through the limiter, how many
+        of them were ``delayed``, the ``total_wait`` and ``max_wait`` in seconds, the number of
+        requests currently ``queued`` and the most requests that were ever ``max_queued`` at once.
+
+        .. versionadded:: 1.5
+        """
+        return self.http.global_rate_limit_info()
+
     @property
     def private_channels(self):
         """List[:class:`.abc.PrivateChannel`]: The private channels that the connected client is participating on.
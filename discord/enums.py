@@ -51,7 +51,8 @@ __all__ = (
     'Theme',
     'WebhookType',
     'ExpireBehaviour',
-    'ExpireBehavior'
+    'ExpireBehavior',
+    'RequestPriority',
 )
 
 def _create_value_cls(name):
@@ -444,6 +445,11 @@ class ExpireBehaviour(Enum):
 
 ExpireBehavior = ExpireBehaviour
 
+class RequestPriority(Enum):
+    high = 0
+    normal = 1
+    low = 2
+
 def try_enum(cls, val):
     """A function that tries to turn the value into enum ``cls``.
 
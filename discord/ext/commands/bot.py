@@ -29,6 +29,7 @@ import collections
 import inspect
 import importlib.util
 import sys
+import time
 import traceback
 import re
 import types
@@ -94,6 +95,179 @@ class _DefaultRepr:
 
 _default = _DefaultRepr()
 
+# the number of distinct prefix sequences kept compiled before starting over
+_MAX_PREFIX_MATCHERS = 1024
+
+class _PrefixMatcher:
+    """A character trie built from a sequence of command prefixes.
+
+    Matching walks the message content once and stops at the first
+    character that no prefix continues with, so messages that do not
+    start with any prefix are rejected after a single lookup.
+    """
+
+    __slots__ = ('prefixes', 'source', '_root')
+
+    def __init__(self, prefixes, source=None):
+        self.prefixes = prefixes
+        self.source = source
+        self._root = root = {}
+        for index, prefix in enumerate(prefixes):
+            node = root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            # prefixes are matched in order, so the earliest one wins
+            node.setdefault(None, index)
+
+    def match(self, content):
+        node = self._root
+        best = node.get(None)
+        for char in content:
+            node = node.get(char)
+            if node is None:
+                break
+            index = node.get(None)
+            if index is not None and (best is None or index < best):
+                best = index
+
+        return None if best is None else self.prefixes[best]
+
+class PrefixCache:
+    """A cache for the prefixes a :class:`.Bot` resolves through :meth:`.Bot.get_prefix`.
+
+    Prefixes are cached per guild and kept for at most ``ttl`` seconds,
+    with the least recently used guilds being dropped once ``maxsize``
+    guilds are cached. Concurrent lookups for a guild that is not cached
+    share a single call to :meth:`.Bot.get_prefix`.
+
+    Prefix lookups for private messages usually find no custom prefix and
+    fall back to the default ones. With ``private_ttl`` set, that result
+    is cached per private channel as well, so private messages stop
+    reaching a prefix database.
+
+    These are meant to be passed into the ``cache_prefixes`` parameter of :class:`.Bot`.
+
+    .. versionadded:: 1.5
+
+    Parameters
+    -----------
+    maxsize: Optional[:class:`int`]
+        The maximum number of guilds and private channels to cache the prefixes
+        of. If ``None`` then the cache is unbounded. Defaults to ``1000``.
+    ttl: Optional[:class:`float`]
+        The number of seconds the prefixes of a guild are cached for. If ``None``
+        then they are cached until they're invalidated. Defaults to ``None``.
+    private_ttl: Optional[:class:`float`]
+        The number of seconds the prefixes of a private channel are cached for.
+        If ``None`` then the prefixes used in private messages are not cached.
+        Defaults to ``None``.
+    """
+
+    __slots__ = ('maxsize', 'ttl', 'private_ttl', '_entries', '_pending', 'hits', 'misses')
+
+    def __init__(self, *, maxsize=1000, ttl=None, private_ttl=None):
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError('maxsize must be greater than 0 or None')
+        if ttl is not None and ttl <= 0:
+            raise ValueError('ttl must be greater than 0 or None')
+        if private_ttl is not None and private_ttl <= 0:
+            raise ValueError('private_ttl must be greater than 0 or None')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.private_ttl = private_ttl
+        self._entries = collections.OrderedDict()
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return '<PrefixCache maxsize={0.maxsize} ttl={0.ttl} private_ttl={0.private_ttl}>'.format(self)
+
+    def _get(self, key):
+        try:
+            expires, matcher = self._entries[key]
+        except KeyError:
+            return None
+
+        if expires is not None and expires <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return matcher
+
+    def _set(self, key, matcher, ttl):
+        expires = None if ttl is None else time.monotonic() + ttl
+        entries = self._entries
+        entries[key] = (expires, matcher)
+        entries.move_to_end(key)
+        if self.maxsize is not None and len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    async def _fetch(self, message, resolver):
+        guild = message.guild
+        if guild is not None:
+            key = guild.id
+            ttl = self.ttl
+        elif self.private_ttl is not None:
+            # guild and channel IDs never collide
+            key = message.channel.id
+            ttl = self.private_ttl
+        else:
+            return await resolver(message)
+
+        matcher = self._get(key)
+        if matcher is not None:
+            self.hits += 1
+            return matcher
+
+        self.misses += 1
+        task = self._pending.get(key)
+        if task is None:
+            # the lookup runs in its own task so that a cancelled caller
+            # does not cancel it for the others waiting on it
+            task = self._pending[key] = asyncio.ensure_future(resolver(message))
+
+            def done(task):
+                failed = task.cancelled() or task.exception() is not None
+                # don't store the result if it was invalidated in the meantime
+                if self._pending.get(key) is task:
+                    del self._pending[key]
+                    if not failed:
+                        self._set(key, task.result(), ttl)
+
+            task.add_done_callback(done)
+
+        return await asyncio.shield(task)
+
+    def invalidate(self, guild=None):
+        """Removes the cached prefixes of a guild or private channel.
+
+        Parameters
+        -----------
+        guild: Optional[:class:`~discord.abc.Snowflake`]
+            The guild or private channel to remove the prefixes of. If ``None``
+            then every cached prefix is removed.
+        """
+        if guild is None:
+            self._entries.clear()
+            self._pending.clear()
+        else:
+            self._entries.pop(guild.id, None)
+            self._pending.pop(guild.id, None)
+
+    def info(self):
+        """Returns the statistics of the cache.
+
+        Returns
+        --------
+        :class:`~discord.utils.CacheInfo`
+            The hits, misses, maximum size and current size of the cache.
+        """
+        return discord.utils.CacheInfo(hits=self.hits, misses=self.misses, maxsize=self.maxsize,
+                                       currsize=len(self._entries))
+
 class BotBase(GroupMixin):
     def __init__(self, command_prefix, help_command=_default, description=None, **options):
         super().__init__(**options)
@@ -109,6 +283,18 @@ class BotBase(GroupMixin):
         self.description = inspect.cleandoc(description) if description else ''
         self.owner_id = options.get('owner_id')
         self.owner_ids = options.get('owner_ids', set())
+        self._prefix_matchers = {}
+        self._static_prefix_matcher = None
+
+        cache_prefixes = options.get('cache_prefixes', False)
+        if cache_prefixes is True:
+            cache_prefixes = PrefixCache()
+        elif cache_prefixes is False:
+            cache_prefixes = None
+        elif cache_prefixes is not None and not isinstance(cache_prefixes, PrefixCache):
+            raise TypeError('cache_prefixes must be a bool or PrefixCache not {0.__class__!r}'.format(cache_prefixes))
+        self._prefix_cache = cache_prefixes
+        self._cooldown_backend = options.get('cooldown_backend')
 
         if self.owner_id and self.owner_ids:
             raise TypeError('Both owner_id and owner_ids are set.')
@@ -134,6 +320,9 @@ class BotBase(GroupMixin):
         for event in self.extra_events.get(ev, []):
             self._schedule_event(event, ev, *args, **kwargs)
 
+    def _has_listeners(self, event_name):
+        return bool(self.extra_events.get('on_' + event_name)) or super()._has_listeners(event_name)
+
     async def close(self):
         for extension in tuple(self.__extensions):
             try:
@@ -814,6 +1003,74 @@ class BotBase(GroupMixin):
 
         return ret
 
+    def invalidate_prefixes(self, guild=None):
+        """Removes cached prefixes when ``cache_prefixes`` is enabled.
+
+        This should be called whenever the prefixes returned for a guild
+        change, e.g. after a prefix command updates them in a database.
+
+        .. versionadded:: 1.5
+
+        Parameters
+        -----------
+        guild: Optional[:class:`~discord.abc.Snowflake`]
+            The guild or private channel to invalidate the prefixes of. If
+            ``None`` then every cached prefix is invalidated.
+        """
+        cache = self._prefix_cache
+        if cache is not None:
+            cache.invalidate(guild)
+
+    @property
+    def prefix_cache(self):
+        """Optional[:class:`.PrefixCache`]: The prefix cache used by the bot, if ``cache_prefixes`` is enabled.
+
+        .. versionadded:: 1.5
+        """
+        return self._prefix_cache
+
+    def _compile_prefixes(self, prefix):
+        if isinstance(prefix, str):
+            prefixes = (prefix,)
+        else:
+            # an overridden get_prefix can return any iterable, e.g. a set or a generator
+            if not isinstance(prefix, collections.abc.Iterable):
+                raise TypeError("get_prefix must return either a string or a list of string, "
+                                "not {}".format(prefix.__class__.__name__))
+
+            prefixes = tuple(prefix)
+            for value in prefixes:
+                if not isinstance(value, str):
+                    raise TypeError("Iterable command_prefix or list returned from get_prefix must "
+                                    "contain only strings, not {}".format(value.__class__.__name__))
+
+        try:
+            matcher = self._prefix_matchers[prefixes]
+        except KeyError:
+            if len(self._prefix_matchers) >= _MAX_PREFIX_MATCHERS:
+                self._prefix_matchers.clear()
+            matcher = self._prefix_matchers[prefixes] = _PrefixMatcher(prefixes)
+        return matcher
+
+    async def _get_prefix_matcher(self, message):
+        prefix = self.command_prefix
+        if not callable(prefix) and type(self).get_prefix is BotBase.get_prefix:
+            # a static prefix only has to be compiled again when it's modified
+            matcher = self._static_prefix_matcher
+            if matcher is None or matcher.source != prefix:
+                source = prefix.copy() if isinstance(prefix, list) else prefix
+                matcher = self._compile_prefixes(await self.get_prefix(message))
+                matcher = self._static_prefix_matcher = _PrefixMatcher(matcher.prefixes, source)
+            return matcher
+
+        cache = self._prefix_cache
+        if cache is None:
+            return await self._resolve_prefix_matcher(message)
+        return await cache._fetch(message, self._resolve_prefix_matcher)
+
+    async def _resolve_prefix_matcher(self, message):
+        return self._compile_prefixes(await self.get_prefix(message))
+
     async def get_context(self, message, *, cls=Context):
         r"""|coro|
 
@@ -850,38 +1107,17 @@ class BotBase(GroupMixin):
         if self._skip_check(message.author.id, self.user.id):
             return ctx
 
-        prefix = await self.get_prefix(message)
-        invoked_prefix = prefix
-
-        if isinstance(prefix, str):
-            if not view.skip_string(prefix):
-                return ctx
-        else:
-            try:
-                # if the context class' __init__ consumes something from the view this
-                # will be wrong.  That seems unreasonable though.
-                if message.content.startswith(tuple(prefix)):
-                    invoked_prefix = discord.utils.find(view.skip_string, prefix)
-                else:
-                    return ctx
-
-            except TypeError:
-                if not isinstance(prefix, list):
-                    raise TypeError("get_prefix must return either a string or a list of string, "
-                                    "not {}".format(prefix.__class__.__name__))
-
-                # It's possible a bad command_prefix got us here.
-                for value in prefix:
-                    if not isinstance(value, str):
-                        raise TypeError("Iterable command_prefix or list returned from get_prefix must "
-                                        "contain only strings, not {}".format(value.__class__.__name__))
+        matcher = await self._get_prefix_matcher(message)
+        prefix = matcher.match(message.content)
+        if prefix is None:
+            return ctx
 
-                # Getting here shouldn't happen
-                raise
+        # the trie already compared the content, so just move past the prefix
+        view.index = len(prefix)
 
         invoker = view.get_word()
         ctx.invoked_with = invoker
-        ctx.prefix = invoked_prefix
+        ctx.prefix = prefix
         ctx.command = self.all_commands.get(invoker)
         return ctx
 
@@ -1009,6 +1245,22 @@ class Bot(BotBase, discord.Client):
         for the collection. You cannot set both ``owner_id`` and ``owner_ids``.
 
         .. versionadded:: 1.3
+    cache_prefixes: Union[:class:`bool`, :class:`.PrefixCache`]
+        Whether to cache the prefixes returned by :meth:`.get_prefix` per guild.
+        This avoids calling a :attr:`command_prefix` callable for every message
+        but requires calling :meth:`.invalidate_prefixes` whenever the prefixes
+        of a guild change. Passing ``True`` uses a :class:`.PrefixCache` with
+        the default settings. Defaults to ``False``.
+
+        .. versionadded:: 1.5
+    cooldown_backend: Optional[:class:`.CooldownBackend`]
+        The backend storing the state of command cooldowns and max concurrency
+        limits. Sharing a backend such as :class:`.SQLiteCooldownBackend`
+        between bots makes them share their limits, e.g. when shards are split
+        across processes. If ``None`` (the default) every command keeps its
+        own state in memory.
+
+        .. versionadded:: 1.5
     """
     pass
 
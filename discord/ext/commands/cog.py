@@ -379,6 +379,7 @@ class Cog(metaclass=CogMeta):
         # we've added so far for some form of atomic loading.
         for index, command in enumerate(self.__cog_commands__):
             command.cog = self
+            command._prepare_parse_plan()
             if command.parent is None:
                 try:
                     bot.add_command(command)
@@ -59,6 +59,13 @@ def _get_from_guilds(bot, getter, argument):
             return result
     return result
 
+def _get_channel_from_guilds(bot, name, cls):
+    for guild in bot.guilds:
+        result = guild._get_channel_named(name, cls)
+        if result is not None:
+            return result
+    return None
+
 _utils_get = discord.utils.get
 
 class Converter:
@@ -175,13 +182,13 @@ class UserConverter(IDConverter):
             if len(arg) > 5 and arg[-5] == '#':
                 discrim = arg[-4:]
                 name = arg[:-5]
-                predicate = lambda u: u.name == name and u.discriminator == discrim
-                result = discord.utils.find(predicate, state._users.values())
+                predicate = lambda u: u.discriminator == discrim
+                result = discord.utils.find(predicate, state._users.named(name))
                 if result is not None:
                     return result
 
-            predicate = lambda u: u.name == arg
-            result = discord.utils.find(predicate, state._users.values())
+            users = state._users.named(arg)
+            result = users[0] if users else None
 
         if result is None:
             raise BadArgument('User "{}" not found'.format(argument))
@@ -247,11 +254,9 @@ class TextChannelConverter(IDConverter):
         if match is None:
             # not a mention
             if guild:
-                result = discord.utils.get(guild.text_channels, name=argument)
+                result = guild._get_channel_named(argument, discord.TextChannel)
             else:
-                def check(c):
-                    return isinstance(c, discord.TextChannel) and c.name == argument
-                result = discord.utils.find(check, bot.get_all_channels())
+                result = _get_channel_from_guilds(bot, argument, discord.TextChannel)
         else:
             channel_id = int(match.group(1))
             if guild:
@@ -285,11 +290,9 @@ class VoiceChannelConverter(IDConverter):
         if match is None:
             # not a mention
             if guild:
-                result = discord.utils.get(guild.voice_channels, name=argument)
+                result = guild._get_channel_named(argument, discord.VoiceChannel)
             else:
-                def check(c):
-                    return isinstance(c, discord.VoiceChannel) and c.name == argument
-                result = discord.utils.find(check, bot.get_all_channels())
+                result = _get_channel_from_guilds(bot, argument, discord.VoiceChannel)
         else:
             channel_id = int(match.group(1))
             if guild:
@@ -324,11 +327,9 @@ class CategoryChannelConverter(IDConverter):
         if match is None:
             # not a mention
             if guild:
-                result = discord.utils.get(guild.categories, name=argument)
+                result = guild._get_channel_named(argument, discord.CategoryChannel)
             else:
-                def check(c):
-                    return isinstance(c, discord.CategoryChannel) and c.name == argument
-                result = discord.utils.find(check, bot.get_all_channels())
+                result = _get_channel_from_guilds(bot, argument, discord.CategoryChannel)
         else:
             channel_id = int(match.group(1))
             if guild:
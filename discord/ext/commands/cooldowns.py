@@ -25,9 +25,14 @@ DEALINGS IN THE SOFTWARE.
 """
 
 from discord.enums import Enum
+import os
 import time
+import queue
 import asyncio
-from collections import deque
+import sqlite3
+import threading
+import concurrent.futures
+from collections import deque, OrderedDict
 
 from ...abc import PrivateChannel
 from .errors import MaxConcurrencyReached
@@ -37,6 +42,9 @@ __all__ = (
     'Cooldown',
     'CooldownMapping',
     'MaxConcurrency',
+    'CooldownBackend',
+    'MemoryCooldownBackend',
+    'SQLiteCooldownBackend',
 )
 
 class BucketType(Enum):
@@ -132,16 +140,391 @@ class Cooldown:
     def __repr__(self):
         return '<Cooldown rate: {0.rate} per: {0.per} window: {0._window} tokens: {0._tokens}>'.format(self)
 
+class _SharedCooldown(Cooldown):
+    """A cooldown bucket whose state lives in a :class:`CooldownBackend`."""
+
+    __slots__ = ('_backend', '_namespace', '_key', '_updating')
+
+    def __init__(self, original, backend, namespace, key):
+        super().__init__(original.rate, original.per, original.type)
+        self._backend = backend
+        self._namespace = namespace
+        self._key = key
+        self._updating = False
+
+    def _load(self, state):
+        if state is None:
+            self._window, self._tokens, self._last = 0.0, self.rate, 0.0
+        else:
+            self._window, self._tokens, self._last = state
+
+    def get_tokens(self, current=None):
+        # the state is already loaded while an update is being applied
+        if not self._updating:
+            self._load(self._backend.get(self._namespace, self._key))
+        return super().get_tokens(current)
+
+    def _apply(self, current):
+        def apply(state):
+            self._load(state)
+            self._updating = True
+            try:
+                retry_after = Cooldown.update_rate_limit(self, current)
+            finally:
+                self._updating = False
+            return (self._window, self._tokens, self._last), retry_after
+        return apply
+
+    def update_rate_limit(self, current=None):
+        return self._backend.update(self._namespace, self._key, self.per, self._apply(current))
+
+    async def _update_rate_limit_async(self, current=None):
+        return await self._backend.call('update', self._namespace, self._key, self.per, self._apply(current))
+
+    def reset(self):
+        super().reset()
+        self._backend.delete(self._namespace, self._key)
+
+class CooldownBackend:
+    """An interface for storing the state of cooldowns and max concurrency
+    limits outside of the commands that use them.
+
+    Backends allow multiple bots, e.g. shards split across processes, to
+    share their cooldowns and concurrency limits. They are passed to the
+    ``cooldown_backend`` parameter of :class:`.Bot`.
+
+    A bucket state is a ``(window, tokens, last)`` tuple of the time the
+    current rate limit window started, the remaining tokens and the time the
+    bucket was last used. Keys are strings and namespaces are the qualified
+    names of commands.
+
+    .. versionadded:: 1.5
+    """
+
+    def get(self, namespace, key):
+        """Returns the state of a cooldown bucket or ``None`` if it has no state."""
+        raise NotImplementedError
+
+    def update(self, namespace, key, per, func):
+        """Atomically updates the state of a cooldown bucket.
+
+        ``func`` is called with the current state (or ``None``) and returns a
+        ``(state, result)`` tuple. The new state is stored and kept for at
+        least ``per`` seconds after it was last used, and the result is returned.
+        """
+        raise NotImplementedError
+
+    def delete(self, namespace, key):
+        """Removes the state of a cooldown bucket."""
+        raise NotImplementedError
+
+    def acquire(self, namespace, key, number):
+        """Takes a concurrency slot if fewer than ``number`` are taken.
+
+        Returns whether a slot was taken.
+        """
+        raise NotImplementedError
+
+    def release(self, namespace, key):
+        """Releases a concurrency slot taken by :meth:`acquire`."""
+        raise NotImplementedError
+
+    def close(self):
+        """Releases the resources held by the backend."""
+        pass
+
+    async def call(self, name, *args):
+        """Calls the method called ``name`` with ``args`` without blocking
+        the event loop.
+
+        Commands use this for the calls made while they are invoked. The
+        default implementation calls the method directly, which is fine for
+        backends that never block. Backends doing I/O should override it.
+        """
+        return getattr(self, name)(*args)
+
+class MemoryCooldownBackend(CooldownBackend):
+    """A :class:`CooldownBackend` that stores everything in memory.
+
+    This shares cooldowns between every bot in the same process.
+
+    .. versionadded:: 1.5
+    """
+
+    def __init__(self):
+        # (namespace, key) -> (state, expires) ordered by the last update
+        self._buckets = OrderedDict()
+        self._counts = {}
+
+    def get(self, namespace, key):
+        try:
+            state, expires = self._buckets[namespace, key]
+        except KeyError:
+            return None
+
+        return state if expires >= time.time() else None
+
+    def update(self, namespace, key, per, func):
+        buckets = self._buckets
+        state, result = func(self.get(namespace, key))
+        buckets[namespace, key] = (state, state[2] + per)
+        buckets.move_to_end((namespace, key))
+
+        # periods differ between namespaces so this is only
+        # an amortised sweep of the oldest entries
+        current = time.time()
+        while buckets:
+            first, (_, expires) = next(iter(buckets.items()))
+            if expires >= current:
+                break
+            del buckets[first]
+
+        return result
+
+    def delete(self, namespace, key):
+        self._buckets.pop((namespace, key), None)
+
+    def acquire(self, namespace, key, number):
+        count = self._counts.get((namespace, key), 0)
+        if count >= number:
+            return False
+        self._counts[namespace, key] = count + 1
+        return True
+
+    def release(self, namespace, key):
+        count = self._counts.get((namespace, key), 0) - 1
+        if count > 0:
+            self._counts[namespace, key] = count
+        else:
+            self._counts.pop((namespace, key), None)
+
+class SQLiteCooldownBackend(CooldownBackend):
+    """A :class:`CooldownBackend` backed by a SQLite database.
+
+    This shares cooldowns between processes on the same host by pointing
+    them to the same database file. The database runs in WAL mode and
+    expired buckets are deleted in batches rather than on every update to
+    keep the cost of an invocation low.
+
+    The database is only used from a dedicated thread so waiting for
+    another process never blocks the event loop while a command is invoked.
+    Calls queued while a transaction is running are written together in
+    the next transaction. The synchronous methods, which are also used by
+    e.g. :meth:`.Command.is_on_cooldown`, wait for the thread to answer.
+
+    Concurrency slots are recorded per process. Slots held by processes
+    that no longer exist are reclaimed when a backend is created.
+
+    .. versionadded:: 1.5
+
+    Parameters
+    -----------
+    path: :class:`str`
+        The path to the database file.
+    timeout: :class:`float`
+        How long to wait for another process to release the database
+        before giving up. Defaults to ``1.0``.
+    sweep_every: :class:`int`
+        The number of updates between deleting expired buckets.
+        Defaults to ``1000``.
+    """
+
+    #: The maximum number of calls written in one transaction.
+    max_batch = 64
+
+    def __init__(self, path, *, timeout=1.0, sweep_every=1000):
+        self.sweep_every = sweep_every
+        self._updates = 0
+        self._pid = os.getpid()
+        self._db = None
+        self._closed = False
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, name='sqlite-cooldowns', daemon=True)
+        self._thread.start()
+        self._submit(self._connect, (path, timeout)).result()
+
+    def _connect(self, path, timeout):
+        self._db = db = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('CREATE TABLE IF NOT EXISTS cooldowns ('
+                   'namespace TEXT NOT NULL, key TEXT NOT NULL, window_start REAL NOT NULL, '
+                   'tokens INTEGER NOT NULL, last REAL NOT NULL, expires REAL NOT NULL, '
+                   'PRIMARY KEY (namespace, key))')
+        db.execute('CREATE INDEX IF NOT EXISTS cooldowns_expires ON cooldowns (expires)')
+        db.execute('CREATE TABLE IF NOT EXISTS concurrency ('
+                   'namespace TEXT NOT NULL, key TEXT NOT NULL, pid INTEGER NOT NULL, '
+                   'count INTEGER NOT NULL, PRIMARY KEY (namespace, key, pid))')
+        self._reap()
+
+    def _reap(self):
+        # our PID might have been used by a previous process
+        dead = [self._pid]
+        if os.name == 'posix':
+            for (pid,) in self._db.execute('SELECT DISTINCT pid FROM concurrency').fetchall():
+                try:
+                    os.kill(pid, 0)
+                except ProcessLookupError:
+                    dead.append(pid)
+                except OSError:
+                    pass
+
+        self._db.executemany('DELETE FROM concurrency WHERE pid = ?', [(pid,) for pid in dead])
+
+    def _submit(self, func, args):
+        if self._closed:
+            raise RuntimeError('the backend is closed')
+        future = concurrent.futures.Future()
+        self._jobs.put((func, args, future))
+        return future
+
+    def _worker(self):
+        jobs = self._jobs
+        while True:
+            batch = [jobs.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = any(job is None for job in batch)
+            batch = [job for job in batch if job is not None and job[2].set_running_or_notify_cancel()]
+            if self._db is None:
+                # the connection is opened by the first job
+                for func, args, future in batch:
+                    self._run(func, args, future)
+            elif batch:
+                self._run_batch(batch)
+
+            if closing:
+                if self._db is not None:
+                    self._db.close()
+                return
+
+    def _run(self, func, args, future):
+        try:
+            result = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    def _run_batch(self, batch):
+        db = self._db
+        results = []
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                for func, args, future in batch:
+                    # a failing call only rolls back its own changes
+                    db.execute('SAVEPOINT call')
+                    try:
+                        results.append((True, func(*args)))
+                    except Exception as e:
+                        db.execute('ROLLBACK TO call')
+                        results.append((False, e))
+                    db.execute('RELEASE call')
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+        except BaseException as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), (ok, result) in zip(batch, results):
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+    async def call(self, name, *args):
+        return await asyncio.wrap_future(self._submit(getattr(self, '_' + name), args))
+
+    def _get(self, namespace, key):
+        row = self._db.execute('SELECT window_start, tokens, last, expires FROM cooldowns '
+                               'WHERE namespace = ? AND key = ?', (namespace, key)).fetchone()
+        if row is None or row[3] < time.time():
+            return None
+        return row[:3]
+
+    def _update(self, namespace, key, per, func):
+        db = self._db
+        row = db.execute('SELECT window_start, tokens, last FROM cooldowns '
+                         'WHERE namespace = ? AND key = ?', (namespace, key)).fetchone()
+        (window, tokens, last), result = func(row)
+        db.execute('INSERT OR REPLACE INTO cooldowns VALUES (?, ?, ?, ?, ?, ?)',
+                   (namespace, key, window, tokens, last, last + per))
+
+        self._updates += 1
+        if self._updates >= self.sweep_every:
+            self._updates = 0
+            db.execute('DELETE FROM cooldowns WHERE expires < ?', (time.time(),))
+        return result
+
+    def _delete(self, namespace, key):
+        self._db.execute('DELETE FROM cooldowns WHERE namespace = ? AND key = ?', (namespace, key))
+
+    def _acquire(self, namespace, key, number):
+        db = self._db
+        (count,) = db.execute('SELECT COALESCE(SUM(count), 0) FROM concurrency '
+                              'WHERE namespace = ? AND key = ?', (namespace, key)).fetchone()
+        if count >= number:
+            return False
+
+        params = (namespace, key, self._pid)
+        db.execute('INSERT OR IGNORE INTO concurrency VALUES (?, ?, ?, 0)', params)
+        db.execute('UPDATE concurrency SET count = count + 1 WHERE namespace = ? AND key = ? AND pid = ?', params)
+        return True
+
+    def _release(self, namespace, key):
+        params = (namespace, key, self._pid)
+        db = self._db
+        db.execute('UPDATE concurrency SET count = count - 1 WHERE namespace = ? AND key = ? AND pid = ?', params)
+        db.execute('DELETE FROM concurrency WHERE namespace = ? AND key = ? AND pid = ? AND count <= 0', params)
+
+    def get(self, namespace, key):
+        return self._submit(self._get, (namespace, key)).result()
+
+    def update(self, namespace, key, per, func):
+        return self._submit(self._update, (namespace, key, per, func)).result()
+
+    def delete(self, namespace, key):
+        self._submit(self._delete, (namespace, key)).result()
+
+    def acquire(self, namespace, key, number):
+        return self._submit(self._acquire, (namespace, key, number)).result()
+
+    def release(self, namespace, key):
+        self._submit(self._release, (namespace, key)).result()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._jobs.put(None)
+            self._thread.join()
+
 class CooldownMapping:
     def __init__(self, original):
-        self._cache = {}
+        # ordered from least to most recently used so that
+        # expired buckets are always found at the front
+        self._cache = OrderedDict()
         self._cooldown = original
+        self._backend = None
+        self._namespace = None
 
     def copy(self):
         ret = CooldownMapping(self._cooldown)
         ret._cache = self._cache.copy()
         return ret
 
+    def _bind(self, backend, namespace):
+        self._backend = backend
+        self._namespace = namespace
+        self._cache.clear()
+
     @property
     def valid(self):
         return self._cooldown is not None
@@ -157,22 +540,35 @@ class CooldownMapping:
         # we want to delete all cache objects that haven't been used
         # in a cooldown window. e.g. if we have a  command that has a
         # cooldown of 60s and it has not been used in 60s then that key should be deleted
+        # since every bucket shares the same period, the least recently used ones
+        # expire first and we can stop at the first bucket that is still alive.
+        # buckets that are expired but not at the front behave like fresh ones and
+        # get removed once they reach it.
         current = current or time.time()
-        dead_keys = [k for k, v in self._cache.items() if current > v._last + v.per]
-        for k in dead_keys:
-            del self._cache[k]
+        cache = self._cache
+        while cache:
+            key, bucket = next(iter(cache.items()))
+            if current <= bucket._last + bucket.per:
+                break
+            del cache[key]
 
     def get_bucket(self, message, current=None):
+        if self._backend is not None:
+            key = self._bucket_key(message) if self._cooldown.type is not BucketType.default else None
+            return _SharedCooldown(self._cooldown, self._backend, self._namespace, repr(key))
+
         if self._cooldown.type is BucketType.default:
             return self._cooldown
 
         self._verify_cache_integrity(current)
         key = self._bucket_key(message)
-        if key not in self._cache:
+        try:
+            bucket = self._cache[key]
+        except KeyError:
             bucket = self._cooldown.copy()
             self._cache[key] = bucket
         else:
-            bucket = self._cache[key]
+            self._cache.move_to_end(key)
 
         return bucket
 
@@ -240,10 +636,12 @@ class _Semaphore:
         self.wake_up()
 
 class MaxConcurrency:
-    __slots__ = ('number', 'per', 'wait', '_mapping')
+    __slots__ = ('number', 'per', 'wait', '_mapping', '_backend', '_namespace')
 
     def __init__(self, number, *, per, wait):
         self._mapping = {}
+        self._backend = None
+        self._namespace = None
         self.per = per
         self.number = number
         self.wait = wait
@@ -263,7 +661,26 @@ class MaxConcurrency:
     def get_key(self, message):
         return self.per.get_key(message)
 
+    def _bind(self, backend, namespace):
+        self._backend = backend
+        self._namespace = namespace
+
+    async def _acquire_shared(self, message):
+        key = repr(self.get_key(message))
+        backend = self._backend
+        delay = 0.05
+        while not await backend.call('acquire', self._namespace, key, self.number):
+            if not self.wait:
+                raise MaxConcurrencyReached(self.number, self.per)
+
+            # other processes can't wake us up so poll with a backoff
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
     async def acquire(self, message):
+        if self._backend is not None:
+            return await self._acquire_shared(message)
+
         key = self.get_key(message)
 
         try:
@@ -278,6 +695,10 @@ class MaxConcurrency:
     async def release(self, message):
         # Technically there's no reason for this function to be async
         # But it might be more useful in the future
+        if self._backend is not None:
+            await self._backend.call('release', self._namespace, repr(self.get_key(message)))
+            return
+
         key = self.get_key(message)
 
         try:
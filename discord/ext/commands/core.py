@@ -25,6 +25,7 @@ DEALINGS IN THE SOFTWARE.
 """
 
 import asyncio
+import copy
 import functools
 import inspect
 import typing
@@ -109,6 +110,84 @@ def _convert_to_bool(argument):
     else:
         raise BadArgument(lowered + ' is not a recognised boolean option')
 
+_FAST_CONVERTERS = (str, int, float, bool)
+
+def _convert_fast(converter, argument, param):
+    if converter is str:
+        return argument
+    if converter is bool:
+        return _convert_to_bool(argument)
+
+    try:
+        return converter(argument)
+    except Exception as exc:
+        raise BadArgument('Converting to "{}" failed for parameter "{}".'.format(converter.__name__, param.name)) from exc
+
+class _ParsePlan:
+    """The precomputed steps for parsing the arguments of a command.
+
+    Each parameter is stored as a ``(name, param, converter, fast)`` tuple
+    where ``fast`` is whether the converter is a builtin type that can be
+    converted without going through :meth:`Command.do_conversion`.
+    """
+
+    __slots__ = ('key', 'params', 'error', 'custom_transform')
+
+    def __init__(self, command, key):
+        self.key = key
+        self.params = []
+        self.error = None
+        self.custom_transform = type(command).transform is not Command.transform
+
+        iterator = iter(command.params.items())
+        if command.cog is not None:
+            # we have 'self' as the first parameter so just skip it
+            if next(iterator, None) is None:
+                self.error = 'Callback for {0.name} command is missing "self" parameter.'
+                return
+
+        # next we have the 'ctx' as the next parameter
+        if next(iterator, None) is None:
+            self.error = 'Callback for {0.name} command is missing "ctx" parameter.'
+            return
+
+        cls = type(command)
+        can_be_fast = (not self.custom_transform and
+                       cls.do_conversion is Command.do_conversion and
+                       cls._actual_conversion is Command._actual_conversion)
+
+        for name, param in iterator:
+            converter = command._get_converter(param)
+            fast = can_be_fast and converter in _FAST_CONVERTERS
+            self.params.append((name, param, converter, fast))
+            if param.kind == param.KEYWORD_ONLY:
+                break
+
+class _CheckEvaluator:
+    """Evaluates checks for many commands concurrently.
+
+    Every distinct check is only called once per evaluator, the other
+    commands requesting it wait for the same result. At most ``concurrency``
+    checks run at the same time.
+    """
+
+    __slots__ = ('_semaphore', '_results')
+
+    def __init__(self, concurrency):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._results = {}
+
+    async def _call(self, func, ctx):
+        async with self._semaphore:
+            return await discord.utils.maybe_coroutine(func, ctx)
+
+    async def run(self, key, func, ctx):
+        try:
+            task = self._results[key]
+        except KeyError:
+            task = self._results[key] = asyncio.ensure_future(self._call(func, ctx))
+        return await asyncio.shield(task)
+
 class _CaseInsensitiveDict(dict):
     def __contains__(self, k):
         return super().__contains__(k.casefold())
@@ -282,6 +361,8 @@ class Command(_BaseCommand):
         else:
             self.after_invoke(after_invoke)
 
+        self._prepare_parse_plan()
+
     @property
     def callback(self):
         return self._callback
@@ -293,6 +374,8 @@ class Command(_BaseCommand):
 
         signature = inspect.signature(function)
         self.params = signature.parameters.copy()
+        self._parse_plan = None
+        self._signature = None
 
         # PEP-563 allows postponing evaluation of annotations with a __future__
         # import. When postponed, Parameter.annotation will be a string and must
@@ -507,8 +590,10 @@ class Command(_BaseCommand):
         return converter
 
     async def transform(self, ctx, param):
+        return await self._transform(ctx, param, self._get_converter(param))
+
+    async def _transform(self, ctx, param, converter):
         required = param.default is param.empty
-        converter = self._get_converter(param)
         consume_rest_is_special = param.kind == param.KEYWORD_ONLY and not self.rest_is_raw
         view = ctx.view
         view.skip_ws()
@@ -544,6 +629,26 @@ class Command(_BaseCommand):
 
         return await self.do_conversion(ctx, converter, argument, param)
 
+    def _transform_fast(self, view, param, converter):
+        # equivalent to _transform for str, int, float and bool converters
+        # without the coroutine and converter lookup overhead
+        view.skip_ws()
+        if view.eof:
+            if param.kind == param.VAR_POSITIONAL:
+                raise RuntimeError() # break the loop
+            if param.default is param.empty:
+                raise MissingRequiredArgument(param)
+            return param.default
+
+        previous = view.index
+        if param.kind == param.KEYWORD_ONLY and not self.rest_is_raw:
+            argument = view.read_rest().strip()
+        else:
+            argument = view.get_quoted_word()
+        view.previous = previous
+
+        return _convert_fast(converter, argument, param)
+
     async def _transform_greedy_pos(self, ctx, param, required, converter):
         view = ctx.view
         result = []
@@ -660,6 +765,13 @@ class Command(_BaseCommand):
     def __str__(self):
         return self.qualified_name
 
+    def _prepare_parse_plan(self):
+        key = (self.cog is not None, self.rest_is_raw)
+        plan = self._parse_plan
+        if plan is None or plan.key != key:
+            plan = self._parse_plan = _ParsePlan(self, key)
+        return plan
+
     async def _parse_arguments(self, ctx):
         ctx.args = [ctx] if self.cog is None else [self.cog, ctx]
         ctx.kwargs = {}
@@ -667,41 +779,43 @@ class Command(_BaseCommand):
         kwargs = ctx.kwargs
 
         view = ctx.view
-        iterator = iter(self.params.items())
+        plan = self._prepare_parse_plan()
+        if plan.error is not None:
+            raise discord.ClientException(plan.error.format(self))
 
-        if self.cog is not None:
-            # we have 'self' as the first parameter so just advance
-            # the iterator and resume parsing
-            try:
-                next(iterator)
-            except StopIteration:
-                fmt = 'Callback for {0.name} command is missing "self" parameter.'
-                raise discord.ClientException(fmt.format(self))
-
-        # next we have the 'ctx' as the next parameter
-        try:
-            next(iterator)
-        except StopIteration:
-            fmt = 'Callback for {0.name} command is missing "ctx" parameter.'
-            raise discord.ClientException(fmt.format(self))
+        if plan.custom_transform:
+            async def transform(ctx, param, converter):
+                return await self.transform(ctx, param)
+        else:
+            transform = self._transform
 
-        for name, param in iterator:
+        for name, param, converter, fast in plan.params:
             if param.kind == param.POSITIONAL_OR_KEYWORD:
-                transformed = await self.transform(ctx, param)
+                if fast:
+                    transformed = self._transform_fast(view, param, converter)
+                else:
+                    transformed = await transform(ctx, param, converter)
                 args.append(transformed)
             elif param.kind == param.KEYWORD_ONLY:
                 # kwarg only param denotes "consume rest" semantics
                 if self.rest_is_raw:
-                    converter = self._get_converter(param)
                     argument = view.read_rest()
-                    kwargs[name] = await self.do_conversion(ctx, converter, argument, param)
+                    if fast:
+                        kwargs[name] = _convert_fast(converter, argument, param)
+                    else:
+                        kwargs[name] = await self.do_conversion(ctx, converter, argument, param)
+                elif fast:
+                    kwargs[name] = self._transform_fast(view, param, converter)
                 else:
-                    kwargs[name] = await self.transform(ctx, param)
+                    kwargs[name] = await transform(ctx, param, converter)
                 break
             elif param.kind == param.VAR_POSITIONAL:
                 while not view.eof:
                     try:
-                        transformed = await self.transform(ctx, param)
+                        if fast:
+                            transformed = self._transform_fast(view, param, converter)
+                        else:
+                            transformed = await transform(ctx, param, converter)
                         args.append(transformed)
                     except RuntimeError:
                         break
@@ -762,11 +876,24 @@ class Command(_BaseCommand):
         if hook is not None:
             await hook(ctx)
 
-    def _prepare_cooldowns(self, ctx):
+    def _bind_cooldown_backend(self, ctx):
+        backend = getattr(ctx.bot, '_cooldown_backend', None)
+        if self._buckets._backend is not backend:
+            self._buckets._bind(backend, self.qualified_name)
+
+        max_concurrency = self._max_concurrency
+        if max_concurrency is not None and max_concurrency._backend is not backend:
+            max_concurrency._bind(backend, self.qualified_name)
+
+    async def _prepare_cooldowns(self, ctx):
+        self._bind_cooldown_backend(ctx)
         if self._buckets.valid:
             current = ctx.message.created_at.replace(tzinfo=datetime.timezone.utc).timestamp()
             bucket = self._buckets.get_bucket(ctx.message, current)
-            retry_after = bucket.update_rate_limit(current)
+            if self._buckets._backend is not None:
+                retry_after = await bucket._update_rate_limit_async(current)
+            else:
+                retry_after = bucket.update_rate_limit(current)
             if retry_after:
                 raise CommandOnCooldown(bucket, retry_after)
 
@@ -778,12 +905,13 @@ class Command(_BaseCommand):
 
         if self.cooldown_after_parsing:
             await self._parse_arguments(ctx)
-            self._prepare_cooldowns(ctx)
+            await self._prepare_cooldowns(ctx)
         else:
-            self._prepare_cooldowns(ctx)
+            await self._prepare_cooldowns(ctx)
             await self._parse_arguments(ctx)
 
         if self._max_concurrency is not None:
+            self._bind_cooldown_backend(ctx)
             await self._max_concurrency.acquire(ctx)
 
         await self.call_before_hooks(ctx)
@@ -804,6 +932,7 @@ class Command(_BaseCommand):
         if not self._buckets.valid:
             return False
 
+        self._bind_cooldown_backend(ctx)
         bucket = self._buckets.get_bucket(ctx.message)
         current = ctx.message.created_at.replace(tzinfo=datetime.timezone.utc).timestamp()
         return bucket.get_tokens(current) == 0
@@ -817,6 +946,7 @@ class Command(_BaseCommand):
             The invocation context to reset the cooldown under.
         """
         if self._buckets.valid:
+            self._bind_cooldown_backend(ctx)
             bucket = self._buckets.get_bucket(ctx.message)
             bucket.reset()
 
@@ -837,6 +967,7 @@ class Command(_BaseCommand):
             If this is ``0.0`` then the command isn't on cooldown.
         """
         if self._buckets.valid:
+            self._bind_cooldown_backend(ctx)
             bucket = self._buckets.get_bucket(ctx.message)
             current = ctx.message.created_at.replace(tzinfo=datetime.timezone.utc).timestamp()
             return bucket.get_retry_after(current)
@@ -985,7 +1116,18 @@ class Command(_BaseCommand):
         if self.usage is not None:
             return self.usage
 
+        # the parameters only change with the callback, except for
+        # the leading self parameter which depends on the cog
+        key = self.cog is None
+        cached = self._signature
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        signature = self._build_signature()
+        self._signature = (key, signature)
+        return signature
 
+    def _build_signature(self):
         params = self.clean_params
         if not params:
             return ''
@@ -1016,7 +1158,7 @@ class Command(_BaseCommand):
 
         return ' '.join(result)
 
-    async def can_run(self, ctx):
+    async def can_run(self, ctx, *, evaluator=None):
         """|coro|
 
         Checks if the command can be executed by checking all the predicates
@@ -1046,6 +1188,9 @@ class Command(_BaseCommand):
         if not self.enabled:
             raise DisabledCommand('{0.name} command is disabled'.format(self))
 
+        if evaluator is not None:
+            return await self._can_run_with(ctx, evaluator)
+
         original = ctx.command
         ctx.command = self
 
@@ -1070,6 +1215,29 @@ class Command(_BaseCommand):
         finally:
             ctx.command = original
 
+    async def _can_run_with(self, ctx, evaluator):
+        # the same as can_run except that checks go through a _CheckEvaluator
+        # shared by the help command and the context is copied so other
+        # commands can be checked concurrently
+        ctx = copy.copy(ctx)
+        ctx.command = self
+
+        # None can't collide with the cog or predicate keys
+        if not await evaluator.run(None, ctx.bot.can_run, ctx):
+            raise CheckFailure('The global check functions for command {0.qualified_name} failed.'.format(self))
+
+        cog = self.cog
+        if cog is not None:
+            local_check = Cog._get_overridden_method(cog.cog_check)
+            if local_check is not None:
+                if not await evaluator.run(cog, local_check, ctx):
+                    return False
+
+        for predicate in self.checks:
+            if not await evaluator.run(predicate, predicate, ctx):
+                return False
+        return True
+
 class GroupMixin:
     """A mixin that implements common functionality for classes that behave
     similar to :class:`.Group` and are allowed to register commands.
@@ -1082,6 +1250,11 @@ class GroupMixin:
     case_insensitive: :class:`bool`
         Whether the commands should be case insensitive. Defaults to ``False``.
     """
+
+    # bumped whenever any command tree changes so that
+    # information derived from it can be invalidated
+    _tree_version = 0
+
     def __init__(self, *args, **kwargs):
         case_insensitive = kwargs.get('case_insensitive', False)
         self.all_commands = _CaseInsensitiveDict() if case_insensitive else {}
@@ -1130,6 +1303,7 @@ class GroupMixin:
         if command.name in self.all_commands:
             raise CommandRegistrationError(command.name)
 
+        GroupMixin._tree_version += 1
         self.all_commands[command.name] = command
         for alias in command.aliases:
             if alias in self.all_commands:
@@ -1159,6 +1333,7 @@ class GroupMixin:
         if command is None:
             return None
 
+        GroupMixin._tree_version += 1
         if name in command.aliases:
             # we're removing an alias so we don't want to remove the rest
             return command
@@ -24,14 +24,16 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import asyncio
 import itertools
 import copy
 import functools
 import inspect
 import re
+import time
 import discord.utils
 
-from .core import Group, Command
+from .core import Group, Command, GroupMixin, _CheckEvaluator
 from .errors import CommandError
 
 __all__ = (
@@ -165,6 +167,64 @@ class Paginator:
         fmt = '<Paginator prefix: {0.prefix} suffix: {0.suffix} max_size: {0.max_size} count: {0._count}>'
         return fmt.format(self)
 
+class _HelpCache:
+    """Holds the information the copies of a help command share between invocations.
+
+    Everything is dropped whenever a command tree changes.
+    """
+
+    __slots__ = ('version', 'signatures', 'checks', 'pages')
+
+    MAX_SIGNATURES = 1024
+    MAX_CHECKS = 10000
+    MAX_PAGES = 256
+
+    def __init__(self):
+        self.version = None
+        # (command, clean_prefix) -> (expires, signature)
+        self.signatures = {}
+        # (command, user_id, channel_id) -> (expires, result)
+        self.checks = {}
+        # key -> (expires, pages)
+        self.pages = {}
+
+    def validate(self):
+        version = GroupMixin._tree_version
+        if self.version != version:
+            self.version = version
+            self.signatures.clear()
+            self.checks.clear()
+            self.pages.clear()
+
+    def get(self, mapping, key):
+        try:
+            expires, value = mapping[key]
+        except KeyError:
+            return None
+
+        if expires < time.monotonic():
+            del mapping[key]
+            return None
+        return value
+
+    def set(self, mapping, key, value, ttl, max_size):
+        if len(mapping) >= max_size:
+            mapping.clear()
+        mapping[key] = (time.monotonic() + ttl, value)
+
+@functools.lru_cache(maxsize=None)
+def _accepts_evaluator(cls):
+    # Command.can_run overrides written before the evaluator existed
+    can_run = cls.can_run
+    if can_run is Command.can_run:
+        return True
+
+    try:
+        params = inspect.signature(can_run).parameters
+    except (TypeError, ValueError):
+        return False
+    return 'evaluator' in params or any(p.kind is p.VAR_KEYWORD for p in params.values())
+
 def _not_overriden(f):
     f.__help_command_not_overriden__ = True
     return f
@@ -233,6 +293,7 @@ class _HelpCommandImpl(Command):
         cog.get_commands = wrapped_get_commands
         cog.walk_commands = wrapped_walk_commands
         self.cog = cog
+        GroupMixin._tree_version += 1
 
     def _eject_cog(self):
         if self.cog is None:
@@ -243,6 +304,7 @@ class _HelpCommandImpl(Command):
         cog.get_commands = cog.get_commands.__wrapped__
         cog.walk_commands = cog.walk_commands.__wrapped__
         self.cog = None
+        GroupMixin._tree_version += 1
 
 class HelpCommand:
     r"""The base implementation for help command formatting.
@@ -272,6 +334,25 @@ class HelpCommand:
         This allows you to change the command behaviour without actually changing
         the implementation of the command. The attributes will be the same as the
         ones passed in the :class:`.Command` constructor.
+    cache_ttl: Optional[:class:`float`]
+        The number of seconds to cache the results of the checks of a command per
+        user and channel, the command signatures and the pages built by the default
+        implementations. Pages are only reused for the same commands, prefix and
+        invocation name.
+        Everything cached is dropped when a command or cog is added or removed.
+        If ``None`` then nothing is cached. Defaults to ``None``.
+
+        .. versionadded:: 1.5
+    check_concurrency: Optional[:class:`int`]
+        The maximum number of checks :meth:`filter_commands` runs concurrently.
+        When set, the commands are checked concurrently and every distinct check,
+        such as the global bot checks or a cog's ``cog_check``, is only called once
+        per call to :meth:`filter_commands`, with :attr:`Context.command` set to
+        the first command requiring it. Commands overriding :meth:`.Command.can_run`
+        without accepting the ``evaluator`` keyword argument are checked on their own.
+        If ``None`` then the commands are checked one after the other. Defaults to ``None``.
+
+        .. versionadded:: 1.5
     """
 
     MENTION_TRANSFORMS = {
@@ -305,17 +386,47 @@ class HelpCommand:
     def __init__(self, **options):
         self.show_hidden = options.pop('show_hidden', False)
         self.verify_checks = options.pop('verify_checks', True)
+        self.cache_ttl = options.pop('cache_ttl', None)
+        self.check_concurrency = options.pop('check_concurrency', None)
         self.command_attrs = attrs = options.pop('command_attrs', {})
         attrs.setdefault('name', 'help')
         attrs.setdefault('help', 'Shows this message')
         self.context = None
         self._command_impl = None
+        self._cache = _HelpCache()
 
     def copy(self):
         obj = self.__class__(*self.__original_args__, **self.__original_kwargs__)
         obj._command_impl = self._command_impl
+        obj._cache = self._cache
         return obj
 
+    def _pages_key(self, *parts):
+        if self.cache_ttl is None:
+            return None
+        return parts + (self.clean_prefix, self.invoked_with)
+
+    def _restore_pages(self, key):
+        # restores the pages previously built for the key into the paginator
+        if key is None:
+            return False
+
+        cache = self._cache
+        cache.validate()
+        pages = cache.get(cache.pages, key)
+        if pages is None:
+            return False
+
+        self.paginator.clear()
+        self.paginator._pages = pages.copy()
+        return True
+
+    def _store_pages(self, key):
+        if key is not None:
+            cache = self._cache
+            cache.validate()
+            cache.set(cache.pages, key, self.paginator.pages.copy(), self.cache_ttl, cache.MAX_PAGES)
+
     def _add_to_bot(self, bot):
         command = _HelpCommandImpl(self, **self.command_attrs)
         bot.add_command(command)
@@ -425,6 +536,19 @@ class HelpCommand:
             The signature for the command.
         """
 
+        clean_prefix = self.clean_prefix
+        if self.cache_ttl is not None:
+            cache = self._cache
+            cache.validate()
+            signature = cache.get(cache.signatures, (command, clean_prefix))
+            if signature is None:
+                signature = self._command_signature(command, clean_prefix)
+                cache.set(cache.signatures, (command, clean_prefix), signature, self.cache_ttl, cache.MAX_SIGNATURES)
+            return signature
+
+        return self._command_signature(command, clean_prefix)
+
+    def _command_signature(self, command, clean_prefix):
         parent = command.full_parent_name
         if len(command.aliases) > 0:
             aliases = '|'.join(command.aliases)
@@ -435,7 +559,7 @@ class HelpCommand:
         else:
             alias = command.name if not parent else parent + ' ' + command.name
 
-        return '%s%s %s' % (self.clean_prefix, alias, command.signature)
+        return '%s%s %s' % (clean_prefix, alias, command.signature)
 
     def remove_mentions(self, string):
         """Removes mentions from the string to prevent abuse.
@@ -561,22 +685,58 @@ class HelpCommand:
             return sorted(iterator, key=key) if sort else list(iterator)
 
         # if we're here then we need to check every command if it can run
-        async def predicate(cmd):
-            try:
-                return await cmd.can_run(self.context)
-            except CommandError:
-                return False
-
-        ret = []
-        for cmd in iterator:
-            valid = await predicate(cmd)
-            if valid:
-                ret.append(cmd)
+        if self.check_concurrency is None:
+            async def predicate(cmd):
+                try:
+                    return await cmd.can_run(self.context)
+                except CommandError:
+                    return False
+        else:
+            evaluator = _CheckEvaluator(self.check_concurrency)
+            async def predicate(cmd):
+                try:
+                    if _accepts_evaluator(type(cmd)):
+                        return await cmd.can_run(self.context, evaluator=evaluator)
+                    # other commands are checked at the same time
+                    return await cmd.can_run(copy.copy(self.context))
+                except CommandError:
+                    return False
+
+        if self.cache_ttl is not None:
+            predicate = self._cached_predicate(predicate)
+
+        if self.check_concurrency is None:
+            ret = []
+            for cmd in iterator:
+                valid = await predicate(cmd)
+                if valid:
+                    ret.append(cmd)
+        else:
+            commands = list(iterator)
+            results = await asyncio.gather(*(predicate(cmd) for cmd in commands))
+            ret = [cmd for cmd, valid in zip(commands, results) if valid]
 
         if sort:
             ret.sort(key=key)
         return ret
 
+    def _cached_predicate(self, predicate):
+        cache = self._cache
+        cache.validate()
+        ctx = self.context
+        user_id = ctx.author.id
+        channel_id = ctx.channel.id
+
+        async def cached(cmd):
+            key = (cmd, user_id, channel_id)
+            result = cache.get(cache.checks, key)
+            if result is None:
+                result = await predicate(cmd)
+                cache.set(cache.checks, key, result, self.cache_ttl, cache.MAX_CHECKS)
+            return result
+
+        return cached
+
     def get_max_size(self, commands):
         """Returns the largest name length of the specified command list.
 
@@ -1004,16 +1164,20 @@ class DefaultHelpCommand(HelpCommand):
         ctx = self.context
         bot = ctx.bot
 
-        if bot.description:
-            # <description> portion
-            self.paginator.add_line(bot.description, empty=True)
-
         no_category = '\u200b{0.no_category}:'.format(self)
         def get_category(command, *, no_category=no_category):
             cog = command.cog
             return cog.qualified_name + ':' if cog is not None else no_category
 
         filtered = await self.filter_commands(bot.commands, sort=True, key=get_category)
+        key = self._pages_key(None, tuple(filtered), bot.description)
+        if self._restore_pages(key):
+            return await self.send_pages()
+
+        if bot.description:
+            # <description> portion
+            self.paginator.add_line(bot.description, empty=True)
+
         max_size = self.get_max_size(filtered)
         to_iterate = itertools.groupby(filtered, key=get_category)
 
@@ -1027,17 +1191,26 @@ class DefaultHelpCommand(HelpCommand):
             self.paginator.add_line()
             self.paginator.add_line(note)
 
+        self._store_pages(key)
         await self.send_pages()
 
     async def send_command_help(self, command):
+        key = self._pages_key(command)
+        if self._restore_pages(key):
+            return await self.send_pages()
+
         self.add_command_formatting(command)
         self.paginator.close_page()
+        self._store_pages(key)
         await self.send_pages()
 
     async def send_group_help(self, group):
-        self.add_command_formatting(group)
-
         filtered = await self.filter_commands(group.commands, sort=self.sort_commands)
+        key = self._pages_key(group, tuple(filtered))
+        if self._restore_pages(key):
+            return await self.send_pages()
+
+        self.add_command_formatting(group)
         self.add_indented_commands(filtered, heading=self.commands_heading)
 
         if filtered:
@@ -1046,13 +1219,18 @@ class DefaultHelpCommand(HelpCommand):
                 self.paginator.add_line()
                 self.paginator.add_line(note)
 
+        self._store_pages(key)
         await self.send_pages()
 
     async def send_cog_help(self, cog):
+        filtered = await self.filter_commands(cog.get_commands(), sort=self.sort_commands)
+        key = self._pages_key(cog, tuple(filtered))
+        if self._restore_pages(key):
+            return await self.send_pages()
+
         if cog.description:
             self.paginator.add_line(cog.description, empty=True)
 
-        filtered = await self.filter_commands(cog.get_commands(), sort=self.sort_commands)
         self.add_indented_commands(filtered, heading=self.commands_heading)
 
         note = self.get_ending_note()
@@ -1060,6 +1238,7 @@ class DefaultHelpCommand(HelpCommand):
             self.paginator.add_line()
             self.paginator.add_line(note)
 
+        self._store_pages(key)
         await self.send_pages()
 
 class MinimalHelpCommand(HelpCommand):
@@ -1235,6 +1414,16 @@ class MinimalHelpCommand(HelpCommand):
         ctx = self.context
         bot = ctx.bot
 
+        no_category = '\u200b{0.no_category}'.format(self)
+        def get_category(command, *, no_category=no_category):
+            cog = command.cog
+            return cog.qualified_name if cog is not None else no_category
+
+        filtered = await self.filter_commands(bot.commands, sort=True, key=get_category)
+        key = self._pages_key(None, tuple(filtered), bot.description)
+        if self._restore_pages(key):
+            return await self.send_pages()
+
         if bot.description:
             self.paginator.add_line(bot.description, empty=True)
 
@@ -1242,12 +1431,6 @@ class MinimalHelpCommand(HelpCommand):
         if note:
             self.paginator.add_line(note, empty=True)
 
-        no_category = '\u200b{0.no_category}'.format(self)
-        def get_category(command, *, no_category=no_category):
-            cog = command.cog
-            return cog.qualified_name if cog is not None else no_category
-
-        filtered = await self.filter_commands(bot.commands, sort=True, key=get_category)
         to_iterate = itertools.groupby(filtered, key=get_category)
 
         for category, commands in to_iterate:
@@ -1259,10 +1442,16 @@ class MinimalHelpCommand(HelpCommand):
             self.paginator.add_line()
             self.paginator.add_line(note)
 
+        self._store_pages(key)
         await self.send_pages()
 
     async def send_cog_help(self, cog):
         bot = self.context.bot
+        filtered = await self.filter_commands(cog.get_commands(), sort=self.sort_commands)
+        key = self._pages_key(cog, tuple(filtered), bot.description)
+        if self._restore_pages(key):
+            return await self.send_pages()
+
         if bot.description:
             self.paginator.add_line(bot.description, empty=True)
 
@@ -1273,7 +1462,6 @@ class MinimalHelpCommand(HelpCommand):
         if cog.description:
             self.paginator.add_line(cog.description, empty=True)
 
-        filtered = await self.filter_commands(cog.get_commands(), sort=self.sort_commands)
         if filtered:
             self.paginator.add_line('**%s %s**' % (cog.qualified_name, self.commands_heading))
             for command in filtered:
@@ -1284,12 +1472,17 @@ class MinimalHelpCommand(HelpCommand):
                 self.paginator.add_line()
                 self.paginator.add_line(note)
 
+        self._store_pages(key)
         await self.send_pages()
 
     async def send_group_help(self, group):
+        filtered = await self.filter_commands(group.commands, sort=self.sort_commands)
+        key = self._pages_key(group, tuple(filtered))
+        if self._restore_pages(key):
+            return await self.send_pages()
+
         self.add_command_formatting(group)
 
-        filtered = await self.filter_commands(group.commands, sort=self.sort_commands)
         if filtered:
             note = self.get_opening_note()
             if note:
@@ -1304,9 +1497,15 @@ class MinimalHelpCommand(HelpCommand):
                 self.paginator.add_line()
                 self.paginator.add_line(note)
 
+        self._store_pages(key)
         await self.send_pages()
 
     async def send_command_help(self, command):
+        key = self._pages_key(command)
+        if self._restore_pages(key):
+            return await self.send_pages()
+
         self.add_command_formatting(command)
         self.paginator.close_page()
+        self._store_pages(key)
         await self.send_pages()
@@ -28,6 +28,7 @@ import asyncio
 import concurrent.futures
 import json
 import logging
+import re
 import struct
 import sys
 import threading
@@ -71,6 +72,11 @@ class WebSocketClosure(Exception):
 
 EventListener = namedtuple('EventListener', 'predicate event result future')
 
+# When the envelope keys come before 'd' the event name and sequence
+# can be read without decoding 'd'. The keys may come in any order.
+_DISPATCH_HEADER = re.compile(rb'\{\s*((?:"(?:t|s|op)"\s*:\s*(?:"[A-Z_]+"|\d+|null)\s*,\s*)+)"d"\s*:')
+_HEADER_FIELD = re.compile(rb'"(t|s|op)"\s*:\s*(?:"([A-Z_]+)"|(\d+)|null)')
+
 
 class KeepAliveHandler(threading.Thread):
     def __init__(self, *args, **kwargs):
@@ -251,6 +257,13 @@ class DiscordWebSocket:
         self._buffer = bytearray()
         self._close_code = None
 
+        # event filtering, the raw names are kept as bytes
+        # so the header can be checked before decoding
+        self._allowed_events = None
+        self._allowed_raw_events = None
+        self._invalidating_events = frozenset()
+        self._invalidating_raw_events = frozenset()
+
     @property
     def open(self):
         return not self.socket.closed
@@ -280,6 +293,13 @@ class DiscordWebSocket:
         ws.sequence = sequence
         ws._max_heartbeat_timeout = client._connection.heartbeat_timeout
 
+        allowed_events = client._connection.allowed_events
+        if allowed_events is not None:
+            ws._allowed_events = allowed_events
+            ws._allowed_raw_events = frozenset(e.encode('ascii') for e in allowed_events)
+            ws._invalidating_events = invalidating = client._connection.filtered_invalidating_events
+            ws._invalidating_raw_events = frozenset(e.encode('ascii') for e in invalidating)
+
         client._connection._update_references(ws)
 
         log.debug('Created websocket connected to %s', gateway)
@@ -372,6 +392,36 @@ class DiscordWebSocket:
         await self.send_as_json(payload)
         log.info('Shard ID %s has sent the RESUME payload.', self.shard_id)
 
+    def _is_filtered(self, event):
+        # events that are explicitly waited for are never filtered
+        return event not in self._allowed_events and all(entry.event != event for entry in self._dispatch_listeners)
+
+    def _skip_filtered(self, msg):
+        # the header is at the start, so only that part has to be encoded
+        header = msg[:256]
+        if type(header) is str:
+            header = header.encode('utf-8')
+
+        match = _DISPATCH_HEADER.match(header)
+        if match is None:
+            return False
+
+        fields = {key: name or number for key, name, number in _HEADER_FIELD.findall(match.group(1))}
+        raw_event = fields.get(b't')
+        seq = fields.get(b's')
+        if fields.get(b'op') != b'0' or not raw_event or not seq:
+            return False
+
+        if raw_event in self._allowed_raw_events or raw_event in self._invalidating_raw_events:
+            return False
+
+        if not self._is_filtered(raw_event.decode('ascii')):
+            return False
+
+        # the sequence still has to be tracked so RESUME works
+        self.sequence = int(seq)
+        return True
+
     async def received_message(self, msg):
         self._dispatch('socket_raw_receive', msg)
 
@@ -381,15 +431,33 @@ class DiscordWebSocket:
             if len(msg) >= 4:
                 if msg[-4:] == b'\x00\x00\xff\xff':
                     msg = self._zlib.decompress(self._buffer)
-                    msg = msg.decode('utf-8')
                     self._buffer = bytearray()
+                    if self._allowed_events is not None and self._skip_filtered(msg):
+                        return
+                    msg = msg.decode('utf-8')
                 else:
                     return
             else:
                 return
+        elif self._allowed_events is not None and self._skip_filtered(msg):
+            return
 
         msg = json.loads(msg)
 
+        if self._allowed_events is not None and msg.get('op') == self.DISPATCH and self._is_filtered(msg.get('t')):
+            # the header could not be read without decoding, e.g. 'd' came first
+            seq = msg.get('s')
+            if seq is not None:
+                self.sequence = seq
+
+            event = msg.get('t')
+            if event in self._invalidating_events:
+                # cached REST responses go stale even if the event is not wanted
+                self._connection.invalidate_responses(event, msg['d'])
+
+            log.debug('Filtered event %s.', event)
+            return
+
         log.debug('For Shard ID %s: WebSocket Event: %s', self.shard_id, msg)
         self._dispatch('socket_response', msg)
 
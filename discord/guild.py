@@ -29,11 +29,11 @@ from collections import namedtuple
 
 from . import utils
 from .role import Role
-from .member import Member, VoiceState
+from .member import Member, VoiceState, _CompactMemberStore
 from .activity import create_activity
 from .emoji import Emoji
 from .errors import InvalidData
-from .permissions import PermissionOverwrite
+from .permissions import PermissionOverwrite, _PermissionCache
 from .colour import Colour
 from .errors import InvalidArgument, ClientException
 from .channel import *
@@ -171,7 +171,8 @@ class Guild(Hashable):
                  'description', 'max_presences', 'max_members', 'max_video_channel_users',
                  'premium_tier', 'premium_subscription_count', '_system_channel_flags',
                  'preferred_locale', 'discovery_splash', '_rules_channel_id',
-                 '_public_updates_channel_id')
+                 '_public_updates_channel_id', '_role_members', '_member_names',
+                 '_channel_names', '_permission_cache')
 
     _PREMIUM_GUILD_LIMITS = {
         None: _GuildLimit(emoji=50, bitrate=96e3, filesize=8388608),
@@ -184,24 +185,182 @@ class Guild(Hashable):
     def __init__(self, *, data, state):
         self._channels = {}
         self._members = {}
+        # reverse indexes, the values are dicts used as ordered sets of member IDs
+        self._role_members = {}
+        self._member_names = {}
+        self._channel_names = {}
         self._voice_states = {}
         self._state = state
+        cache_size = state.permission_cache_size
+        self._permission_cache = None if cache_size is None else _PermissionCache(cache_size)
         self._from_data(data)
 
     def _add_channel(self, channel):
+        existing = self._channels.get(channel.id)
+        if existing is not None:
+            self._unindex_channel(channel.id, existing.name)
         self._channels[channel.id] = channel
+        self._index_channel(channel.id, channel.name)
 
     def _remove_channel(self, channel):
-        self._channels.pop(channel.id, None)
+        existing = self._channels.pop(channel.id, None)
+        if existing is not None:
+            self._unindex_channel(channel.id, existing.name)
+        self._invalidate_channel_permissions(channel.id)
+
+    def _rename_channel(self, channel, before):
+        if before != channel.name:
+            self._unindex_channel(channel.id, before)
+            self._index_channel(channel.id, channel.name)
+
+    def _index_channel(self, channel_id, name):
+        try:
+            self._channel_names[name][channel_id] = None
+        except KeyError:
+            self._channel_names[name] = {channel_id: None}
+
+    def _unindex_channel(self, channel_id, name):
+        try:
+            channels = self._channel_names[name]
+            del channels[channel_id]
+        except KeyError:
+            return
+
+        if not channels:
+            del self._channel_names[name]
+
+    def _get_channel_named(self, name, cls):
+        # resolves ties the same way as the sorted channel lists
+        result = None
+        for channel_id in self._channel_names.get(name, ()):
+            channel = self._channels.get(channel_id)
+            if isinstance(channel, cls) and channel.name == name:
+                if result is None or (channel.position, channel.id) < (result.position, result.id):
+                    result = channel
+        return result
+
+    def _invalidate_permissions(self):
+        if self._permission_cache is not None:
+            self._permission_cache.clear()
+
+    def _invalidate_channel_permissions(self, channel_id):
+        if self._permission_cache is not None:
+            self._permission_cache.invalidate_channel(channel_id)
+
+    def _invalidate_member_permissions(self, member_id):
+        if self._permission_cache is not None:
+            self._permission_cache.invalidate_member(member_id)
 
     def _voice_state_for(self, user_id):
         return self._voice_states.get(user_id)
 
+    def _is_cached(self):
+        return self._state._get_guild(self.id) is self
+
     def _add_member(self, member):
-        self._members[member.id] = member
+        member_id = member.id
+        members = self._members
+        if member_id in members:
+            existing = members[member_id]
+            if existing is not member:
+                self._unindex_member(existing)
+                self._index_member(member)
+                self._invalidate_member_permissions(member_id)
+        else:
+            if self._is_cached():
+                self._state._users.reference(member_id)
+            self._index_member(member)
+
+        members[member_id] = member
 
     def _remove_member(self, member):
-        self._members.pop(member.id, None)
+        existing = self._members.pop(member.id, None)
+        if existing is not None:
+            self._unindex_member(existing)
+            self._invalidate_member_permissions(member.id)
+            if self._is_cached():
+                self._state._release_user(member.id)
+
+    def _update_member(self, before, member):
+        # the member was modified in place so the
+        # indexes are updated from the snapshot
+        member_id = member.id
+        self._members[member_id] = member
+
+        old_roles = set(before._roles)
+        new_roles = set(member._roles)
+        if old_roles != new_roles:
+            self._unindex_roles(member_id, old_roles - new_roles)
+            self._index_roles(member_id, new_roles - old_roles)
+            self._invalidate_member_permissions(member_id)
+
+        if before.nick != member.nick:
+            if before.nick != member.name:
+                self._unindex_name(member_id, before.nick)
+            self._index_name(member_id, member.nick)
+
+    def _rename_member(self, member_id, before, after):
+        member = self._members.get(member_id)
+        if member is not None:
+            if before != member.nick:
+                self._unindex_name(member_id, before)
+            self._index_name(member_id, after)
+
+    def _index_member(self, member):
+        member_id = member.id
+        self._index_roles(member_id, member._roles)
+        self._index_name(member_id, member.name)
+        self._index_name(member_id, member.nick)
+
+    def _unindex_member(self, member):
+        member_id = member.id
+        self._unindex_roles(member_id, member._roles)
+        self._unindex_name(member_id, member.name)
+        self._unindex_name(member_id, member.nick)
+
+    def _index_roles(self, member_id, role_ids):
+        role_members = self._role_members
+        for role_id in role_ids:
+            try:
+                role_members[role_id][member_id] = None
+            except KeyError:
+                role_members[role_id] = {member_id: None}
+
+    def _unindex_roles(self, member_id, role_ids):
+        role_members = self._role_members
+        for role_id in role_ids:
+            try:
+                members = role_members[role_id]
+                del members[member_id]
+            except KeyError:
+                continue
+
+            if not members:
+                del role_members[role_id]
+
+    def _index_name(self, member_id, name):
+        if name is None:
+            return
+
+        try:
+            self._member_names[name][member_id] = None
+        except KeyError:
+            self._member_names[name] = {member_id: None}
+
+    def _unindex_name(self, member_id, name):
+        try:
+            members = self._member_names[name]
+            del members[member_id]
+        except KeyError:
+            return
+
+        if not members:
+            del self._member_names[name]
+
+    def _members_with_role(self, role_id):
+        get_member = self.get_member
+        members = (get_member(member_id) for member_id in self._role_members.get(role_id, ()))
+        return [member for member in members if member is not None]
 
     def __str__(self):
         return self.name
@@ -255,6 +414,8 @@ class Guild(Hashable):
     def _remove_role(self, role_id):
         # this raises KeyError if it fails..
         role = self._roles.pop(role_id)
+        self._role_members.pop(role_id, None)
+        self._invalidate_permissions()
 
         # since it didn't, we can change the positions now
         # basically the same as above except we only decrement
@@ -281,6 +442,8 @@ class Guild(Hashable):
         self.banner = guild.get('banner')
         self.unavailable = guild.get('unavailable', False)
         self.id = int(guild['id'])
+        # roles and the owner may change here
+        self._invalidate_permissions()
         self._roles = {}
         state = self._state # speed up attribute access
         for r in guild.get('roles', []):
@@ -304,6 +467,10 @@ class Guild(Hashable):
         self._rules_channel_id = utils._get_as_snowflake(guild, 'rules_channel_id')
         self._public_updates_channel_id = utils._get_as_snowflake(guild, 'public_updates_channel_id')
 
+        threshold = state.compact_member_threshold
+        if threshold is not None and member_count is not None and member_count >= threshold and not self._members:
+            self._members = _CompactMemberStore(self)
+
         for mdata in guild.get('members', []):
             member = Member(data=mdata, guild=self, state=state)
             self._add_member(member)
@@ -525,6 +692,17 @@ class Guild(Hashable):
         """
         return self._members.get(user_id)
 
+    @property
+    def permission_cache_info(self):
+        """Optional[:class:`tuple`]: A named tuple of the permission cache's ``hits``, ``misses``,
+        ``maxsize`` and ``currsize``, similar to :func:`functools.lru_cache`. ``None`` if
+        the permission cache is disabled.
+
+        .. versionadded:: 1.5
+        """
+        cache = self._permission_cache
+        return None if cache is None else cache.info()
+
     @property
     def premium_subscribers(self):
         """List[:class:`Member`]: A list of members who have "boosted" this guild."""
@@ -759,24 +937,32 @@ class Guild(Hashable):
             then ``None`` is returned.
         """
 
-        result = None
-        members = self.members
+        username = None
         if len(name) > 5 and name[-5] == '#':
             # The 5 length is checking to see if #0000 is in the string,
             # as a#0000 has a length of 6, the minimum for a potential
             # discriminator lookup.
             potential_discriminator = name[-4:]
+            username = name[:-5]
 
             # do the actual lookup and return if found
             # if it isn't found then we'll do a full name lookup below.
-            result = utils.get(members, name=name[:-5], discriminator=potential_discriminator)
-            if result is not None:
-                return result
+            for member in self._named(username):
+                if member.name == username and member.discriminator == potential_discriminator:
+                    return member
+
+        for member in self._named(name):
+            if member.nick == name or member.name == name:
+                return member
 
-        def pred(m):
-            return m.nick == name or m.name == name
+        return None
 
-        return utils.find(pred, members)
+    def _named(self, name):
+        # the index is updated on every path that changes a name or a
+        # nickname, so members missing from it don't have that name
+        get_member = self.get_member
+        members = (get_member(member_id) for member_id in self._member_names.get(name, ()))
+        return [member for member in members if member is not None]
 
     def _create_channel(self, name, overwrites, channel_type, category=None, **options):
         if overwrites is None:
@@ -894,7 +1080,7 @@ class Guild(Hashable):
         channel = TextChannel(state=self._state, guild=self, data=data)
 
         # temporarily add to the cache
-        self._channels[channel.id] = channel
+        self._add_channel(channel)
         return channel
 
     async def create_voice_channel(self, name, *, overwrites=None, category=None, reason=None, **options):
@@ -928,7 +1114,7 @@ class Guild(Hashable):
         channel = VoiceChannel(state=self._state, guild=self, data=data)
 
         # temporarily add to the cache
-        self._channels[channel.id] = channel
+        self._add_channel(channel)
         return channel
 
     async def create_category(self, name, *, overwrites=None, reason=None, position=None):
@@ -959,7 +1145,7 @@ class Guild(Hashable):
         channel = CategoryChannel(state=self._state, guild=self, data=data)
 
         # temporarily add to the cache
-        self._channels[channel.id] = channel
+        self._add_channel(channel)
         return channel
 
     create_category_channel = create_category
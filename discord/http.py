@@ -25,16 +25,22 @@ DEALINGS IN THE SOFTWARE.
 """
 
 import asyncio
+import collections
+import copy
+import inspect
 import json
 import logging
 import sys
+import time
 from urllib.parse import quote as _uriquote
-import weakref
 
 import aiohttp
 
 from .errors import HTTPException, Forbidden, NotFound, LoginFailure, GatewayNotFound
 from .gateway import DiscordClientWebSocketResponse
+from .ratelimits import MemoryRateLimitStore
+from .enums import RequestPriority
+from .metrics import RequestTrace
 from . import __version__, utils
 
 log = logging.getLogger(__name__)
@@ -71,20 +77,236 @@ class Route:
         # the bucket is just method + path w/ major parameters
         return '{0.channel_id}:{0.guild_id}:{0.path}'.format(self)
 
-class MaybeUnlock:
-    def __init__(self, lock):
-        self.lock = lock
-        self._unlock = True
+_DEFAULT_PRIORITIES = {
+    ('POST', '/channels/{channel_id}/messages'): RequestPriority.high,
+    ('PATCH', '/channels/{channel_id}/messages/{message_id}'): RequestPriority.high,
+    ('POST', '/channels/{channel_id}/typing'): RequestPriority.high,
+    ('DELETE', '/channels/{channel_id}/messages/{message_id}'): RequestPriority.low,
+    ('POST', '/channels/{channel_id}/messages/bulk_delete'): RequestPriority.low,
+    ('GET', '/channels/{channel_id}/messages'): RequestPriority.low,
+    ('PUT', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}'): RequestPriority.low,
+    ('DELETE', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}'): RequestPriority.low,
+    ('GET', '/guilds/{guild_id}/members'): RequestPriority.low,
+    ('GET', '/guilds/{guild_id}/audit-logs'): RequestPriority.low,
+}
+
+class _DeleteBatcher:
+    """Coalesces single message deletions in a channel into bulk deletions.
+
+    Deletions are collected for ``window`` seconds per channel and audit log
+    reason and then sent as one bulk deletion of up to 100 messages. Messages
+    that are too old for a bulk deletion are deleted one by one. If the bulk
+    deletion fails, each message is deleted on its own instead so that every
+    caller receives the result for its own message. Pending batches are sent
+    right away when the client is closed.
+    """
+
+    # bulk deletions only accept messages younger than 14 days, leave a
+    # minute of margin for the time spent waiting for the batch
+    MAX_AGE = 14 * 24 * 60 * 60 - 60
+
+    def __init__(self, http, window):
+        self.http = http
+        self.window = window
+        self._pending = {}
+        self._sending = set()
+
+    def _too_old(self, message_id):
+        minimum = int((time.time() - self.MAX_AGE) * 1000.0 - utils.DISCORD_EPOCH) << 22
+        return int(message_id) < minimum
+
+    def delete(self, channel_id, message_id, reason):
+        loop = self.http.loop
+        if self._too_old(message_id):
+            return loop.create_task(self.http._delete_message(channel_id, message_id, reason=reason))
+
+        key = (channel_id, reason)
+        try:
+            batch = self._pending[key]
+        except KeyError:
+            batch = self._pending[key] = {}
+            loop.call_later(self.window, self._flush, key, batch)
+
+        future = loop.create_future()
+        batch.setdefault(message_id, []).append(future)
+        if len(batch) >= 100:
+            self._flush(key, batch)
+        return future
+
+    def _flush(self, key, batch):
+        if self._pending.get(key) is not batch:
+            # flushed already since it was full
+            return
+        del self._pending[key]
+        task = self.http.loop.create_task(self._send(key, batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
 
-    def __enter__(self):
-        return self
+    async def close(self):
+        # send the batches still waiting for their window right away so
+        # that nobody waits on a deletion that would never be sent
+        for key, batch in list(self._pending.items()):
+            self._flush(key, batch)
+
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    async def _send(self, key, batch):
+        channel_id, reason = key
+        if len(batch) > 1:
+            try:
+                await self.http.delete_messages(channel_id, list(batch), reason=reason)
+            except HTTPException as exc:
+                log.debug('Bulk deletion of %s messages in %s failed (%s), deleting them one by one.',
+                          len(batch), channel_id, exc)
+            except Exception as exc:
+                for futures in batch.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(exc)
+                return
+            else:
+                for futures in batch.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(None)
+                return
+
+        async def delete(message_id, futures):
+            try:
+                result = await self.http._delete_message(channel_id, message_id, reason=reason)
+            except Exception as exc:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for future in futures:
+                    if not future.done():
+                        future.set_result(result)
+
+        await asyncio.gather(*[delete(message_id, futures) for message_id, futures in batch.items()])
+
+ConnectionInfo = collections.namedtuple('ConnectionInfo', 'created reused queued')
+
+_DEFAULT_CONNECTOR_OPTIONS = {
+    'limit': 100,
+    'limit_per_host': 0,
+    # Discord keeps idle connections open for a while, so don't throw them away too early
+    'keepalive_timeout': 60.0,
+    'ttl_dns_cache': 300,
+    'happy_eyeballs_delay': 0.25,
+}
+
+# happy eyeballs is only supported by newer versions of aiohttp
+_SUPPORTS_HAPPY_EYEBALLS = 'happy_eyeballs_delay' in inspect.signature(aiohttp.TCPConnector).parameters
+
+# GET routes whose responses may be cached and for how many seconds
+_CACHEABLE_ROUTES = {
+    '/users/{user_id}': 60.0,
+    '/channels/{channel_id}': 30.0,
+    '/guilds/{guild_id}': 30.0,
+    '/guilds/{guild_id}/members/{member_id}': 30.0,
+    '/invite/{invite_id}': 30.0,
+    '/oauth2/applications/@me': 300.0,
+}
+
+class _ResponseCache:
+    """A TTL and LRU cache for the responses of idempotent GET routes.
+
+    Concurrent requests for the same resource share a single request. Every
+    caller receives its own copy of the data since the library mutates
+    payloads in a few places.
+    """
+
+    def __init__(self, maxsize, ttls=None):
+        self.maxsize = maxsize
+        self.ttls = dict(_CACHEABLE_ROUTES)
+        if ttls is not None:
+            self.ttls.update(ttls)
+        self._entries = collections.OrderedDict()
+        self._urls = {}
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_for(self, route):
+        if route.method != 'GET':
+            return None
+        return self.ttls.get(route.path)
+
+    def _discard(self, key):
+        self._entries.pop(key, None)
+        keys = self._urls.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._urls[key[0]]
+
+    async def fetch(self, route, params, ttl, request):
+        key = (route.url, tuple(sorted(params.items())) if params else ())
+        loop = asyncio.get_event_loop()
+        try:
+            expires, data = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            if expires > loop.time():
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return copy.deepcopy(data)
+            self._discard(key)
+
+        future = self._pending.get(key)
+        while future is not None:
+            try:
+                data = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # the request we were waiting for got cancelled, so try again
+                future = self._pending.get(key)
+            else:
+                self.hits += 1
+                return copy.deepcopy(data)
 
-    def defer(self):
-        self._unlock = False
+        self.misses += 1
+        future = self._pending[key] = loop.create_future()
+        try:
+            data = await request()
+        except BaseException as exc:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+            if isinstance(exc, Exception):
+                future.set_exception(exc)
+                # the waiters receive the error, don't warn about it going unretrieved
+                future.exception()
+            else:
+                future.cancel()
+            raise
 
-    def __exit__(self, type, value, traceback):
-        if self._unlock:
-            self.lock.release()
+        future.set_result(data)
+        if self._pending.get(key) is future:
+            # only store the response if it was not invalidated in the meantime
+            del self._pending[key]
+            self._entries[key] = (loop.time() + ttl, data)
+            self._urls.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+        return copy.deepcopy(data)
+
+    def invalidate(self, url):
+        for key in list(self._urls.get(url, ())):
+            self._discard(key)
+        for key in [key for key in self._pending if key[0] == url]:
+            del self._pending[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._urls.clear()
+        self._pending.clear()
+
+    def info(self):
+        return utils.CacheInfo(hits=self.hits, misses=self.misses, maxsize=self.maxsize, currsize=len(self._entries))
 
 # For some reason, the Discord voice websocket expects this header to be
 # completely lowercase while aiohttp respects spec and does it as case-insensitive
@@ -96,25 +318,84 @@ class HTTPClient:
     SUCCESS_LOG = '{method} {url} has received {text}'
     REQUEST_LOG = '{method} {url} with {json} has returned {status}'
 
-    def __init__(self, connector=None, *, proxy=None, proxy_auth=None, loop=None, unsync_clock=True):
+    def __init__(self, connector=None, *, proxy=None, proxy_auth=None, loop=None, unsync_clock=True,
+                 global_rate_limit=None, rate_limit_store=None, request_priorities=None, bulk_delete_window=None,
+                 connector_options=None, response_cache_size=None, response_cache_ttls=None, request_metrics=None):
         self.loop = asyncio.get_event_loop() if loop is None else loop
         self.connector = connector
+        self.connector_options = dict(_DEFAULT_CONNECTOR_OPTIONS)
+        if connector_options is not None:
+            self.connector_options.update(connector_options)
         self.__session = None # filled in static_login
-        self._locks = weakref.WeakValueDictionary()
-        self._global_over = asyncio.Event()
-        self._global_over.set()
+        self._connections_created = 0
+        self._connections_reused = 0
+        self._connections_queued = 0
         self.token = None
         self.bot_token = False
         self.proxy = proxy
         self.proxy_auth = proxy_auth
         self.use_clock = not unsync_clock
+        # a store passed in is closed by whoever created it
+        self._owns_rate_limits = rate_limit_store is None
+        if rate_limit_store is None:
+            rate_limit_store = MemoryRateLimitStore(global_rate_limit=global_rate_limit, loop=self.loop)
+        elif global_rate_limit is not None:
+            raise TypeError('global_rate_limit must be passed to the rate limit store instead')
+        self._rate_limits = rate_limit_store
+        self._priorities = dict(_DEFAULT_PRIORITIES)
+        if request_priorities is not None:
+            self._priorities.update(request_priorities)
+        self._metrics = request_metrics
+        if response_cache_size is not None:
+            if response_cache_size <= 0:
+                raise ValueError('response_cache_size must be greater than 0')
+            self._response_cache = _ResponseCache(response_cache_size, response_cache_ttls)
+        else:
+            self._response_cache = None
+        if bulk_delete_window is not None:
+            self._delete_batcher = _DeleteBatcher(self, bulk_delete_window)
+        else:
+            self._delete_batcher = None
 
         user_agent = 'DiscordBot (https://github.com/Rapptz/discord.py {0}) Python/{1[0]}.{1[1]} aiohttp/{2}'
         self.user_agent = user_agent.format(__version__, sys.version_info, aiohttp.__version__)
 
+    def _create_session(self):
+        connector = self.connector
+        if connector is None:
+            options = self.connector_options.copy()
+            if not _SUPPORTS_HAPPY_EYEBALLS or options.get('happy_eyeballs_delay') is None:
+                options.pop('happy_eyeballs_delay', None)
+            connector = aiohttp.TCPConnector(**options)
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._on_connection_created)
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        trace.on_connection_queued_start.append(self._on_connection_queued)
+        return aiohttp.ClientSession(connector=connector, ws_response_class=DiscordClientWebSocketResponse,
+                                     trace_configs=[trace])
+
+    async def _on_connection_created(self, session, context, params):
+        self._connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params):
+        self._connections_reused += 1
+
+    async def _on_connection_queued(self, session, context, params):
+        self._connections_queued += 1
+
+    def connection_info(self):
+        return ConnectionInfo(created=self._connections_created, reused=self._connections_reused,
+                              queued=self._connections_queued)
+
+    @property
+    def _session(self):
+        # the session shared with webhooks created by the client
+        return self.__session
+
     def recreate(self):
         if self.__session.closed:
-            self.__session = aiohttp.ClientSession(connector=self.connector, ws_response_class=DiscordClientWebSocketResponse)
+            self.__session = self._create_session()
 
     async def ws_connect(self, url, *, compress=0):
         kwargs = {
@@ -131,16 +412,18 @@ class HTTPClient:
 
         return await self.__session.ws_connect(url, **kwargs)
 
-    async def request(self, route, *, files=None, **kwargs):
-        bucket = route.bucket
-        method = route.method
-        url = route.url
+    async def request(self, route, *, files=None, priority=None, **kwargs):
+        cache = self._response_cache
+        if cache is not None:
+            ttl = cache.ttl_for(route)
+            if ttl:
+                params = kwargs.get('params')
+                return await cache.fetch(route, params, ttl, lambda: self._request(route, priority=priority, **kwargs))
+
+        return await self._request(route, files=files, priority=priority, **kwargs)
 
-        lock = self._locks.get(bucket)
-        if lock is None:
-            lock = asyncio.Lock()
-            if bucket is not None:
-                self._locks[bucket] = lock
+    async def _request(self, route, *, files=None, priority=None, **kwargs):
+        method = route.method
 
         # header creation
         headers = {
@@ -165,94 +448,157 @@ class HTTPClient:
 
         kwargs['headers'] = headers
 
+        if priority is None:
+            priority = self._priorities.get((method, route.path), RequestPriority.normal)
+
         # Proxy support
         if self.proxy is not None:
             kwargs['proxy'] = self.proxy
         if self.proxy_auth is not None:
             kwargs['proxy_auth'] = self.proxy_auth
 
-        if not self._global_over.is_set():
-            # wait until the global lock is complete
-            await self._global_over.wait()
-
-        await lock.acquire()
-        with MaybeUnlock(lock) as maybe_lock:
-            for tries in range(5):
-                if files:
-                    for f in files:
-                        f.reset(seek=tries)
-                try:
-                    async with self.__session.request(method, url, **kwargs) as r:
-                        log.debug('%s %s with %s has returned %s', method, url, kwargs.get('data'), r.status)
-
-                        # even errors have text involved in them so this is safe to call
-                        data = await json_or_text(r)
-
-                        # check if we have rate limit header information
-                        remaining = r.headers.get('X-Ratelimit-Remaining')
-                        if remaining == '0' and r.status != 429:
-                            # we've depleted our current bucket
-                            delta = utils._parse_ratelimit_header(r, use_clock=self.use_clock)
-                            log.debug('A rate limit bucket has been exhausted (bucket: %s, retry: %s).', bucket, delta)
-                            maybe_lock.defer()
-                            self.loop.call_later(delta, lock.release)
-
-                        # the request was successful so just return the text/json
-                        if 300 > r.status >= 200:
-                            log.debug('%s %s has received %s', method, url, data)
-                            return data
-
-                        # we are being rate limited
-                        if r.status == 429:
-                            if not r.headers.get('Via'):
-                                # Banned by Cloudflare more than likely.
-                                raise HTTPException(r, data)
-
-                            fmt = 'We are being rate limited. Retrying in %.2f seconds. Handled under the bucket "%s"'
-
-                            # sleep a bit
-                            retry_after = data['retry_after'] / 1000.0
-                            log.warning(fmt, retry_after, bucket)
-
-                            # check if it's a global rate limit
-                            is_global = data.get('global', False)
-                            if is_global:
-                                log.warning('Global rate limit has been hit. Retrying in %.2f seconds.', retry_after)
-                                self._global_over.clear()
-
-                            await asyncio.sleep(retry_after)
-                            log.debug('Done sleeping for the rate limit. Retrying...')
-
-                            # release the global lock now that the
-                            # global rate limit has passed
-                            if is_global:
-                                self._global_over.set()
-                                log.debug('Global rate limit is now over.')
-
-                            continue
-
-                        # we've received a 500 or 502, unconditional retry
-                        if r.status in {500, 502}:
-                            await asyncio.sleep(1 + tries * 2)
-                            continue
-
-                        # the usual error cases
-                        if r.status == 403:
-                            raise Forbidden(r, data)
-                        elif r.status == 404:
-                            raise NotFound(r, data)
-                        else:
+        metrics = self._metrics
+        trace = None if metrics is None else RequestTrace(method, route.path)
+        try:
+            return await self._send(route, files, priority, kwargs, trace)
+        except Exception as exc:
+            if trace is not None:
+                trace.error = exc
+            raise
+        finally:
+            if trace is not None:
+                trace.total_time = time.perf_counter() - trace._start
+                metrics.record(trace)
+
+    async def _send(self, route, files, priority, kwargs, trace):
+        method = route.method
+        url = route.url
+        rate_limited = False
+        for tries in range(5):
+            if files:
+                for f in files:
+                    f.reset(seek=tries)
+
+            if trace is None:
+                ticket = await self._rate_limits.acquire(route, priority=priority)
+            else:
+                trace.attempts += 1
+                started = time.perf_counter()
+                ticket, global_wait = await self._rate_limits._acquire_timed(route, priority)
+                sent = time.perf_counter()
+                waited = sent - started
+                if rate_limited:
+                    # waiting for the 429 of the previous attempt to pass
+                    trace.retry_after_wait += waited
+                else:
+                    global_wait = min(global_wait, waited)
+                    trace.global_wait += global_wait
+                    trace.bucket_wait += waited - global_wait
+                trace.bucket = ticket.key
+            rate_limited = False
+
+            released = False
+            try:
+                async with self.__session.request(method, url, **kwargs) as r:
+                    log.debug('%s %s with %s has returned %s', method, url, kwargs.get('data'), r.status)
+
+                    # even errors have text involved in them so this is safe to call
+                    data = await json_or_text(r)
+
+                    if trace is not None:
+                        trace.network_time += time.perf_counter() - sent
+                        trace.status = r.status
+                        trace.size += len(await r.read())
+
+                    # update the bucket with the rate limit header information
+                    if r.status != 429:
+                        released = True
+                        await self._release(route, ticket, r)
+
+                    # the request was successful so just return the text/json
+                    if 300 > r.status >= 200:
+                        log.debug('%s %s has received %s', method, url, data)
+                        return data
+
+                    # we are being rate limited
+                    if r.status == 429:
+                        if not r.headers.get('Via'):
+                            # Banned by Cloudflare more than likely.
                             raise HTTPException(r, data)
 
-                # This is handling exceptions from the request
-                except OSError as e:
-                    # Connection reset by peer
-                    if tries < 4 and e.errno in (54, 10054):
+                        fmt = 'We are being rate limited. Retrying in %.2f seconds. Handled under the bucket "%s"'
+
+                        retry_after = data['retry_after'] / 1000.0
+                        log.warning(fmt, retry_after, ticket.key)
+
+                        # the next try waits for the rate limit to pass before it is sent
+                        if trace is not None:
+                            trace.rate_limited += 1
+                        rate_limited = released = True
+                        if data.get('global', False):
+                            log.warning('Global rate limit has been hit. Retrying in %.2f seconds.', retry_after)
+                            await self._rate_limits.release(route, ticket)
+                            await self._rate_limits.set_global(retry_after)
+                        else:
+                            await self._rate_limits.exhaust(route, ticket, retry_after)
+                        continue
+
+                    # we've received a 500 or 502, unconditional retry
+                    if r.status in {500, 502}:
+                        if trace is not None:
+                            trace.retry_wait += 1 + tries * 2
+                        await asyncio.sleep(1 + tries * 2)
                         continue
-                    raise
 
-            # We've run out of retries, raise.
-            raise HTTPException(r, data)
+                    # the usual error cases
+                    if r.status == 403:
+                        raise Forbidden(r, data)
+                    elif r.status == 404:
+                        raise NotFound(r, data)
+                    else:
+                        raise HTTPException(r, data)
+
+            # This is handling exceptions from the request
+            except OSError as e:
+                # Connection reset by peer
+                if tries < 4 and e.errno in (54, 10054):
+                    continue
+                raise
+            finally:
+                if not released:
+                    await self._rate_limits.release(route, ticket)
+
+        # We've run out of retries, raise.
+        raise HTTPException(r, data)
+
+    async def _release(self, route, ticket, response):
+        headers = response.headers
+        remaining = headers.get('X-Ratelimit-Remaining')
+        if remaining is None:
+            await self._rate_limits.release(route, ticket)
+            return
+
+        limit = headers.get('X-Ratelimit-Limit')
+        try:
+            reset_after = utils._parse_ratelimit_header(response, use_clock=self.use_clock)
+        except (KeyError, ValueError):
+            reset_after = None
+
+        await self._rate_limits.release(route, ticket, limit=int(limit) if limit is not None else None,
+                                        remaining=int(remaining), reset_after=reset_after,
+                                        bucket=headers.get('X-Ratelimit-Bucket'))
+
+    def invalidate_response(self, path, **parameters):
+        if self._response_cache is not None:
+            self._response_cache.invalidate(Route('GET', path, **parameters).url)
+
+    def response_cache_info(self):
+        if self._response_cache is None:
+            return None
+        return self._response_cache.info()
+
+    def global_rate_limit_info(self):
+        return self._rate_limits.global_info()
 
     async def get_from_cdn(self, url):
         async with self.__session.get(url) as resp:
@@ -268,8 +614,12 @@ class HTTPClient:
     # state management
 
     async def close(self):
+        if self._delete_batcher is not None:
+            await self._delete_batcher.close()
         if self.__session:
             await self.__session.close()
+        if self._owns_rate_limits:
+            await self._rate_limits.close()
 
     def _token(self, token, *, bot=True):
         self.token = token
@@ -280,7 +630,7 @@ class HTTPClient:
 
     async def static_login(self, token, *, bot):
         # Necessary to get aiohttp to stop complaining about session creation
-        self.__session = aiohttp.ClientSession(connector=self.connector, ws_response_class=DiscordClientWebSocketResponse)
+        self.__session = self._create_session()
         old_token, old_bot = self.token, self.bot_token
         self._token(token, bot=bot)
 
@@ -394,6 +744,11 @@ class HTTPClient:
         return self.request(Route('POST', '/guilds/{guild_id}/ack', guild_id=guild_id))
 
     def delete_message(self, channel_id, message_id, *, reason=None):
+        if self._delete_batcher is not None and self.bot_token:
+            return self._delete_batcher.delete(channel_id, message_id, reason)
+        return self._delete_message(channel_id, message_id, reason=reason)
+
+    def _delete_message(self, channel_id, message_id, *, reason=None):
         r = Route('DELETE', '/channels/{channel_id}/messages/{message_id}', channel_id=channel_id, message_id=message_id)
         return self.request(r, reason=reason)
 
@@ -25,10 +25,14 @@ DEALINGS IN THE SOFTWARE.
 """
 
 import asyncio
+import collections
 import datetime
+import functools
+import os
+import weakref
 
 from .errors import NoMoreItems
-from .utils import DISCORD_EPOCH, time_snowflake, maybe_coroutine
+from .utils import DISCORD_EPOCH, time_snowflake, snowflake_time, maybe_coroutine, to_json
 from .object import Object
 from .audit_logs import AuditLogEntry
 
@@ -201,10 +205,16 @@ class HistoryIterator(_AsyncIterator):
     oldest_first: Optional[:class:`bool`]
         If set to ``True``, return messages in oldest->newest order. Defaults to
         ``True`` if `after` is specified, otherwise ``False``.
+    prefetch: :class:`int`
+        The number of pages of messages to request ahead of the consumer. The
+        next page is requested in the background as soon as the previous one
+        arrived. Defaults to ``0``, which only requests a page once it is needed.
+    raw: :class:`bool`
+        Whether to return the message payloads as dicts instead of :class:`Message`.
     """
 
     def __init__(self, messageable, limit,
-                 before=None, after=None, around=None, oldest_first=None):
+                 before=None, after=None, around=None, oldest_first=None, prefetch=0, raw=False):
 
         if isinstance(before, datetime.datetime):
             before = Object(id=time_snowflake(before, high=False))
@@ -230,6 +240,13 @@ class HistoryIterator(_AsyncIterator):
         self.logs_from = self.state.http.logs_from
         self.messages = asyncio.Queue()
 
+        if prefetch < 0:
+            raise ValueError('prefetch must not be negative')
+        self.prefetch = prefetch
+        self.raw = raw
+        self._pages = None
+        self._slots = None
+
         if self.around:
             if self.limit is None:
                 raise ValueError('history does not support around with limit=None')
@@ -280,41 +297,85 @@ class HistoryIterator(_AsyncIterator):
         # this is similar to fill_messages except it uses a list instead
         # of a queue to place the messages in.
         result = []
-        channel = await self.messageable._get_channel()
-        self.channel = channel
-        while self._get_retrieve():
-            data = await self._retrieve_messages(self.retrieve)
-            if len(data) < 100:
-                self.limit = 0 # terminate the infinite loop
+        while True:
+            data = await self._next_page()
+            if data is None:
+                return result
+            result.extend(self._convert(data))
 
-            if self.reverse:
-                data = reversed(data)
-            if self._filter:
-                data = filter(self._filter, data)
+    async def fill_messages(self):
+        # pages whose messages were all filtered out are skipped
+        while self.messages.empty():
+            data = await self._next_page()
+            if data is None:
+                return
+            for message in self._convert(data):
+                await self.messages.put(message)
 
-            for element in data:
-                result.append(self.state.create_message(channel=channel, data=element))
-        return result
+    def _convert(self, data):
+        if self.raw:
+            return data
+        channel = self.channel
+        return [self.state.create_message(channel=channel, data=element) for element in data]
 
-    async def fill_messages(self):
+    async def _fetch_page(self):
         if not hasattr(self, 'channel'):
             # do the required set up
             channel = await self.messageable._get_channel()
             self.channel = channel
 
-        if self._get_retrieve():
-            data = await self._retrieve_messages(self.retrieve)
-            if len(data) < 100:
-                self.limit = 0 # terminate the infinite loop
+        if not self._get_retrieve():
+            return None
 
-            if self.reverse:
-                data = reversed(data)
-            if self._filter:
-                data = filter(self._filter, data)
+        data = await self._retrieve_messages(self.retrieve)
+        if len(data) < 100:
+            self.limit = 0 # terminate the infinite loop
 
-            channel = self.channel
-            for element in data:
-                await self.messages.put(self.state.create_message(channel=channel, data=element))
+        if self.reverse:
+            data = reversed(data)
+        if self._filter:
+            data = filter(self._filter, data)
+        return list(data)
+
+    async def _next_page(self):
+        if not self.prefetch:
+            return await self._fetch_page()
+
+        if self._pages is None:
+            self._pages = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.prefetch)
+            task = self.state.loop.create_task(self._prefetch_pages(weakref.ref(self), self._pages, self._slots))
+            # stop fetching once the iterator is abandoned
+            weakref.finalize(self, task.cancel)
+
+        data, error = await self._pages.get()
+        self._slots.release()
+        if data is None:
+            # keep returning the end (or the error) for subsequent calls
+            self._pages.put_nowait((None, error))
+        if error is not None:
+            raise error
+        return data
+
+    @staticmethod
+    async def _prefetch_pages(ref, pages, slots):
+        # only a weak reference is held while waiting for a free slot
+        # so that the iterator can be collected when abandoned
+        while True:
+            await slots.acquire()
+            iterator = ref()
+            if iterator is None:
+                return
+            try:
+                data = await iterator._fetch_page()
+            except Exception as exc:
+                pages.put_nowait((None, exc))
+                return
+            del iterator
+
+            pages.put_nowait((data, None))
+            if data is None:
+                return
 
     async def _retrieve_messages(self, retrieve):
         """Retrieve messages and update next parameters."""
@@ -328,6 +389,8 @@ class HistoryIterator(_AsyncIterator):
             if self.limit is not None:
                 self.limit -= retrieve
             self.before = Object(id=int(data[-1]['id']))
+            if self.before.id <= self.after.id:
+                self.limit = 0 # the rest would be filtered out
         return data
 
     async def _retrieve_messages_after_strategy(self, retrieve):
@@ -338,6 +401,8 @@ class HistoryIterator(_AsyncIterator):
             if self.limit is not None:
                 self.limit -= retrieve
             self.after = Object(id=int(data[0]['id']))
+            if self.before and self.after.id >= self.before.id:
+                self.limit = 0 # the rest would be filtered out
         return data
 
     async def _retrieve_messages_around_strategy(self, retrieve):
@@ -349,6 +414,183 @@ class HistoryIterator(_AsyncIterator):
             return data
         return []
 
+class HistoryExport:
+    """Exports the message history of a :class:`abc.Messageable` by fetching
+    several ranges of it concurrently.
+
+    The range between ``after`` and ``before`` is split into ``partitions``
+    snowflake intervals of equal duration. Up to ``concurrency`` of them are
+    fetched at the same time and their messages are written to the sink in
+    oldest->newest order. Up to twice ``concurrency`` intervals that finish
+    before an older one are buffered so that a slow interval does not hold up
+    the others. The requests still go through the rate limiter, so the
+    intervals share the budget of the channel's history bucket.
+
+    Parameters
+    -----------
+    messageable: :class:`abc.Messageable`
+        Messageable class to export the history of.
+    sink
+        A callable (or coroutine function) receiving each message payload,
+        a file-like object or a path to write the payloads to as JSON lines.
+    after: Optional[Union[:class:`abc.Snowflake`, :class:`datetime.datetime`]]
+        Export messages after this date or message. Defaults to the creation
+        of the channel.
+    before: Optional[Union[:class:`abc.Snowflake`, :class:`datetime.datetime`]]
+        Export messages before this date or message. Defaults to now.
+    partitions: :class:`int`
+        The number of intervals to split the range into.
+    concurrency: :class:`int`
+        The number of intervals fetched at the same time.
+    checkpoint: Optional[:class:`str`]
+        A path storing the ID of the last exported message. If it exists,
+        the export resumes after that message.
+    """
+
+    def __init__(self, messageable, sink, *, after=None, before=None, partitions=16, concurrency=4, checkpoint=None):
+        if partitions < 1:
+            raise ValueError('partitions must be at least 1')
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+
+        if isinstance(before, datetime.datetime):
+            before = Object(id=time_snowflake(before, high=False))
+        if isinstance(after, datetime.datetime):
+            after = Object(id=time_snowflake(after, high=True))
+
+        self.messageable = messageable
+        self.state = messageable._state
+        self.sink = sink
+        self.before = before
+        self.after = after
+        self.partitions = partitions
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+        self.count = 0
+
+    def _intervals(self, after, before):
+        # returns (after, before) pairs with both ends exclusive, the
+        # lower end of each interval being the upper end of the previous one - 1
+        start = snowflake_time(after)
+        step = (snowflake_time(before) - start) / self.partitions
+        bounds = [after + 1]
+        for index in range(1, self.partitions):
+            bound = time_snowflake(start + step * index)
+            if bounds[-1] < bound < before:
+                bounds.append(bound)
+        bounds.append(before)
+        return [(lower - 1, upper) for lower, upper in zip(bounds, bounds[1:])]
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint, 'r') as fp:
+                return int(fp.read().strip())
+        except FileNotFoundError:
+            return None
+
+    def _save_checkpoint(self, message_id):
+        temp = self.checkpoint + '.tmp'
+        with open(temp, 'w') as fp:
+            fp.write(str(message_id))
+        os.replace(temp, self.checkpoint)
+
+    async def _fetch(self, iterator, pages):
+        # the end of the interval is marked once the task is done
+        try:
+            while True:
+                data = await iterator._next_page()
+                if data is None:
+                    return
+                pages.put_nowait((data, None))
+        except Exception as exc:
+            pages.put_nowait((None, exc))
+
+    async def _write(self, data, fp):
+        if fp is None:
+            for message in data:
+                await maybe_coroutine(self.sink, message)
+        else:
+            fp.write(''.join(to_json(message) + '\n' for message in data))
+            fp.flush()
+
+        self.count += len(data)
+        if self.checkpoint is not None and data:
+            self._save_checkpoint(data[-1]['id'])
+
+    async def run(self):
+        channel = await self.messageable._get_channel()
+        after = self.after.id if self.after else channel.id
+        if self.checkpoint is not None:
+            after = max(after, self._load_checkpoint() or 0)
+        if self.before:
+            before = self.before.id
+        else:
+            before = time_snowflake(datetime.datetime.utcnow(), high=True) + 1
+
+        fp = None
+        close = False
+        if hasattr(self.sink, 'write'):
+            fp = self.sink
+        elif not callable(self.sink):
+            # resuming appends to the previous export
+            fp = open(self.sink, 'a', encoding='utf-8')
+            close = True
+
+        remaining = collections.deque(self._intervals(after, before) if after + 1 < before else [])
+        loop = self.state.loop
+        tasks = []
+        # the page queues of the started intervals in write order, the
+        # finished ones among them are buffered until they are written
+        started = collections.deque()
+        running = 0
+        stopped = False
+
+        def done(pages, task):
+            nonlocal running
+            running -= 1
+            fill()
+            # marked after refilling so the writer never runs out of
+            # started intervals while some are remaining
+            pages.put_nowait((None, None))
+
+        def fill():
+            nonlocal running
+            # bound the finished intervals waiting for an older one
+            while (not stopped and remaining and running < self.concurrency
+                   and len(started) - running < self.concurrency * 2):
+                lower, upper = remaining.popleft()
+                iterator = HistoryIterator(self.messageable, limit=None, oldest_first=True, raw=True,
+                                           after=Object(id=lower), before=Object(id=upper))
+                pages = asyncio.Queue()
+                task = loop.create_task(self._fetch(iterator, pages))
+                task.add_done_callback(functools.partial(done, pages))
+                tasks.append(task)
+                started.append(pages)
+                running += 1
+
+        try:
+            fill()
+            while started:
+                pages = started[0]
+                while True:
+                    data, error = await pages.get()
+                    if error is not None:
+                        raise error
+                    if data is None:
+                        break
+                    await self._write(data, fp)
+
+                started.popleft()
+                fill()
+        finally:
+            stopped = True
+            for task in tasks:
+                task.cancel()
+            if close:
+                fp.close()
+
+        return self.count
+
 class AuditLogIterator(_AsyncIterator):
     def __init__(self, guild, limit=None, before=None, after=None, oldest_first=None, user_id=None, action_type=None):
         if isinstance(before, datetime.datetime):
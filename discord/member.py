@@ -24,6 +24,8 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import collections
+import datetime
 import itertools
 from operator import attrgetter
 
@@ -84,6 +86,68 @@ class VoiceState:
     def __repr__(self):
         return '<VoiceState self_mute={0.self_mute} self_deaf={0.self_deaf} self_stream={0.self_stream} channel={0.channel!r}>'.format(self)
 
+class _Presence:
+    """An immutable presence shared by every :class:`Member` of a user.
+
+    Instances are never mutated, an update always creates a new one so
+    that old snapshots remain valid.
+    """
+
+    __slots__ = ('client_status', 'activities', '_raw_activities')
+
+    # interned client status mappings, there are only a handful of combinations
+    _client_statuses = {}
+
+    def __init__(self, client_status, activities, raw_activities):
+        self.client_status = client_status
+        self.activities = activities
+        self._raw_activities = raw_activities
+
+    @classmethod
+    def _intern_client_status(cls, status, client_status):
+        key = (status,) + tuple(sorted(client_status.items()))
+        try:
+            return cls._client_statuses[key]
+        except KeyError:
+            value = dict(client_status)
+            value[None] = status
+            cls._client_statuses[key] = value
+            return value
+
+    @classmethod
+    def from_data(cls, data, previous):
+        raw_activities = data.get('activities') or None
+        if raw_activities == previous._raw_activities:
+            # the same activities are received once for every guild the user is in
+            activities = previous.activities
+        else:
+            activities = tuple(map(create_activity, raw_activities)) if raw_activities else ()
+
+        client_status = cls._intern_client_status(data['status'], data.get('client_status', {}))
+        return cls(client_status, activities, raw_activities)
+
+    def replace(self, *, status=None, activities=None):
+        client_status = self.client_status
+        if status is not None:
+            platforms = {key: value for key, value in client_status.items() if key is not None}
+            client_status = self._intern_client_status(status, platforms)
+
+        if activities is None:
+            activities = self.activities
+            raw_activities = self._raw_activities
+        else:
+            activities = tuple(activities)
+            # an empty tuple never compares equal to a received activity list
+            # so the next update from the gateway always rebuilds them
+            raw_activities = () if activities else None
+
+        return _Presence(client_status, activities, raw_activities)
+
+    def is_empty(self):
+        return self.activities == () and len(self.client_status) == 1 and self.client_status[None] == 'offline'
+
+_Presence.EMPTY = _Presence(_Presence._intern_client_status('offline', {}), (), None)
+
 def flatten_user(cls):
     for attr, value in itertools.chain(BaseUser.__dict__.items(), User.__dict__.items()):
         # ignore private/special methods
@@ -150,8 +214,6 @@ class Member(discord.abc.Messageable, _BaseUser):
     joined_at: Optional[:class:`datetime.datetime`]
         A datetime object that specifies the date and time in UTC that the member joined the guild for
         the first time. In certain cases, this can be ``None``.
-    activities: Tuple[Union[:class:`BaseActivity`, :class:`Spotify`]]
-        The activities that the user is currently doing.
     guild: :class:`Guild`
         The guild that the member belongs to.
     nick: Optional[:class:`str`]
@@ -161,8 +223,8 @@ class Member(discord.abc.Messageable, _BaseUser):
         Nitro boost on the guild, if available. This could be ``None``.
     """
 
-    __slots__ = ('_roles', 'joined_at', 'premium_since', '_client_status',
-                 'activities', 'guild', 'nick', '_user', '_state')
+    __slots__ = ('_roles', 'joined_at', 'premium_since', '_presence',
+                 'guild', 'nick', '_user', '_state')
 
     def __init__(self, *, data, guild, state):
         self._state = state
@@ -171,10 +233,8 @@ class Member(discord.abc.Messageable, _BaseUser):
         self.joined_at = utils.parse_time(data.get('joined_at'))
         self.premium_since = utils.parse_time(data.get('premium_since'))
         self._update_roles(data)
-        self._client_status = {
-            None: 'offline'
-        }
-        self.activities = tuple(map(create_activity, data.get('activities', [])))
+        # None means the presence is looked up from the user's shared presence
+        self._presence = None
         self.nick = data.get('nick', None)
 
     def __str__(self):
@@ -210,17 +270,6 @@ class Member(discord.abc.Messageable, _BaseUser):
             member_data['user'] = data
             return cls(data=member_data, guild=guild, state=state)
 
-    @classmethod
-    def _from_presence_update(cls, *, data, guild, state):
-        clone = cls(data=data, guild=guild, state=state)
-        to_return = cls(data=data, guild=guild, state=state)
-        to_return._client_status = {
-            key: value
-            for key, value in data.get('client_status', {}).items()
-        }
-        to_return._client_status[None] = data['status']
-        return to_return, clone
-
     @classmethod
     def _copy(cls, member):
         self = cls.__new__(cls) # to bypass __init__
@@ -228,10 +277,10 @@ class Member(discord.abc.Messageable, _BaseUser):
         self._roles = utils.SnowflakeList(member._roles, is_sorted=True)
         self.joined_at = member.joined_at
         self.premium_since = member.premium_since
-        self._client_status = member._client_status.copy()
+        # presences are immutable so the copy can keep the current one
+        self._presence = member._get_presence()
         self.guild = member.guild
         self.nick = member.nick
-        self.activities = member.activities
         self._state = member._state
 
         # Reference will not be copied unless necessary by PRESENCE_UPDATE
@@ -239,6 +288,20 @@ class Member(discord.abc.Messageable, _BaseUser):
         self._user = member._user
         return self
 
+    @classmethod
+    def _from_compact(cls, *, user, guild, nick, roles, joined_at, premium_since, presence):
+        self = cls.__new__(cls) # to bypass __init__
+
+        self._state = guild._state
+        self._user = user
+        self.guild = guild
+        self.nick = nick
+        self._roles = utils.SnowflakeList(roles, is_sorted=True)
+        self.joined_at = joined_at
+        self.premium_since = premium_since
+        self._presence = presence
+        return self
+
     async def _get_channel(self):
         ch = await self.create_dm()
         return ch
@@ -257,26 +320,51 @@ class Member(discord.abc.Messageable, _BaseUser):
         self.premium_since = utils.parse_time(data.get('premium_since'))
         self._update_roles(data)
 
+    def _get_presence(self):
+        presence = self._presence
+        if presence is None:
+            return self._state._get_presence(self._user.id)
+        return presence
+
+    def _replace_presence(self, **fields):
+        # this is only used for the client's own members, whose presence can
+        # differ between shards, so it is kept on this member instead of shared
+        self._presence = self._get_presence().replace(**fields)
+
     def _presence_update(self, data, user):
-        self.activities = tuple(map(create_activity, data.get('activities', [])))
-        self._client_status = {
-            key: value
-            for key, value in data.get('client_status', {}).items()
-        }
-        self._client_status[None] = data['status']
+        self._presence = None
+        self._state._update_presence(self._user.id, data)
 
         if len(user) > 1:
-            u = self._user
-            original = (u.name, u.avatar, u.discriminator)
-            # These keys seem to always be available
-            modified = (user['username'], user['avatar'], user['discriminator'])
-            if original != modified:
-                to_return = User._copy(self._user)
-                u.name, u.avatar, u.discriminator = modified
-                # Signal to dispatch on_user_update
-                return to_return, u
+            return self._update_user(user)
+        return False
+
+    def _update_user(self, user):
+        u = self._user
+        original = (u.name, u.avatar, u.discriminator)
+        # These keys seem to always be available
+        modified = (user['username'], user['avatar'], user['discriminator'])
+        if original != modified:
+            to_return = User._copy(self._user)
+            u.name, u.avatar, u.discriminator = modified
+            # Signal to dispatch on_user_update
+            return to_return, u
         return False
 
+    @property
+    def _client_status(self):
+        return self._get_presence().client_status
+
+    @property
+    def activities(self):
+        """Tuple[Union[:class:`BaseActivity`, :class:`Spotify`]]: The activities that the user is currently doing."""
+        return self._get_presence().activities
+
+    @activities.setter
+    def activities(self, value):
+        # internal use only
+        self._replace_presence(activities=value)
+
     @property
     def status(self):
         """:class:`Status`: The member's overall status. If the value is unknown, then it will be a :class:`str` instead."""
@@ -285,7 +373,7 @@ class Member(discord.abc.Messageable, _BaseUser):
     @status.setter
     def status(self, value):
         # internal use only
-        self._client_status[None] = str(value)
+        self._replace_presence(status=str(value))
 
     @property
     def mobile_status(self):
@@ -683,3 +771,149 @@ class Member(discord.abc.Messageable, _BaseUser):
             user_id = self.id
             for role in roles:
                 await req(guild_id, user_id, role.id, reason=reason)
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+def _timestamp_to_int(dt):
+    if dt is None:
+        return None
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+def _int_to_timestamp(value):
+    if value is None:
+        return None
+    return _EPOCH + datetime.timedelta(microseconds=value)
+
+class _CompactMemberStore:
+    """A memory efficient replacement for the member dict of a :class:`Guild`.
+
+    Members are stored as plain tuples of ``(user_id, name, discriminator, avatar, bot,
+    nick, roles, joined_at, premium_since, presence)`` where ``roles`` is an interned
+    tuple of role IDs and the timestamps are microseconds since the Unix epoch. The
+    user fields are only used to recreate the :class:`User` if the state no longer
+    caches it, otherwise the cached user is used.
+
+    :class:`Member` instances are materialized on access and the most recently
+    used ones are kept in an LRU so the same instance is returned while it is
+    cached. Members are modified in place, so an instance is written back into
+    the store when it is evicted from the LRU or assigned.
+
+    Member identity is therefore not stable. A member held on to after it was
+    evicted is detached from the store: it no longer receives updates and changes
+    made to it are lost. Iterating with :meth:`values` or :meth:`items` does not
+    touch the LRU, so the members that are not live are detached snapshots.
+    """
+
+    __slots__ = ('guild', '_records', '_live', '_role_tuples')
+
+    # the number of materialized members kept alive
+    max_live = 256
+
+    def __init__(self, guild):
+        self.guild = guild
+        self._records = {}
+        self._live = collections.OrderedDict()
+        self._role_tuples = {}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __contains__(self, member_id):
+        return member_id in self._records
+
+    def __getitem__(self, member_id):
+        live = self._live
+        try:
+            member = live[member_id]
+        except KeyError:
+            member = self._unpack(self._records[member_id])
+            self._keep(member_id, member)
+        else:
+            live.move_to_end(member_id)
+        return member
+
+    def __setitem__(self, member_id, member):
+        self._records[member_id] = self._pack(member)
+        self._keep(member_id, member)
+
+    def get(self, member_id, default=None):
+        try:
+            return self[member_id]
+        except KeyError:
+            return default
+
+    def pop(self, member_id, *default):
+        try:
+            member = self[member_id]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+
+        del self._records[member_id]
+        self._live.pop(member_id, None)
+        return member
+
+    def keys(self):
+        return self._records.keys()
+
+    def values(self):
+        return [member for _, member in self._iter_members()]
+
+    def items(self):
+        return list(self._iter_members())
+
+    def _iter_members(self):
+        # live members are returned as is, the others are unpacked
+        # without being kept or packed again
+        get_live = self._live.get
+        unpack = self._unpack
+        for member_id, record in self._records.items():
+            member = get_live(member_id)
+            if member is None:
+                member = unpack(record)
+            yield member_id, member
+
+    def _pack(self, member):
+        user = member._user
+        roles = tuple(member._roles)
+        return (
+            user.id,
+            user.name,
+            user.discriminator,
+            user.avatar,
+            user.bot,
+            member.nick,
+            self._role_tuples.setdefault(roles, roles),
+            _timestamp_to_int(member.joined_at),
+            _timestamp_to_int(member.premium_since),
+            member._presence,
+        )
+
+    def _keep(self, member_id, member):
+        live = self._live
+        live[member_id] = member
+        live.move_to_end(member_id)
+        while len(live) > self.max_live:
+            # the evicted member may have been modified in place since it was packed
+            evicted_id, evicted = live.popitem(last=False)
+            self._records[evicted_id] = self._pack(evicted)
+
+    def _unpack(self, record):
+        user_id, name, discriminator, avatar, bot, nick, roles, joined_at, premium_since, presence = record
+        state = self.guild._state
+        users = state._users
+        # peek first so unpacking does not count towards the cache statistics
+        user = users._peek(user_id) or users.get(user_id)
+        if user is None:
+            user = state.store_user({'id': user_id, 'username': name, 'discriminator': discriminator,
+                                     'avatar': avatar, 'bot': bot})
+
+        return Member._from_compact(user=user, guild=self.guild, nick=nick, roles=roles,
+                                    joined_at=_int_to_timestamp(joined_at),
+                                    premium_since=_int_to_timestamp(premium_since),
+                                    presence=presence)
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2020 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import bisect
+import collections
+import time
+
+__all__ = (
+    'RequestTrace',
+    'LatencyHistogram',
+    'RouteMetrics',
+    'RequestMetrics',
+)
+
+class RequestTrace:
+    """Describes where the time of a single REST request went.
+
+    These are passed to :meth:`RequestMetrics.record` once a request
+    finishes, whether it succeeded or not.
+
+    .. versionadded:: 1.5
+
+    Attributes
+    -----------
+    method: :class:`str`
+        The HTTP method of the request.
+    path: :class:`str`
+        The route path of the API, e.g. ``'/channels/{channel_id}/messages'``.
+    bucket: Optional[:class:`str`]
+        The rate limit bucket the last attempt was sent under, or ``None``
+        if the request failed before it was given one.
+    status: Optional[:class:`int`]
+        The status code of the last response, or ``None`` if no response was received.
+    attempts: :class:`int`
+        The number of times the request was sent.
+    rate_limited: :class:`int`
+        The number of 429 responses received.
+    bucket_wait: :class:`float`
+        The seconds spent waiting for the rate limit bucket of the route.
+    global_wait: :class:`float`
+        The seconds spent waiting for the global rate limit, both the one
+        set by ``global_rate_limit`` and the one reported by Discord.
+    retry_after_wait: :class:`float`
+        The seconds spent waiting before sending the request again after
+        a 429 response.
+    retry_wait: :class:`float`
+        The seconds spent backing off after server errors.
+    network_time: :class:`float`
+        The seconds spent sending the request and receiving the response.
+    total_time: :class:`float`
+        The seconds the request took as a whole.
+    size: :class:`int`
+        The number of bytes received in response bodies.
+    error: Optional[:class:`Exception`]
+        The exception the request failed with, if any.
+    """
+
+    __slots__ = ('method', 'path', 'bucket', 'status', 'attempts', 'rate_limited', 'bucket_wait',
+                 'global_wait', 'retry_after_wait', 'retry_wait', 'network_time', 'total_time', 'size',
+                 'error', '_start')
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.bucket = None
+        self.status = None
+        self.attempts = 0
+        self.rate_limited = 0
+        self.bucket_wait = 0.0
+        self.global_wait = 0.0
+        self.retry_after_wait = 0.0
+        self.retry_wait = 0.0
+        self.network_time = 0.0
+        self.total_time = 0.0
+        self.size = 0
+        self.error = None
+        self._start = time.perf_counter()
+
+    def __repr__(self):
+        return '<RequestTrace method={0.method} path={0.path!r} status={0.status} ' \
+               'attempts={0.attempts} total_time={0.total_time:.3f}>'.format(self)
+
+    @property
+    def rate_limit_wait(self):
+        """:class:`float`: The seconds spent waiting for rate limits in total."""
+        return self.bucket_wait + self.global_wait + self.retry_after_wait
+
+class LatencyHistogram:
+    """A histogram of durations with fixed buckets.
+
+    .. versionadded:: 1.5
+
+    Attributes
+    -----------
+    bounds: Tuple[:class:`float`, ...]
+        The upper bounds in seconds of each bucket. Durations above the last
+        bound are counted in an extra bucket.
+    counts: List[:class:`int`]
+        The number of durations in each bucket.
+    count: :class:`int`
+        The number of recorded durations.
+    total: :class:`float`
+        The sum of the recorded durations in seconds.
+    max: :class:`float`
+        The longest recorded duration in seconds.
+    """
+
+    BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, bounds=BOUNDS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def __repr__(self):
+        return '<LatencyHistogram count={0.count} mean={1:.3f} max={0.max:.3f}>'.format(self, self.mean)
+
+    def add(self, value):
+        """Records a duration in seconds."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        """:class:`float`: The mean of the recorded durations in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """Returns an estimate of the given percentile of the recorded durations,
+        which is the upper bound of the bucket it falls in capped at :attr:`max`.
+
+        Parameters
+        -----------
+        percent: :class:`float`
+            The percentile to estimate, between 0 and 100.
+        """
+        if not self.count:
+            return 0.0
+
+        rank = self.count * percent / 100.0
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+class RouteMetrics:
+    """The aggregated metrics of the requests to a single route or rate limit bucket.
+
+    .. versionadded:: 1.5
+
+    Attributes
+    -----------
+    requests: :class:`int`
+        The number of requests.
+    retries: :class:`int`
+        The number of times requests had to be sent again.
+    rate_limited: :class:`int`
+        The number of 429 responses received.
+    errors: :class:`int`
+        The number of requests that failed.
+    bytes_received: :class:`int`
+        The number of bytes received in response bodies.
+    statuses: :class:`collections.Counter`
+        The number of requests by their final status code.
+    latency: :class:`LatencyHistogram`
+        The total time of the requests.
+    bucket_wait: :class:`LatencyHistogram`
+        The time requests waited for their rate limit bucket.
+    global_wait: :class:`LatencyHistogram`
+        The time requests waited for the global rate limit.
+    retry_after_wait: :class:`LatencyHistogram`
+        The time rate limited requests waited before being sent again.
+        Only requests that received a 429 response are recorded.
+    network_time: :class:`LatencyHistogram`
+        The time requests spent on the network.
+    """
+
+    __slots__ = ('requests', 'retries', 'rate_limited', 'errors', 'bytes_received', 'statuses',
+                 'latency', 'bucket_wait', 'global_wait', 'retry_after_wait', 'network_time')
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.statuses = collections.Counter()
+        self.latency = LatencyHistogram()
+        self.bucket_wait = LatencyHistogram()
+        self.global_wait = LatencyHistogram()
+        self.retry_after_wait = LatencyHistogram()
+        self.network_time = LatencyHistogram()
+
+    def __repr__(self):
+        return '<RouteMetrics requests={0.requests} errors={0.errors} latency={0.latency!r}>'.format(self)
+
+class RequestMetrics:
+    """Collects metrics of the REST requests made by a :class:`Client`.
+
+    Pass an instance as the ``request_metrics`` option of the client to enable
+    it. Metrics are aggregated per route, which is the HTTP method and the
+    route path of the API, and per rate limit bucket once a request has been
+    given one.
+
+    Subclasses can override :meth:`record` to export the traces elsewhere.
+
+    .. versionadded:: 1.5
+
+    Parameters
+    -----------
+    max_buckets: :class:`int`
+        The maximum number of rate limit buckets to keep metrics for. Bucket
+        keys include the major parameters of a route, so the metrics of the
+        least recently used buckets are discarded past this. Defaults to ``1000``.
+
+    Attributes
+    -----------
+    routes: Dict[Tuple[:class:`str`, :class:`str`], :class:`RouteMetrics`]
+        The metrics of each route, keyed by the HTTP method and the route path.
+    buckets: Dict[:class:`str`, :class:`RouteMetrics`]
+        The metrics of each rate limit bucket, keyed by :attr:`RequestTrace.bucket`.
+        Requests that failed before being given a bucket are not included. Only
+        the ``max_buckets`` most recently used buckets are kept.
+    """
+
+    def __init__(self, *, max_buckets=1000):
+        self.max_buckets = max_buckets
+        self.routes = {}
+        self.buckets = collections.OrderedDict()
+
+    def record(self, trace):
+        """Called with the :class:`RequestTrace` of every finished request.
+
+        The default implementation aggregates the trace into :attr:`routes`
+        and :attr:`buckets`.
+        """
+        self._add(self.routes, (trace.method, trace.path), trace)
+        bucket = trace.bucket
+        if bucket is not None:
+            buckets = self.buckets
+            self._add(buckets, bucket, trace)
+            buckets.move_to_end(bucket)
+            while len(buckets) > self.max_buckets:
+                buckets.popitem(last=False)
+
+    def _add(self, mapping, key, trace):
+        try:
+            metrics = mapping[key]
+        except KeyError:
+            metrics = mapping[key] = RouteMetrics()
+
+        metrics.requests += 1
+        metrics.retries += max(0, trace.attempts - 1)
+        metrics.rate_limited += trace.rate_limited
+        metrics.bytes_received += trace.size
+        if trace.error is not None:
+            metrics.errors += 1
+        if trace.status is not None:
+            metrics.statuses[trace.status] += 1
+        metrics.latency.add(trace.total_time)
+        metrics.bucket_wait.add(trace.bucket_wait)
+        metrics.global_wait.add(trace.global_wait)
+        if trace.rate_limited:
+            metrics.retry_after_wait.add(trace.retry_after_wait)
+        metrics.network_time.add(trace.network_time)
+
+    def reset(self):
+        """Discards the metrics collected so far."""
+        self.routes.clear()
+        self.buckets.clear()
@@ -25,6 +25,7 @@ DEALINGS IN THE SOFTWARE.
 """
 
 from .flags import BaseFlags, flag_value, fill_with_flags
+from . import utils
 
 __all__ = (
     'Permissions',
@@ -554,3 +555,70 @@ class PermissionOverwrite:
     def __iter__(self):
         for key in self.PURE_FLAGS:
             yield key, self._values.get(key)
+
+class _PermissionCache:
+    """Memoizes resolved channel permissions of a single guild.
+
+    Entries are keyed by channel ID and then member ID. The member's role
+    list is stored alongside the value and compared on lookup so that stale
+    :class:`Member` snapshots never receive another snapshot's result.
+
+    When the cache grows past ``max_size`` entries it is cleared.
+    """
+
+    __slots__ = ('max_size', 'hits', 'misses', '_size', '_channels')
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        # channel_id -> {member_id: (roles, value)}
+        self._channels = {}
+
+    def __len__(self):
+        return self._size
+
+    def get(self, channel_id, member):
+        try:
+            roles, value = self._channels[channel_id][member.id]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        if roles != member._roles:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def set(self, channel_id, member, value):
+        if self._size >= self.max_size:
+            self.clear()
+
+        try:
+            members = self._channels[channel_id]
+        except KeyError:
+            members = self._channels[channel_id] = {}
+
+        if member.id not in members:
+            self._size += 1
+        members[member.id] = (member._roles, value)
+
+    def clear(self):
+        self._channels = {}
+        self._size = 0
+
+    def invalidate_channel(self, channel_id):
+        members = self._channels.pop(channel_id, None)
+        if members is not None:
+            self._size -= len(members)
+
+    def invalidate_member(self, member_id):
+        for members in self._channels.values():
+            if members.pop(member_id, None) is not None:
+                self._size -= 1
+
+    def info(self):
+        return utils.CacheInfo(hits=self.hits, misses=self.misses, maxsize=self.max_size, currsize=self._size)
@@ -0,0 +1,808 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-2020 Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import collections
+import heapq
+import itertools
+import json
+import logging
+import os
+
+try:
+    import fcntl
+except ImportError:
+    has_fcntl = False
+else:
+    has_fcntl = True
+
+__all__ = (
+    'RateLimitStore',
+    'MemoryRateLimitStore',
+    'SocketRateLimitStore',
+)
+
+from .enums import RequestPriority
+
+log = logging.getLogger(__name__)
+
+class _WaiterQueue:
+    """Futures waiting for their turn, ordered by priority and then by arrival."""
+
+    __slots__ = ('_heap', '_counter')
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, priority, future):
+        heapq.heappush(self._heap, (priority, next(self._counter), future))
+
+    def peek(self):
+        # returns the (priority, future) pair that is next in line
+        heap = self._heap
+        while heap:
+            priority, _, future = heap[0]
+            if not future.done():
+                return priority, future
+            heapq.heappop(heap)
+        return None
+
+    def pop(self):
+        return heapq.heappop(self._heap)[2]
+
+    def pending(self):
+        return sum(1 for _, _, future in self._heap if not future.done())
+
+    def clear(self):
+        heap, self._heap = self._heap, []
+        return [future for _, _, future in heap]
+
+class _RateLimitBucket:
+    """Tracks the state of a single Discord rate limit bucket.
+
+    Until a response has told us the limit of the bucket only one request
+    is allowed in flight at a time. Afterwards up to ``remaining`` requests
+    may be sent concurrently and any further requests wait for the bucket
+    to reset before they are sent. Waiting requests are let through in order
+    of priority.
+    """
+
+    __slots__ = ('key', 'loop', 'limit', 'remaining', 'reset_at', 'in_flight', 'moved', '_waiters', '_timer')
+
+    def __init__(self, key, loop):
+        self.key = key
+        self.loop = loop
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.in_flight = 0
+        self.moved = False
+        self._waiters = _WaiterQueue()
+        self._timer = None
+
+    def is_idle(self, now):
+        return not self.in_flight and not self._waiters and (self.reset_at is None or self.reset_at <= now)
+
+    def _try_take(self, now):
+        if self.remaining is None:
+            # nothing is known about this bucket yet
+            if self.in_flight:
+                return False
+        else:
+            if self.reset_at is not None and self.reset_at <= now:
+                # the window has passed so the bucket is full again, the
+                # next reset time is learned from the next response
+                self.remaining = max(0, (self.limit or 1) - self.in_flight)
+                self.reset_at = None
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+
+        self.in_flight += 1
+        return True
+
+    def _wake(self):
+        self._timer = None
+        now = self.loop.time()
+        while self._waiters.peek() is not None:
+            if not self._try_take(now):
+                break
+            self._waiters.pop().set_result(True)
+
+        if self._timer is None and self.remaining == 0 and self.reset_at is not None and self._waiters.peek() is not None:
+            self._timer = self.loop.call_at(self.reset_at, self._wake)
+
+    async def acquire(self, priority):
+        """Waits for a slot in the bucket.
+
+        Returns ``False`` if the route turned out to belong to a different
+        bucket while waiting, in which case the caller has to look it up again.
+        """
+        if self.moved:
+            return False
+
+        if self._waiters.peek() is None and self._try_take(self.loop.time()):
+            return True
+
+        future = self.loop.create_future()
+        self._waiters.push(priority, future)
+        self._wake()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.result():
+                # we were handed a slot right as we got cancelled
+                self.release()
+            raise
+
+    def move(self):
+        """Sends every waiter off to look up the bucket of its route again."""
+        self.moved = True
+        for future in self._waiters.clear():
+            if not future.done():
+                future.set_result(False)
+
+    def release(self, limit=None, remaining=None, reset_after=None):
+        """Gives back an in-flight slot, updating the bucket from the response headers if available."""
+        self.in_flight = max(0, self.in_flight - 1)
+        if remaining is not None:
+            if limit is not None:
+                self.limit = limit
+            # the server has not seen the other requests still in flight yet
+            self.remaining = max(0, remaining - self.in_flight)
+            if reset_after is not None:
+                self.reset_at = self.loop.time() + reset_after
+        if self.remaining == 0 and self.reset_at is None:
+            # no idea when the bucket resets (e.g. a response without headers
+            # after a new window started), so retry in a bit instead of waiting
+            # for a reset that is never scheduled
+            self.reset_at = self.loop.time() + 1.0
+        self._wake()
+
+    def seed(self, limit, remaining, reset_after):
+        """Copies rate limit information into a bucket that has not received any yet."""
+        if self.remaining is None:
+            self.limit = limit
+            self.remaining = max(0, remaining - self.in_flight)
+            if reset_after is not None:
+                self.reset_at = self.loop.time() + reset_after
+            self._wake()
+
+    def exhaust(self, retry_after):
+        """Marks the bucket as empty after a 429 response."""
+        self.remaining = 0
+        reset_at = self.loop.time() + retry_after
+        if self.reset_at is None or self.reset_at < reset_at:
+            self.reset_at = reset_at
+        if self.limit is None:
+            self.limit = 1
+
+GlobalRateLimitInfo = collections.namedtuple('GlobalRateLimitInfo', 'requests delayed total_wait max_wait queued max_queued')
+
+class _GlobalRateLimiter:
+    """A token bucket shared by every request of a :class:`HTTPClient`.
+
+    Requests take a token before they are sent and wait in order of priority
+    while the bucket is empty, so bursts are spread out instead of running
+    into the global rate limit. Low priority requests leave a tenth of the
+    bucket untouched so higher priority requests can still be sent right away.
+    """
+
+    def __init__(self, rate, per, loop):
+        self.loop = loop
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = loop.time()
+        self.reserve = max(0.0, (rate - 1) * 0.1)
+        self._waiters = _WaiterQueue()
+        self._timer = None
+
+        self.requests = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_queued = 0
+
+    def _refill(self, now):
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    def _needed(self, priority):
+        if priority > RequestPriority.normal.value:
+            return 1 + self.reserve
+        return 1
+
+    def _wake(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        self._refill(self.loop.time())
+        while True:
+            head = self._waiters.peek()
+            if head is None:
+                return
+            needed = self._needed(head[0])
+            if self.tokens < needed:
+                break
+            self.tokens -= 1
+            self._waiters.pop().set_result(None)
+
+        delay = (needed - self.tokens) * self.per / self.rate
+        self._timer = self.loop.call_later(delay, self._wake)
+
+    async def acquire(self, priority):
+        self.requests += 1
+        start = self.loop.time()
+        if self._waiters.peek() is None:
+            self._refill(start)
+            if self.tokens >= self._needed(priority):
+                self.tokens -= 1
+                return 0.0
+
+        future = self.loop.create_future()
+        self._waiters.push(priority, future)
+        self.max_queued = max(self.max_queued, self._waiters.pending())
+        # the new request might be ahead of everyone else
+        self._wake()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # hand the token back to whoever is next
+                self.tokens += 1
+                self._wake()
+            raise
+
+        waited = self.loop.time() - start
+        self.delayed += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def info(self):
+        queued = self._waiters.pending()
+        return GlobalRateLimitInfo(requests=self.requests, delayed=self.delayed, total_wait=self.total_wait,
+                                   max_wait=self.max_wait, queued=queued, max_queued=self.max_queued)
+
+class RateLimitStore:
+    """The interface used by the library to keep track of Discord's rate limits.
+
+    A store decides when a request may be sent. The default store,
+    :class:`MemoryRateLimitStore`, keeps the rate limit state in the current
+    process. Stores that share the state with other processes allow several
+    clients using the same token to coordinate their requests.
+
+    Routes passed to the store have ``method``, ``path``, ``channel_id``,
+    ``guild_id`` and ``bucket`` attributes.
+
+    .. versionadded:: 1.5
+    """
+
+    async def acquire(self, route, *, priority=RequestPriority.normal):
+        """|coro|
+
+        Waits until a request to the route may be sent. Requests with a
+        higher :class:`RequestPriority` are let through first.
+
+        Returns an opaque ticket that is passed back to :meth:`release`
+        or :meth:`exhaust` once the request is done. The ticket must have
+        a ``key`` attribute describing the bucket, which is used for logging.
+        """
+        raise NotImplementedError
+
+    async def release(self, route, ticket, *, limit=None, remaining=None, reset_after=None, bucket=None):
+        """|coro|
+
+        Marks the request as finished, updating the bucket with the rate limit
+        information of the response if available.
+
+        ``limit`` and ``remaining`` are the values of the bucket, ``reset_after``
+        the number of seconds until it resets and ``bucket`` the bucket hash
+        reported by Discord.
+        """
+        raise NotImplementedError
+
+    async def exhaust(self, route, ticket, retry_after):
+        """|coro|
+
+        Marks the request as finished after it received a 429 response,
+        holding further requests to the bucket for ``retry_after`` seconds.
+        """
+        raise NotImplementedError
+
+    async def set_global(self, retry_after):
+        """|coro|
+
+        Holds every request for ``retry_after`` seconds after the global
+        rate limit has been hit.
+        """
+        raise NotImplementedError
+
+    def global_info(self):
+        """Returns the statistics of the client side global rate limit as a
+        :class:`tuple`, or ``None`` if there is none.
+        """
+        return None
+
+    async def _acquire_timed(self, route, priority):
+        # the same as acquire but also returns the seconds spent waiting
+        # on global rate limits, which stores that can't tell report as 0
+        return await self.acquire(route, priority=priority), 0.0
+
+    async def close(self):
+        """|coro|
+
+        Releases the resources held by the store.
+        """
+        pass
+
+class MemoryRateLimitStore(RateLimitStore):
+    """A :class:`RateLimitStore` that keeps the rate limit state in the
+    current process. This is the store used by default.
+
+    .. versionadded:: 1.5
+
+    Parameters
+    -----------
+    global_rate_limit: Optional[:class:`float`]
+        The maximum number of requests per second to send across all routes.
+    loop: Optional[:class:`asyncio.AbstractEventLoop`]
+        The event loop to use. Defaults to the default event loop.
+    """
+
+    def __init__(self, *, global_rate_limit=None, loop=None):
+        self.loop = asyncio.get_event_loop() if loop is None else loop
+        self._buckets = {}
+        self._bucket_hashes = {}
+        self._buckets_created = 0
+        self._global_over = asyncio.Event()
+        self._global_over.set()
+        self._global_reset = None
+        if global_rate_limit is not None:
+            self._global_limiter = _GlobalRateLimiter(global_rate_limit, 1.0, self.loop)
+        else:
+            self._global_limiter = None
+
+    def _get_bucket(self, route):
+        key = route.bucket
+        bucket_hash = self._bucket_hashes.get((route.method, route.path))
+        if bucket_hash is not None:
+            key = '{0}:{1.channel_id}:{1.guild_id}'.format(bucket_hash, route)
+
+        try:
+            return self._buckets[key]
+        except KeyError:
+            pass
+
+        self._buckets_created += 1
+        if self._buckets_created % 1000 == 0:
+            # drop the buckets that no longer hold any useful state
+            now = self.loop.time()
+            for stale in [k for k, v in self._buckets.items() if v.is_idle(now)]:
+                del self._buckets[stale]
+
+        bucket = self._buckets[key] = _RateLimitBucket(key, self.loop)
+        return bucket
+
+    async def _wait(self, route, priority):
+        # returns the time spent waiting on the client side global rate
+        # limit and on a global rate limit reported by Discord
+        held = 0.0
+        if not self._global_over.is_set():
+            # wait until the global lock is complete
+            start = self.loop.time()
+            await self._global_over.wait()
+            held = self.loop.time() - start
+
+        bucket = self._get_bucket(route)
+        while not await bucket.acquire(priority):
+            bucket = self._get_bucket(route)
+
+        if self._global_limiter is None:
+            return bucket, 0.0, held
+
+        try:
+            waited = await self._global_limiter.acquire(priority)
+        except asyncio.CancelledError:
+            bucket.release()
+            raise
+        return bucket, waited, held
+
+    async def acquire(self, route, *, priority=RequestPriority.normal):
+        bucket, _, _ = await self._wait(route, priority.value)
+        return bucket
+
+    async def _acquire_timed(self, route, priority):
+        bucket, waited, held = await self._wait(route, priority.value)
+        return bucket, waited + held
+
+    async def release(self, route, ticket, *, limit=None, remaining=None, reset_after=None, bucket=None):
+        if remaining is None:
+            ticket.release()
+            return
+
+        if remaining == 0:
+            log.debug('A rate limit bucket has been exhausted (bucket: %s, retry: %s).', ticket.key, reset_after)
+
+        route_key = (route.method, route.path)
+        if bucket is not None and self._bucket_hashes.get(route_key) != bucket:
+            # the route belongs to a different bucket than we thought, so
+            # everyone waiting on the old one has to move over before the
+            # slots are given out again
+            self._bucket_hashes[route_key] = bucket
+            new_bucket = self._get_bucket(route)
+            if new_bucket is not ticket:
+                new_bucket.seed(limit, remaining, reset_after)
+                if self._buckets.get(ticket.key) is ticket:
+                    del self._buckets[ticket.key]
+                ticket.move()
+
+        ticket.release(limit, remaining, reset_after)
+
+    async def exhaust(self, route, ticket, retry_after):
+        ticket.exhaust(retry_after)
+        ticket.release()
+
+    async def set_global(self, retry_after):
+        self._global_over.clear()
+        if self._global_reset is not None:
+            self._global_reset.cancel()
+        self._global_reset = self.loop.call_later(retry_after, self._end_global)
+
+    def _end_global(self):
+        self._global_reset = None
+        self._global_over.set()
+        log.debug('Global rate limit is now over.')
+
+    def global_info(self):
+        if self._global_limiter is None:
+            return None
+        return self._global_limiter.info()
+
+class _RemoteRoute:
+    __slots__ = ('method', 'path', 'channel_id', 'guild_id')
+
+    def __init__(self, method, path, channel_id, guild_id):
+        self.method = method
+        self.path = path
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+
+    @property
+    def bucket(self):
+        return '{0.channel_id}:{0.guild_id}:{0.path}'.format(self)
+
+_RemoteTicket = collections.namedtuple('_RemoteTicket', 'id key')
+
+class SocketRateLimitStore(RateLimitStore):
+    """A :class:`RateLimitStore` that shares the rate limit state between
+    the processes of a single host through a Unix domain socket.
+
+    The first process to use the store hosts the rate limit state and serves
+    it to the other processes over the socket, so no separate service has to
+    be run. If the hosting process exits another process takes over, starting
+    with a fresh state.
+
+    This is useful when running several clients with the same token, such
+    as multiple :class:`AutoShardedClient` processes, which would otherwise
+    each track the rate limits on their own and exceed them together.
+
+    This store is only available on POSIX systems.
+
+    .. versionadded:: 1.5
+
+    Parameters
+    -----------
+    path: :class:`str`
+        The path of the Unix domain socket. Every process sharing the rate
+        limits must use the same path. A lock file is created next to it.
+    global_rate_limit: Optional[:class:`float`]
+        The maximum number of requests per second to send across all routes
+        and processes. Only the value of the hosting process is used.
+    loop: Optional[:class:`asyncio.AbstractEventLoop`]
+        The event loop to use. Defaults to the default event loop.
+    """
+
+    def __init__(self, path, *, global_rate_limit=None, loop=None):
+        if not has_fcntl or not hasattr(asyncio, 'start_unix_server'):
+            raise RuntimeError('SocketRateLimitStore requires Unix domain socket support')
+
+        self.path = path
+        self.global_rate_limit = global_rate_limit
+        self.loop = asyncio.get_event_loop() if loop is None else loop
+        self._store = None
+        self._server = None
+        self._lock_file = None
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._connect_lock = asyncio.Lock()
+        self._ids = itertools.count()
+        self._pending = {}
+        self._acquiring = set()
+
+        # statistics of the global rate limit as seen by this process
+        self._requests = 0
+        self._delayed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._queued = 0
+        self._max_queued = 0
+
+    @property
+    def is_host(self):
+        """:class:`bool`: Whether this process hosts the shared rate limit state."""
+        return self._store is not None
+
+    async def _connect(self):
+        if self._store is not None or self._writer is not None:
+            return
+
+        async with self._connect_lock:
+            while self._store is None and self._writer is None:
+                try:
+                    reader, writer = await asyncio.open_unix_connection(self.path)
+                except (FileNotFoundError, ConnectionRefusedError):
+                    if not self._try_host():
+                        # someone else is starting up the server
+                        await asyncio.sleep(0.05)
+                        continue
+                    self._store = MemoryRateLimitStore(global_rate_limit=self.global_rate_limit, loop=self.loop)
+                    self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+                    log.info('Hosting the shared rate limit state at %s.', self.path)
+                else:
+                    self._reader = reader
+                    self._writer = writer
+                    self._read_task = self.loop.create_task(self._read(reader))
+
+    def _try_host(self):
+        lock_file = open(self.path + '.lock', 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        # the socket file may be left over from a process that died
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+        self._lock_file = lock_file
+        return True
+
+    # client side
+
+    async def _read(self, reader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                msg = json.loads(line)
+                future = self._pending.pop(msg['id'], None)
+                if future is None or future.done():
+                    if msg['id'] in self._acquiring:
+                        # the request was cancelled while it was waiting for the bucket
+                        self._acquiring.discard(msg['id'])
+                        self._send('release', msg['id'], None, None)
+                    continue
+
+                if 'error' in msg:
+                    future.set_exception(RuntimeError(msg['error']))
+                else:
+                    future.set_result(msg['result'])
+        finally:
+            log.info('Lost the connection to the shared rate limit state at %s.', self.path)
+            self._writer = None
+            self._reader = None
+            pending, self._pending = self._pending, {}
+            self._acquiring.clear()
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionResetError('lost the connection to the rate limit store'))
+
+    def _send(self, op, *args):
+        msg_id = next(self._ids)
+        if self._writer is not None:
+            self._writer.write(json.dumps({'id': msg_id, 'op': op, 'args': args}).encode('utf-8') + b'\n')
+        return msg_id
+
+    async def _call(self, op, *args):
+        if self._writer is None:
+            raise ConnectionResetError('not connected to the rate limit store')
+
+        msg_id = self._send(op, *args)
+        future = self._pending[msg_id] = self.loop.create_future()
+        if op == 'acquire':
+            self._acquiring.add(msg_id)
+        try:
+            return msg_id, await future
+        finally:
+            self._pending.pop(msg_id, None)
+
+    async def acquire(self, route, *, priority=RequestPriority.normal):
+        ticket, _ = await self._acquire_timed(route, priority)
+        return ticket
+
+    async def _acquire_timed(self, route, priority):
+        self._requests += 1
+        self._queued += 1
+        self._max_queued = max(self._max_queued, self._queued)
+        try:
+            while True:
+                await self._connect()
+                if self._store is not None:
+                    ticket, waited, held = await self._store._wait(route, priority.value)
+                    break
+
+                try:
+                    msg_id, (key, waited, held) = await self._call('acquire', route.method, route.path,
+                                                                    route.channel_id, route.guild_id, priority.value)
+                except ConnectionResetError:
+                    # the host went away, elect a new one and try again
+                    continue
+                self._acquiring.discard(msg_id)
+                ticket = _RemoteTicket(msg_id, key)
+                break
+        finally:
+            self._queued -= 1
+
+        if waited:
+            self._delayed += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return ticket, waited + held
+
+    def _route_args(self, route):
+        return [route.method, route.path, route.channel_id, route.guild_id]
+
+    async def release(self, route, ticket, *, limit=None, remaining=None, reset_after=None, bucket=None):
+        if not isinstance(ticket, _RemoteTicket):
+            if self._store is not None:
+                await self._store.release(route, ticket, limit=limit, remaining=remaining,
+                                          reset_after=reset_after, bucket=bucket)
+            return
+
+        info = None if remaining is None else [limit, remaining, reset_after, bucket]
+        self._send('release', ticket.id, self._route_args(route), info)
+
+    async def exhaust(self, route, ticket, retry_after):
+        if not isinstance(ticket, _RemoteTicket):
+            if self._store is not None:
+                await self._store.exhaust(route, ticket, retry_after)
+            return
+
+        self._send('exhaust', ticket.id, retry_after)
+
+    async def set_global(self, retry_after):
+        await self._connect()
+        if self._store is not None:
+            await self._store.set_global(retry_after)
+        else:
+            self._send('set_global', retry_after)
+
+    def global_info(self):
+        if self.global_rate_limit is None:
+            return None
+        return GlobalRateLimitInfo(requests=self._requests, delayed=self._delayed, total_wait=self._total_wait,
+                                   max_wait=self._max_wait, queued=self._queued, max_queued=self._max_queued)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+        self._store = None
+
+    # server side
+
+    async def _serve(self, reader, writer):
+        tickets = {}
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                task = self.loop.create_task(self._handle(json.loads(line), tickets, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            # give back everything the process was holding on to
+            for bucket in tickets.values():
+                bucket.release()
+            writer.close()
+
+    async def _handle(self, msg, tickets, writer):
+        op = msg['op']
+        args = msg['args']
+        store = self._store
+        try:
+            if op == 'acquire':
+                bucket, waited, held = await store._wait(_RemoteRoute(*args[:4]), args[4])
+                tickets[msg['id']] = bucket
+                result = [bucket.key, waited, held]
+            elif op == 'release':
+                bucket = tickets.pop(args[0], None)
+                if bucket is not None:
+                    if args[2] is None:
+                        bucket.release()
+                    else:
+                        limit, remaining, reset_after, bucket_hash = args[2]
+                        await store.release(_RemoteRoute(*args[1]), bucket, limit=limit, remaining=remaining,
+                                            reset_after=reset_after, bucket=bucket_hash)
+                return
+            elif op == 'exhaust':
+                bucket = tickets.pop(args[0], None)
+                if bucket is not None:
+                    bucket.exhaust(args[1])
+                    bucket.release()
+                return
+            elif op == 'set_global':
+                await store.set_global(args[0])
+                return
+            else:
+                raise ValueError('unknown operation {!r}'.format(op))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            response = {'id': msg['id'], 'error': str(exc)}
+        else:
+            response = {'id': msg['id'], 'result': result}
+
+        if not writer.transport.is_closing():
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
@@ -47,7 +47,7 @@ from .message import Message
 from .relationship import Relationship
 from .channel import *
 from .raw_models import *
-from .member import Member
+from .member import Member, _Presence
 from .role import Role
 from .enums import ChannelType, try_enum, Status, Enum
 from . import utils
@@ -63,6 +63,205 @@ Listener = namedtuple('Listener', ('type', 'future', 'predicate'))
 log = logging.getLogger(__name__)
 ReadyState = namedtuple('ReadyState', ('launch', 'guilds'))
 
+# these events are required for the connection lifecycle and
+# the cache to function at all so they can never be filtered out
+_REQUIRED_EVENTS = frozenset((
+    'READY',
+    'RESUMED',
+    'GUILD_CREATE',
+    'GUILD_DELETE',
+    'GUILD_MEMBERS_CHUNK',
+    'VOICE_STATE_UPDATE',
+    'VOICE_SERVER_UPDATE',
+))
+
+def _member_responses(data):
+    user_id = data['user']['id']
+    return (('/guilds/{guild_id}/members/{member_id}', {'guild_id': data['guild_id'], 'member_id': user_id}),
+            ('/users/{user_id}', {'user_id': user_id}))
+
+def _presence_responses(data):
+    user = data['user']
+    if 'username' in user or 'avatar' in user:
+        return (('/users/{user_id}', {'user_id': user['id']}),)
+    return ()
+
+def _guild_responses(key):
+    return lambda data: (('/guilds/{guild_id}', {'guild_id': data[key]}),)
+
+# the cached REST responses that become stale with each gateway event
+_RESPONSE_INVALIDATIONS = {
+    'CHANNEL_UPDATE': lambda data: (('/channels/{channel_id}', {'channel_id': data['id']}),),
+    'CHANNEL_DELETE': lambda data: (('/channels/{channel_id}', {'channel_id': data['id']}),),
+    'GUILD_UPDATE': _guild_responses('id'),
+    'GUILD_DELETE': _guild_responses('id'),
+    'GUILD_ROLE_CREATE': _guild_responses('guild_id'),
+    'GUILD_ROLE_UPDATE': _guild_responses('guild_id'),
+    'GUILD_ROLE_DELETE': _guild_responses('guild_id'),
+    'GUILD_EMOJIS_UPDATE': _guild_responses('guild_id'),
+    'GUILD_MEMBER_UPDATE': _member_responses,
+    'GUILD_MEMBER_REMOVE': _member_responses,
+    'PRESENCE_UPDATE': _presence_responses,
+    'USER_UPDATE': lambda data: (('/users/{user_id}', {'user_id': data['id']}),),
+    'INVITE_DELETE': lambda data: (('/invite/{invite_id}', {'invite_id': data['code']}),),
+}
+
+# presence updates are by far the most frequent event, so decoding them when
+# they are filtered out would defeat the filter. The cached users they would
+# invalidate expire on their own instead.
+_UNDECODED_INVALIDATIONS = frozenset(('PRESENCE_UPDATE',))
+
+class _UserCache:
+    """Stores users with strong references.
+
+    Users that are members of a cached guild are kept for as long as they
+    are referenced. Every other user lives in a bounded LRU tail. Users
+    evicted from the tail are still tracked weakly so that a live instance
+    is reused instead of creating a duplicate. Cached users are also
+    indexed by name.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # user_id -> User for users referenced by a guild
+        self._referenced = {}
+        # user_id -> number of cached guilds referencing the user
+        self._refcounts = {}
+        self._lru = OrderedDict()
+        self._evicted = weakref.WeakValueDictionary()
+        # name -> dict of user IDs used as an ordered set
+        self._names = {}
+
+    def __len__(self):
+        return len(self._referenced) + len(self._lru)
+
+    def __contains__(self, user_id):
+        return user_id in self._referenced or user_id in self._lru
+
+    def __getitem__(self, user_id):
+        value = self.get(user_id)
+        if value is None:
+            raise KeyError(user_id)
+        return value
+
+    def __setitem__(self, user_id, user):
+        existing = self._peek(user_id)
+        if existing is not None:
+            self._unindex(user_id, existing.name)
+        self._index(user_id, user.name)
+
+        if user_id in self._refcounts:
+            self._referenced[user_id] = user
+        else:
+            self._lru[user_id] = user
+            self._lru.move_to_end(user_id)
+            self._trim()
+
+    def get(self, user_id, default=None):
+        try:
+            user = self._referenced[user_id]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return user
+
+        lru = self._lru
+        try:
+            user = lru[user_id]
+        except KeyError:
+            user = self._evicted.pop(user_id, None)
+            if user is None:
+                self.misses += 1
+                return default
+
+            # still alive elsewhere so bring it back
+            lru[user_id] = user
+            self._index(user_id, user.name)
+            self._trim()
+        else:
+            lru.move_to_end(user_id)
+
+        self.hits += 1
+        return user
+
+    def values(self):
+        return itertools.chain(self._referenced.values(), self._lru.values())
+
+    def _peek(self, user_id):
+        # like get but without touching the LRU order or the statistics
+        return self._referenced.get(user_id) or self._lru.get(user_id)
+
+    def _index(self, user_id, name):
+        try:
+            self._names[name][user_id] = None
+        except KeyError:
+            self._names[name] = {user_id: None}
+
+    def _unindex(self, user_id, name):
+        try:
+            users = self._names[name]
+            del users[user_id]
+        except KeyError:
+            return
+
+        if not users:
+            del self._names[name]
+
+    def named(self, name):
+        """Returns the cached users with the given name.
+
+        Like the member names of a guild, the index is updated on every
+        rename so users missing from it don't have that name.
+        """
+        peek = self._peek
+        users = (peek(user_id) for user_id in self._names.get(name, ()))
+        return [user for user in users if user is not None]
+
+    def rename(self, user_id, before, after):
+        if user_id in self:
+            self._unindex(user_id, before)
+            self._index(user_id, after)
+
+    def _trim(self):
+        lru = self._lru
+        while len(lru) > self.max_size:
+            user_id, user = lru.popitem(last=False)
+            self._evicted[user_id] = user
+            self._unindex(user_id, user.name)
+
+    def reference(self, user_id):
+        count = self._refcounts.get(user_id, 0)
+        self._refcounts[user_id] = count + 1
+        if count == 0:
+            user = self._lru.pop(user_id, None)
+            if user is None:
+                user = self._evicted.pop(user_id, None)
+                if user is not None:
+                    self._index(user_id, user.name)
+
+            if user is not None:
+                self._referenced[user_id] = user
+
+    def release(self, user_id):
+        # returns True once no cached guild references the user anymore
+        count = self._refcounts.get(user_id, 0) - 1
+        if count > 0:
+            self._refcounts[user_id] = count
+            return False
+
+        self._refcounts.pop(user_id, None)
+        user = self._referenced.pop(user_id, None)
+        if user is not None:
+            self._lru[user_id] = user
+            self._trim()
+        return True
+
+    def info(self):
+        return utils.CacheInfo(hits=self.hits, misses=self.misses, maxsize=self.max_size, currsize=len(self))
+
 class ConnectionState:
     def __init__(self, *, dispatch, handlers, hooks, syncer, http, loop, **options):
         self.loop = loop
@@ -71,6 +270,14 @@ class ConnectionState:
         if self.max_messages is not None and self.max_messages <= 0:
             self.max_messages = 1000
 
+        self.compact_member_threshold = options.get('compact_member_threshold')
+        self.permission_cache_size = options.get('permission_cache_size')
+        if self.permission_cache_size is not None and self.permission_cache_size <= 0:
+            raise ValueError('permission_cache_size must be greater than 0')
+        self.max_cached_users = options.get('max_cached_users', 1000)
+        if self.max_cached_users < 0:
+            raise ValueError('max_cached_users cannot be negative')
+
         self.dispatch = dispatch
         self.syncer = syncer
         self.is_bot = None
@@ -85,6 +292,20 @@ class ConnectionState:
             raise ValueError('guild_ready_timeout cannot be negative')
 
         self.guild_subscriptions = options.get('guild_subscriptions', True)
+
+        allowed_events = options.get('allowed_events')
+        if allowed_events is not None:
+            if isinstance(allowed_events, str):
+                raise TypeError('allowed_events parameter must be an iterable of event names, not str')
+            allowed_events = frozenset(e.upper() for e in allowed_events) | _REQUIRED_EVENTS
+
+        self.allowed_events = allowed_events
+        if http._response_cache is not None:
+            self.invalidating_events = frozenset(_RESPONSE_INVALIDATIONS)
+        else:
+            self.invalidating_events = frozenset()
+        # filtered events are still decoded just to invalidate cached responses
+        self.filtered_invalidating_events = self.invalidating_events - _UNDECODED_INVALIDATIONS
         allowed_mentions = options.get('allowed_mentions')
 
         if allowed_mentions is not None and not isinstance(allowed_mentions, AllowedMentions):
@@ -117,11 +338,26 @@ class ConnectionState:
             if attr.startswith('parse_'):
                 parsers[attr[6:].upper()] = func
 
+        for event in self.invalidating_events:
+            parsers[event] = self._invalidating_parser(event, parsers[event])
+
         self.clear()
 
+    def _invalidating_parser(self, event, parser):
+        def parse(data):
+            self.invalidate_responses(event, data)
+            parser(data)
+        return parse
+
+    def invalidate_responses(self, event, data):
+        for path, parameters in _RESPONSE_INVALIDATIONS[event](data):
+            self.http.invalidate_response(path, **parameters)
+
     def clear(self):
         self.user = None
-        self._users = weakref.WeakValueDictionary()
+        self._users = _UserCache(self.max_cached_users)
+        # user_id -> _Presence, offline users without activities are not stored
+        self._presences = {}
         self._emojis = {}
         self._calls = {}
         self._guilds = {}
@@ -219,6 +455,23 @@ class ConnectionState:
     def get_user(self, id):
         return self._users.get(id)
 
+    def _get_presence(self, user_id):
+        return self._presences.get(user_id, _Presence.EMPTY)
+
+    def _set_presence(self, user_id, presence):
+        if presence.is_empty():
+            self._presences.pop(user_id, None)
+        else:
+            self._presences[user_id] = presence
+
+    def _update_presence(self, user_id, data):
+        self._set_presence(user_id, _Presence.from_data(data, self._get_presence(user_id)))
+
+    def _release_user(self, user_id):
+        # presences are only kept for users sharing a cached guild
+        if self._users.release(user_id):
+            self._presences.pop(user_id, None)
+
     def store_emoji(self, guild, data):
         emoji_id = int(data['id'])
         self._emojis[emoji_id] = emoji = Emoji(guild=guild, state=self, data=data)
@@ -232,10 +485,21 @@ class ConnectionState:
         return self._guilds.get(guild_id)
 
     def _add_guild(self, guild):
+        old_guild = self._guilds.get(guild.id)
         self._guilds[guild.id] = guild
 
+        users = self._users
+        for user_id in guild._members:
+            users.reference(user_id)
+
+        if old_guild is not None and old_guild is not guild:
+            for user_id in old_guild._members:
+                self._release_user(user_id)
+
     def _remove_guild(self, guild):
-        self._guilds.pop(guild.id, None)
+        if self._guilds.pop(guild.id, None) is guild:
+            for user_id in guild._members:
+                self._release_user(user_id)
 
         for emoji in guild.emojis:
             self._emojis.pop(emoji.id, None)
@@ -573,18 +837,39 @@ class ConnectionState:
                 # skip these useless cases.
                 return
 
-            member, old_member = Member._from_presence_update(guild=guild, data=data, state=self)
+            member = Member(data=data, guild=guild, state=self)
             guild._add_member(member)
-        else:
-            old_member = Member._copy(member)
-            user_update = member._presence_update(data=data, user=user)
-            if user_update:
-                self.dispatch('user_update', user_update[0], user_update[1])
 
-        self.dispatch('member_update', old_member, member)
+        # snapshots are only worth creating if someone is going to receive them
+        old_member = Member._copy(member) if self._has_listeners('member_update') else None
+        user_update = member._presence_update(data=data, user=user)
+        if user_update:
+            self._rename_user(member_id, user_update[0].name, user_update[1].name)
+            self.dispatch('user_update', user_update[0], user_update[1])
+
+        if old_member is not None:
+            self.dispatch('member_update', old_member, member)
+
+    def _sync_member_user(self, member, user):
+        # other payloads carrying the full user can also be the first to show
+        # a rename, e.g. when PRESENCE_UPDATE is filtered out with allowed_events
+        user_update = member._update_user(user)
+        if user_update:
+            self._rename_user(member.id, user_update[0].name, user_update[1].name)
+
+    def _rename_user(self, user_id, before, after):
+        if before == after:
+            return
+
+        self._users.rename(user_id, before, after)
+        for guild in self._guilds.values():
+            guild._rename_member(user_id, before, after)
 
     def parse_user_update(self, data):
-        self.user._update(data)
+        user = self.user
+        before = user.name
+        user._update(data)
+        self._rename_user(user.id, before, user.name)
 
     def parse_invite_create(self, data):
         invite = Invite.from_gateway(state=self, data=data)
@@ -627,6 +912,8 @@ class ConnectionState:
             if channel is not None:
                 old_channel = copy.copy(channel)
                 channel._update(guild, data)
+                guild._rename_channel(channel, old_channel.name)
+                guild._invalidate_channel_permissions(channel_id)
                 self.dispatch('guild_channel_update', old_channel, channel)
             else:
                 log.warning('CHANNEL_UPDATE referencing an unknown channel ID: %s. Discarding.', channel_id)
@@ -729,6 +1016,9 @@ class ConnectionState:
         if member is not None:
             old_member = copy.copy(member)
             member._update(data)
+            guild._update_member(old_member, member)
+            if 'username' in user:
+                self._sync_member_user(member, user)
             self.dispatch('member_update', old_member, member)
         else:
             log.warning('GUILD_MEMBER_UPDATE referencing an unknown member ID: %s. Discarding.', user_id)
@@ -900,6 +1190,7 @@ class ConnectionState:
             if role is not None:
                 old_role = copy.copy(role)
                 role._update(role_data)
+                guild._invalidate_permissions()
                 self.dispatch('guild_role_update', old_role, role)
         else:
             log.warning('GUILD_ROLE_UPDATE referencing an unknown guild ID: %s. Discarding.', data['guild_id'])
@@ -907,13 +1198,15 @@ class ConnectionState:
     def parse_guild_members_chunk(self, data):
         guild_id = int(data['guild_id'])
         guild = self._get_guild(guild_id)
-        members = [Member(guild=guild, data=member, state=self) for member in data.get('members', [])]
+        payloads = data.get('members', [])
+        members = [Member(guild=guild, data=member, state=self) for member in payloads]
         log.debug('Processed a chunk for %s members in guild ID %s.', len(members), guild_id)
         if self._cache_members:
-            for member in members:
+            for member, payload in zip(members, payloads):
                 existing = guild.get_member(member.id)
                 if existing is None or existing.joined_at is None:
                     guild._add_member(member)
+                self._sync_member_user(member, payload['user'])
 
         self.process_listeners(ListenerType.chunk, guild, len(members))
         self.process_listeners(ListenerType.query_members, (guild_id, data.get('nonce')), members)
@@ -0,0 +1,110 @@
+import asyncio
+import types
+
+import pytest
+
+from ..ext import commands
+
+
+def message(content, guild_id=None, channel_id=0):
+    guild = None if guild_id is None else types.SimpleNamespace(id=guild_id)
+    return types.SimpleNamespace(content=content, guild=guild, channel=types.SimpleNamespace(id=channel_id))
+
+
+class IterablePrefixBot(commands.Bot):
+    def __init__(self, prefixes, **options):
+        super().__init__(command_prefix='unused', **options)
+        self.prefixes = prefixes
+
+    async def get_prefix(self, message):
+        return self.prefixes()
+
+
+@pytest.mark.parametrize('prefixes', [
+    lambda: ['!', '?'],
+    lambda: ('!', '?'),
+    lambda: {'!', '?'},
+    lambda: (prefix for prefix in ['!', '?']),
+])
+def test_get_prefix_may_return_any_iterable(prefixes):
+    async def run():
+        bot = IterablePrefixBot(prefixes)
+        for content in ('!ping', '?ping'):
+            matcher = await bot._get_prefix_matcher(message(content))
+            assert matcher.match(content) == content[0]
+        matcher = await bot._get_prefix_matcher(message('ping'))
+        assert matcher.match('ping') is None
+
+    asyncio.run(run())
+
+
+def test_get_prefix_must_return_strings():
+    async def run():
+        bot = IterablePrefixBot(lambda: 1)
+        with pytest.raises(TypeError):
+            await bot._get_prefix_matcher(message('!ping'))
+
+        bot = IterablePrefixBot(lambda: ['!', 1])
+        with pytest.raises(TypeError):
+            await bot._get_prefix_matcher(message('!ping'))
+
+    asyncio.run(run())
+
+
+class SlowResolver:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, message):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return 'prefix%d' % self.calls
+
+
+def test_prefix_cache_cancelled_caller_does_not_cancel_others():
+    async def run():
+        cache = commands.PrefixCache()
+        resolver = SlowResolver()
+        first = asyncio.ensure_future(cache._fetch(message('!', 1), resolver))
+        second = asyncio.ensure_future(cache._fetch(message('!', 1), resolver))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == 'prefix1'
+        assert first.cancelled()
+        assert resolver.calls == 1
+        assert await cache._fetch(message('!', 1), resolver) == 'prefix1'
+
+    asyncio.run(run())
+
+
+def test_prefix_cache_invalidated_while_resolving():
+    async def run():
+        cache = commands.PrefixCache()
+        resolver = SlowResolver()
+        pending = asyncio.ensure_future(cache._fetch(message('!', 1), resolver))
+        await asyncio.sleep(0.01)
+        cache.invalidate(types.SimpleNamespace(id=1))
+
+        assert await pending == 'prefix1'
+        assert await cache._fetch(message('!', 1), resolver) == 'prefix2'
+
+    asyncio.run(run())
+
+
+def test_prefix_cache_private_messages():
+    async def run():
+        resolver = SlowResolver()
+        cache = commands.PrefixCache()
+        assert await cache._fetch(message('!', channel_id=5), resolver) == 'prefix1'
+        assert await cache._fetch(message('!', channel_id=5), resolver) == 'prefix2'
+
+        cache = commands.PrefixCache(private_ttl=0.1)
+        assert await cache._fetch(message('!', channel_id=5), resolver) == 'prefix3'
+        assert await cache._fetch(message('!', channel_id=5), resolver) == 'prefix3'
+        assert await cache._fetch(message('!', channel_id=6), resolver) == 'prefix4'
+
+        await asyncio.sleep(0.1)
+        assert await cache._fetch(message('!', channel_id=5), resolver) == 'prefix5'
+
+    asyncio.run(run())
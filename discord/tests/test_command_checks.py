@@ -0,0 +1,81 @@
+import asyncio
+import types
+
+import pytest
+
+from ..ext import commands
+
+
+async def callback(ctx):
+    pass
+
+
+def make_context(bot):
+    return types.SimpleNamespace(bot=bot, command=None)
+
+
+def test_can_run_short_circuits():
+    async def run():
+        calls = []
+
+        def check(result):
+            def predicate(ctx):
+                calls.append(result)
+                return result
+            return predicate
+
+        bot = commands.Bot(command_prefix='!')
+        bot.add_check(check(False))
+        command = commands.Command(callback, name='command', checks=[check(True)])
+        ctx = make_context(bot)
+        with pytest.raises(commands.CheckFailure):
+            await command.can_run(ctx)
+        assert calls == [False]
+        assert ctx.command is None
+
+        calls.clear()
+        bot = commands.Bot(command_prefix='!')
+        command = commands.Command(callback, name='command', checks=[check(False), check(True)])
+        assert not await command.can_run(make_context(bot))
+        assert calls == [False]
+
+    asyncio.run(run())
+
+
+class HiddenFromHelp(commands.Command):
+    async def can_run(self, ctx, **kwargs):
+        return False
+
+
+class LegacyHiddenFromHelp(commands.Command):
+    # an override written before can_run took an evaluator
+    async def can_run(self, ctx):
+        assert ctx.command is None
+        return False
+
+
+@pytest.mark.parametrize('check_concurrency', [None, 4])
+def test_filter_commands_uses_can_run_overrides(check_concurrency):
+    async def run():
+        calls = []
+
+        def global_check(ctx):
+            calls.append(ctx.command.name)
+            return True
+
+        bot = commands.Bot(command_prefix='!', help_command=None)
+        bot.add_check(global_check)
+        bot.add_command(commands.Command(callback, name='visible'))
+        bot.add_command(commands.Command(callback, name='other'))
+        bot.add_command(HiddenFromHelp(callback, name='hidden'))
+        bot.add_command(LegacyHiddenFromHelp(callback, name='legacy'))
+
+        help_command = commands.DefaultHelpCommand(check_concurrency=check_concurrency)
+        help_command.context = make_context(bot)
+        filtered = await help_command.filter_commands(bot.commands)
+
+        assert sorted(command.name for command in filtered) == ['other', 'visible']
+        # with an evaluator the global checks are shared between commands
+        assert len(calls) == (1 if check_concurrency else 2)
+
+    asyncio.run(run())
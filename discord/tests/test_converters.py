@@ -0,0 +1,48 @@
+import asyncio
+import types
+
+import pytest
+
+from ..ext import commands
+from .test_member_cache import make_guild, make_state, user_data
+
+
+class NoScan(dict):
+    def __iter__(self):
+        raise AssertionError('the members were scanned')
+
+    values = items = __iter__
+
+
+def make_context(guild_count=50):
+    state = make_state()
+    guilds = [make_guild(state, 100 + i, [1, 1000 + i]) for i in range(guild_count)]
+    bot = types.SimpleNamespace(guilds=guilds, get_user=state.get_user)
+    ctx = types.SimpleNamespace(bot=bot, _state=state, guild=None, message=types.SimpleNamespace(mentions=[]))
+    return state, guilds, ctx
+
+
+def convert(converter, ctx, argument):
+    async def run():
+        return await converter.convert(ctx, argument)
+    return asyncio.run(run())
+
+
+def test_converters_agree_on_renames():
+    state, guilds, ctx = make_context()
+    last = 1000 + len(guilds) - 1
+    state.parse_presence_update({'guild_id': str(guilds[-1].id), 'user': dict(user_data(last), username='renamed'),
+                                 'status': 'online', 'activities': []})
+
+    for guild in guilds:
+        guild._members = NoScan(guild._members)
+    state._users.values = lambda: pytest.fail('the users were scanned')
+
+    for converter in (commands.MemberConverter(), commands.UserConverter()):
+        assert convert(converter, ctx, 'renamed').id == last
+        assert convert(converter, ctx, 'renamed#0001').id == last
+        with pytest.raises(commands.BadArgument):
+            convert(converter, ctx, 'user%d' % last)
+        # a name that no guild has is a miss everywhere
+        with pytest.raises(commands.BadArgument):
+            convert(converter, ctx, 'nobody')
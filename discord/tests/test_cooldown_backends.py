@@ -0,0 +1,115 @@
+import asyncio
+import sqlite3
+import types
+
+import pytest
+
+from ..ext import commands
+
+
+def message(user_id):
+    return types.SimpleNamespace(author=types.SimpleNamespace(id=user_id))
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        yield commands.MemoryCooldownBackend()
+    else:
+        backend = commands.SQLiteCooldownBackend(str(tmp_path / 'cooldowns.db'))
+        yield backend
+        backend.close()
+
+
+def test_shared_cooldown(backend):
+    first = commands.CooldownMapping.from_cooldown(2, 60.0, commands.BucketType.user)
+    second = first.copy()
+    first._bind(backend, 'command')
+    second._bind(backend, 'command')
+
+    assert first.update_rate_limit(message(0)) is None
+    assert second.update_rate_limit(message(0)) is None
+    assert first.update_rate_limit(message(0)) > 0
+    assert second.get_bucket(message(0)).get_tokens() == 0
+
+    # other users have their own buckets
+    assert second.update_rate_limit(message(1)) is None
+
+    second.get_bucket(message(0)).reset()
+    assert first.update_rate_limit(message(0)) is None
+
+
+def test_shared_max_concurrency(backend):
+    first = commands.MaxConcurrency(1, per=commands.BucketType.user, wait=False)
+    second = first.copy()
+    first._bind(backend, 'command')
+    second._bind(backend, 'command')
+
+    async def run():
+        await first.acquire(message(0))
+        with pytest.raises(commands.MaxConcurrencyReached):
+            await second.acquire(message(0))
+
+        await first.release(message(0))
+        await second.acquire(message(0))
+
+    asyncio.run(run())
+
+
+def test_sqlite_backend_does_not_block_the_loop(tmp_path):
+    path = str(tmp_path / 'cooldowns.db')
+    backend = commands.SQLiteCooldownBackend(path, timeout=0.5)
+    mapping = commands.CooldownMapping.from_cooldown(1, 60.0, commands.BucketType.user)
+    mapping._bind(backend, 'command')
+
+    # another process holding the write lock
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute('BEGIN IMMEDIATE')
+
+    async def run():
+        ticks = 0
+        update = asyncio.ensure_future(mapping.get_bucket(message(0))._update_rate_limit_async())
+        while not update.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+            if ticks == 10:
+                other.execute('COMMIT')
+
+        assert ticks >= 10
+        assert await update is None
+
+    try:
+        asyncio.run(run())
+    finally:
+        other.close()
+        backend.close()
+
+
+def test_sqlite_backend_batches_queued_calls(tmp_path):
+    backend = commands.SQLiteCooldownBackend(str(tmp_path / 'cooldowns.db'))
+    mapping = commands.CooldownMapping.from_cooldown(1, 60.0, commands.BucketType.user)
+    mapping._bind(backend, 'command')
+    transactions = []
+    run_batch = backend._run_batch
+    backend._run_batch = lambda batch: transactions.append(len(batch)) or run_batch(batch)
+
+    def fail(state):
+        raise ValueError
+
+    async def run():
+        updates = [mapping.get_bucket(message(i))._update_rate_limit_async() for i in range(50)]
+        updates.append(backend.call('update', 'command', 'broken', 60.0, fail))
+        return await asyncio.gather(*updates, return_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+        assert results[:50] == [None] * 50
+        assert isinstance(results[50], ValueError)
+        assert len(transactions) < 51
+        # every bucket was written despite the failing call
+        assert all(mapping.update_rate_limit(message(i)) > 0 for i in range(50))
+    finally:
+        backend.close()
+
+    with pytest.raises(RuntimeError):
+        backend.get('command', 'key')
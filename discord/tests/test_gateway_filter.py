@@ -0,0 +1,121 @@
+import asyncio
+import json
+import zlib
+
+import pytest
+
+from ..gateway import DiscordWebSocket
+from ..state import ConnectionState
+
+
+def make_ws(allowed):
+    ws = DiscordWebSocket(None, loop=None)
+    ws.shard_id = None
+    ws.dispatched = []
+    ws.parsed = []
+    ws._dispatch = lambda event, *args: ws.dispatched.append(event)
+    ws._discord_parsers = {
+        'MESSAGE_CREATE': lambda data: ws.parsed.append('MESSAGE_CREATE'),
+        'PRESENCE_UPDATE': lambda data: ws.parsed.append('PRESENCE_UPDATE'),
+    }
+    ws._allowed_events = frozenset(allowed)
+    ws._allowed_raw_events = frozenset(event.encode('ascii') for event in allowed)
+    return ws
+
+
+def frame(event, seq, order=('t', 's', 'op', 'd')):
+    values = {'t': event, 's': seq, 'op': 0, 'd': {'t': 'MESSAGE_CREATE', 'content': 'x'}}
+    return '{' + ','.join('"%s":%s' % (key, json.dumps(values[key])) for key in order) + '}'
+
+
+def compressed(messages):
+    compressor = zlib.compressobj()
+    return [compressor.compress(message.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH) for message in messages]
+
+
+@pytest.mark.parametrize('order', [('t', 's', 'op', 'd'), ('op', 's', 't', 'd'), ('d', 'op', 's', 't')])
+@pytest.mark.parametrize('compress', [False, True])
+def test_filtered_events_are_dropped(order, compress):
+    async def run():
+        ws = make_ws({'MESSAGE_CREATE'})
+        messages = [frame('PRESENCE_UPDATE', 5, order), frame('MESSAGE_CREATE', 6, order), frame('PRESENCE_UPDATE', 7, order)]
+        if compress:
+            messages = compressed(messages)
+
+        await ws.received_message(messages[0])
+        assert ws.sequence == 5
+        await ws.received_message(messages[1])
+        await ws.received_message(messages[2])
+
+        assert ws.sequence == 7
+        assert ws.parsed == ['MESSAGE_CREATE']
+        assert ws.dispatched.count('socket_response') == 1
+
+    asyncio.run(run())
+
+
+def test_waited_for_events_are_not_filtered():
+    async def run():
+        ws = make_ws({'MESSAGE_CREATE'})
+        ws.loop = asyncio.get_event_loop()
+        future = ws.wait_for('PRESENCE_UPDATE', lambda data: True)
+
+        await ws.received_message(frame('PRESENCE_UPDATE', 1))
+        assert ws.parsed == ['PRESENCE_UPDATE']
+        assert future.done()
+
+    asyncio.run(run())
+
+
+class FakeHTTP:
+    def __init__(self):
+        self._response_cache = object()
+        self.invalidated = []
+
+    def invalidate_response(self, path, **parameters):
+        self.invalidated.append(path.format(**parameters))
+
+
+def make_invalidating_ws(http):
+    state = ConnectionState(dispatch=lambda *args: None, handlers={}, hooks={}, syncer=None,
+                            http=http, loop=None, allowed_events=['MESSAGE_CREATE'])
+    assert 'USER_UPDATE' not in state.allowed_events
+
+    ws = make_ws(state.allowed_events)
+    ws._connection = state
+    ws._invalidating_events = state.filtered_invalidating_events
+    ws._invalidating_raw_events = frozenset(e.encode('ascii') for e in state.filtered_invalidating_events)
+    return ws
+
+
+def test_filtered_events_invalidate_cached_responses():
+    async def run():
+        http = FakeHTTP()
+        ws = make_invalidating_ws(http)
+        update = {'t': 'USER_UPDATE', 's': 3, 'op': 0,
+                  'd': {'id': '5', 'username': 'renamed', 'discriminator': '0001', 'avatar': None}}
+
+        await ws.received_message(compressed([json.dumps(update)])[0])
+        assert ws.sequence == 3
+        assert http.invalidated == ['/users/5']
+        assert ws.parsed == []
+        assert 'socket_response' not in ws.dispatched
+
+    asyncio.run(run())
+
+
+def test_filtered_presence_updates_are_not_decoded(monkeypatch):
+    async def run():
+        http = FakeHTTP()
+        ws = make_invalidating_ws(http)
+        decoded = []
+        monkeypatch.setattr(json, 'loads', lambda *args, **kwargs: decoded.append(args))
+        presence = {'t': 'PRESENCE_UPDATE', 's': 3, 'op': 0,
+                    'd': {'user': {'id': '5', 'username': 'renamed'}, 'status': 'online'}}
+
+        await ws.received_message(compressed([json.dumps(presence)])[0])
+        assert ws.sequence == 3
+        assert decoded == []
+        assert http.invalidated == []
+
+    asyncio.run(run())
@@ -0,0 +1,59 @@
+import asyncio
+import types
+
+import pytest
+
+from ..ext import commands
+from ..ext.commands.help import _HelpCache
+
+
+async def callback(ctx, arg):
+    pass
+
+
+@pytest.fixture
+def bot():
+    loop = asyncio.new_event_loop()
+    yield commands.Bot(command_prefix='!', help_command=None, loop=loop)
+    loop.close()
+
+
+def make_help(bot, **options):
+    for name in ('first', 'second', 'third'):
+        bot.add_command(commands.Command(callback, name=name))
+
+    help_command = commands.DefaultHelpCommand(**options)
+    help_command.context = types.SimpleNamespace(
+        guild=None, prefix='!', bot=types.SimpleNamespace(user=types.SimpleNamespace(id=1, display_name='bot')))
+    return help_command
+
+
+def test_signatures_are_not_cached_by_default(bot):
+    help_command = make_help(bot)
+    command = bot.get_command('first')
+    assert help_command.get_command_signature(command) == '!first <arg>'
+    assert help_command._cache.signatures == {}
+
+    command.aliases = ['one']
+    assert help_command.get_command_signature(command) == '![first|one] <arg>'
+
+
+def test_signatures_are_cached_until_the_tree_changes(bot):
+    help_command = make_help(bot, cache_ttl=60.0)
+    command = bot.get_command('first')
+    assert help_command.get_command_signature(command) == '!first <arg>'
+
+    # aliases changed in place are not seen until the command tree changes
+    command.aliases = ['one']
+    assert help_command.get_command_signature(command) == '!first <arg>'
+
+    bot.add_command(commands.Command(callback, name='fourth'))
+    assert help_command.get_command_signature(command) == '![first|one] <arg>'
+
+
+def test_signatures_cache_is_bounded(bot, monkeypatch):
+    monkeypatch.setattr(_HelpCache, 'MAX_SIGNATURES', 2)
+    help_command = make_help(bot, cache_ttl=60.0)
+    for command in bot.commands:
+        help_command.get_command_signature(command)
+        assert len(help_command._cache.signatures) <= 2
@@ -0,0 +1,183 @@
+import asyncio
+import datetime
+import gc
+import io
+import json
+
+from .. import utils
+from ..iterators import HistoryIterator, HistoryExport
+from ..object import Object
+
+
+class FakeHTTP:
+    def __init__(self, count, delay=0, ids=None):
+        self.ids = sorted(ids or range(1, count + 1), reverse=True)
+        self.delay = delay
+        self.calls = 0
+
+    async def logs_from(self, channel_id, limit, before=None, after=None, around=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if after is not None:
+            ids = sorted(i for i in self.ids if i > after)[:limit]
+            return [{'id': i} for i in reversed(ids)]
+        ids = [i for i in self.ids if before is None or i < before]
+        return [{'id': i} for i in ids[:limit]]
+
+
+class FakeState:
+    def __init__(self, http, loop):
+        self.http = http
+        self.loop = loop
+
+    def create_message(self, *, channel, data):
+        return ('message', data['id'])
+
+
+class FakeChannel:
+    id = 1
+
+    def __init__(self, state):
+        self._state = state
+
+    async def _get_channel(self):
+        return self
+
+
+def channel(count, delay=0, ids=None):
+    return FakeChannel(FakeState(FakeHTTP(count, delay, ids), asyncio.get_event_loop()))
+
+
+def spread_ids(count, days=30):
+    now = datetime.datetime.utcnow()
+    # denser towards the end like most channels
+    return [utils.time_snowflake(now - datetime.timedelta(days=days * (i / count) ** 2)) + i for i in range(count)]
+
+
+def test_prefetch_returns_the_same_messages():
+    async def run():
+        plain = [m async for m in HistoryIterator(channel(250), limit=None)]
+        prefetched = [m async for m in HistoryIterator(channel(250), limit=None, prefetch=2)]
+        flattened = await HistoryIterator(channel(250), limit=None, prefetch=2).flatten()
+        assert plain == prefetched == flattened
+        assert plain[0] == ('message', 250)
+        assert len(plain) == 250
+
+    asyncio.run(run())
+
+
+def test_prefetch_requests_ahead():
+    async def run():
+        ch = channel(500, delay=0.01)
+        iterator = HistoryIterator(ch, limit=None, prefetch=2)
+        await iterator.next()
+        await asyncio.sleep(0.1)
+        # the current page plus two pages queued ahead of the consumer
+        assert ch._state.http.calls == 3
+
+    asyncio.run(run())
+
+
+def test_raw_mode_yields_payloads():
+    async def run():
+        messages = await HistoryIterator(channel(150), limit=120, raw=True).flatten()
+        assert messages[0] == {'id': 150}
+        assert len(messages) == 120
+
+    asyncio.run(run())
+
+
+def test_abandoned_iterator_stops_prefetching():
+    async def run():
+        ch = channel(10000, delay=0.01)
+        iterator = HistoryIterator(ch, limit=None, prefetch=1)
+        await iterator.next()
+        del iterator
+        gc.collect()
+        await asyncio.sleep(0.05)
+        calls = ch._state.http.calls
+        await asyncio.sleep(0.1)
+        assert ch._state.http.calls == calls
+
+    asyncio.run(run())
+
+
+def test_bounded_history_stops_at_the_other_end():
+    async def run():
+        ch = channel(1000)
+        messages = await HistoryIterator(ch, limit=None, after=Object(id=100), before=Object(id=350)).flatten()
+        assert [m[1] for m in messages] == list(range(101, 350))
+        assert ch._state.http.calls == 3
+
+    asyncio.run(run())
+
+
+def test_export_writes_every_message_in_order():
+    async def run():
+        ids = spread_ids(1234)
+        ch = channel(0, delay=0.001, ids=ids)
+        fp = io.StringIO()
+        count = await HistoryExport(ch, fp, after=Object(id=min(ids) - 1), partitions=8, concurrency=3).run()
+        exported = [json.loads(line)['id'] for line in fp.getvalue().splitlines()]
+        assert count == 1234
+        assert exported == sorted(ids)
+
+    asyncio.run(run())
+
+
+def test_export_resumes_from_checkpoint(tmp_path):
+    async def run():
+        ids = spread_ids(500)
+        after = Object(id=min(ids) - 1)
+        received = []
+
+        async def sink(payload):
+            if len(received) == 250:
+                raise RuntimeError('interrupted')
+            received.append(payload['id'])
+
+        checkpoint = str(tmp_path / 'checkpoint')
+        try:
+            await HistoryExport(channel(0, ids=ids), sink, after=after, checkpoint=checkpoint).run()
+        except RuntimeError:
+            pass
+
+        resumed = []
+        sink = lambda payload: resumed.append(payload['id'])
+        await HistoryExport(channel(0, ids=ids), sink, after=after, checkpoint=checkpoint).run()
+        last = int(open(checkpoint).read())
+        assert last == max(ids)
+        # only the page being written when interrupted is exported twice
+        assert sorted(set(received + resumed)) == sorted(ids)
+        assert len(received) + len(resumed) - len(ids) < 100
+
+    asyncio.run(run())
+
+
+def test_export_keeps_fetching_past_a_slow_interval():
+    async def run():
+        ids = spread_ids(400)
+        after = min(ids) - 1
+        ch = channel(0, ids=ids)
+        http = ch._state.http
+        requested = []
+        logs_from = http.logs_from
+
+        async def slow_head(channel_id, limit, before=None, after=None, around=None):
+            requested.append(after)
+            if len(requested) == 1:
+                await asyncio.sleep(0.2)
+            return await logs_from(channel_id, limit, before=before, after=after, around=around)
+
+        http.logs_from = slow_head
+        written = []
+        export = HistoryExport(ch, lambda payload: written.append((payload['id'], len(requested))),
+                               after=Object(id=after), partitions=5, concurrency=2)
+        await export.run()
+
+        assert [message_id for message_id, _ in written] == sorted(ids)
+        # the other intervals were all fetched while the first one was still waiting
+        assert requested[0] == after
+        assert written[0][1] == len(requested)
+
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+import asyncio
+import datetime
+
+from .. import utils
+from ..errors import HTTPException, NotFound
+from ..http import HTTPClient
+
+
+class FakeResponse:
+    status = 400
+    reason = 'Bad Request'
+
+
+def snowflake(days_ago, offset=0):
+    when = datetime.datetime.utcnow() - datetime.timedelta(days=days_ago)
+    return utils.time_snowflake(when) + offset
+
+
+def client(bulk_result=None, missing=(), window=0.01):
+    http = HTTPClient(bulk_delete_window=window)
+    http.bot_token = True
+    calls = []
+
+    async def delete_messages(channel_id, message_ids, *, reason=None):
+        calls.append(('bulk', channel_id, sorted(message_ids)))
+        if bulk_result is not None:
+            raise bulk_result
+
+    async def delete_message(channel_id, message_id, *, reason=None):
+        calls.append(('single', channel_id, message_id))
+        if message_id in missing:
+            raise NotFound(FakeResponse(), 'Unknown Message')
+
+    http.delete_messages = delete_messages
+    http._delete_message = delete_message
+    return http, calls
+
+
+def test_deletes_are_coalesced():
+    async def run():
+        http, calls = client()
+        recent = [snowflake(1, i) for i in range(3)]
+        old = snowflake(20)
+        await asyncio.gather(*[http.delete_message(1, m) for m in recent + [old]], http.delete_message(2, recent[0]))
+        assert ('bulk', 1, recent) in calls
+        assert ('single', 1, old) in calls
+        assert ('single', 2, recent[0]) in calls
+        assert len(calls) == 3
+
+    asyncio.run(run())
+
+
+def test_failed_bulk_delete_falls_back():
+    async def run():
+        recent, missing = snowflake(1), snowflake(1, 1)
+        http, calls = client(HTTPException(FakeResponse(), 'Invalid Form Body'), missing=(missing,))
+        results = await asyncio.gather(http.delete_message(1, recent), http.delete_message(1, missing),
+                                       return_exceptions=True)
+        assert results[0] is None
+        assert isinstance(results[1], NotFound)
+        assert calls[0][0] == 'bulk'
+        assert len(calls) == 3
+
+    asyncio.run(run())
+
+
+def test_close_sends_pending_deletes():
+    async def run():
+        http, calls = client(window=60)
+        recent = [snowflake(1, i) for i in range(2)]
+        futures = [http.delete_message(1, m) for m in recent]
+        await asyncio.sleep(0)
+        assert calls == []
+
+        await asyncio.wait_for(http.close(), 1)
+        assert calls == [('bulk', 1, recent)]
+        assert all(future.done() and future.result() is None for future in futures)
+
+    asyncio.run(run())
+
+
+def test_unexpected_bulk_delete_errors_reach_every_caller():
+    async def run():
+        http, calls = client(RuntimeError('session closed'))
+        results = await asyncio.wait_for(asyncio.gather(http.delete_message(1, snowflake(1)),
+                                                        http.delete_message(1, snowflake(1, 1)),
+                                                        return_exceptions=True), 1)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(calls) == 1
+
+    asyncio.run(run())
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from ..enums import RequestPriority
+from ..http import HTTPClient
+from ..ratelimits import _GlobalRateLimiter, _RateLimitBucket, MemoryRateLimitStore, SocketRateLimitStore
+
+
+def test_global_rate_limiter_spreads_requests():
+    async def run():
+        loop = asyncio.get_event_loop()
+        limiter = _GlobalRateLimiter(10, 0.1, loop)
+        start = loop.time()
+        await asyncio.gather(*[limiter.acquire(1) for _ in range(20)])
+        elapsed = loop.time() - start
+
+        info = limiter.info()
+        assert info.requests == 20
+        assert info.delayed == 10
+        assert info.queued == 0
+        assert info.max_queued == 10
+        assert info.max_wait <= info.total_wait
+        # the first 10 go out immediately, the rest at 100 per second
+        assert 0.09 <= elapsed < 0.5
+
+    asyncio.run(run())
+
+
+
+def test_global_rate_limiter_priorities():
+    async def run():
+        loop = asyncio.get_event_loop()
+        limiter = _GlobalRateLimiter(1, 0.05, loop)
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire(priority.value)
+            order.append(name)
+
+        await request('first', RequestPriority.normal)
+        tasks = [loop.create_task(request('low', RequestPriority.low))]
+        await asyncio.sleep(0)
+        tasks.append(loop.create_task(request('normal', RequestPriority.normal)))
+        tasks.append(loop.create_task(request('high', RequestPriority.high)))
+        await asyncio.gather(*tasks)
+        assert order == ['first', 'high', 'normal', 'low']
+
+    asyncio.run(run())
+
+
+class FakeRoute:
+    def __init__(self, method, path, channel_id=None, guild_id=None):
+        self.method = method
+        self.path = path
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+
+    @property
+    def bucket(self):
+        return '{0.channel_id}:{0.guild_id}:{0.path}'.format(self)
+
+
+def test_memory_store_shares_bucket_hashes():
+    async def run():
+        store = MemoryRateLimitStore()
+        first = FakeRoute('GET', '/channels/{channel_id}/a', channel_id=1)
+        second = FakeRoute('POST', '/channels/{channel_id}/b', channel_id=1)
+
+        ticket = await store.acquire(first)
+        await store.release(first, ticket, limit=2, remaining=1, reset_after=60.0, bucket='abc')
+        ticket = await store.acquire(second)
+        await store.release(second, ticket, limit=2, remaining=1, reset_after=60.0, bucket='abc')
+
+        # both routes now share the bucket, which has one request left
+        ticket = await store.acquire(first)
+        assert ticket.key == 'abc:1:None'
+        waiter = asyncio.ensure_future(store.acquire(second))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        waiter.cancel()
+
+    asyncio.run(run())
+
+
+def test_memory_store_reports_global_waits():
+    async def run():
+        store = MemoryRateLimitStore()
+        route = FakeRoute('GET', '/gateway')
+        ticket, waited = await store._acquire_timed(route, RequestPriority.normal)
+        assert waited == 0.0
+        await store.release(route, ticket)
+
+        await store.set_global(0.05)
+        ticket, waited = await store._acquire_timed(route, RequestPriority.normal)
+        assert waited >= 0.04
+
+    asyncio.run(run())
+
+
+@pytest.mark.skipif(not hasattr(asyncio, 'start_unix_server'), reason='requires Unix domain sockets')
+def test_socket_store_coordinates(tmp_path):
+    async def run():
+        path = str(tmp_path / 'ratelimits.sock')
+        host = SocketRateLimitStore(path)
+        other = SocketRateLimitStore(path)
+        route = FakeRoute('POST', '/channels/{channel_id}/messages', channel_id=1)
+        try:
+            ticket = await host.acquire(route)
+            assert host.is_host
+            await host.release(route, ticket, limit=1, remaining=0, reset_after=0.2, bucket='abc')
+
+            loop = asyncio.get_event_loop()
+            start = loop.time()
+            ticket = await other.acquire(route)
+            assert not other.is_host
+            assert ticket.key == 'abc:1:None'
+            assert loop.time() - start >= 0.15
+            await other.release(route, ticket, limit=1, remaining=1, reset_after=0.2, bucket='abc')
+        finally:
+            await other.close()
+            await host.close()
+
+    asyncio.run(run())
+
+
+def test_bucket_release_without_headers_does_not_deadlock():
+    async def run():
+        loop = asyncio.get_event_loop()
+        bucket = _RateLimitBucket('key', loop)
+        bucket.seed(1, 1, 0.05)
+        assert await bucket.acquire(1)
+        bucket.release(1, 0, 0.05)
+        await asyncio.sleep(0.06)
+
+        # the window has passed, so this starts a new one without a known reset
+        assert await bucket.acquire(1)
+        waiter = loop.create_task(bucket.acquire(1))
+        await asyncio.sleep(0)
+        # e.g. a 5xx response or a connection error, neither has rate limit headers
+        bucket.release()
+        assert await asyncio.wait_for(waiter, timeout=2.0)
+
+    asyncio.run(run())
+
+
+def test_http_client_closes_only_its_own_store():
+    class Store(MemoryRateLimitStore):
+        closed = False
+
+        async def close(self):
+            self.closed = True
+
+    async def run():
+        shared = Store()
+        await HTTPClient(rate_limit_store=shared).close()
+        assert not shared.closed
+
+        http = HTTPClient()
+        http._rate_limits = owned = Store()
+        await http.close()
+        assert owned.closed
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+import asyncio
+
+from ..http import Route, _ResponseCache
+
+
+def test_cached_and_shared():
+    async def run():
+        cache = _ResponseCache(2)
+        calls = []
+
+        async def request():
+            calls.append(None)
+            await asyncio.sleep(0.01)
+            return {'id': '1', 'name': 'foo'}
+
+        route = Route('GET', '/users/{user_id}', user_id=1)
+        ttl = cache.ttl_for(route)
+        results = await asyncio.gather(*[cache.fetch(route, None, ttl, request) for _ in range(3)])
+        assert len(calls) == 1
+        assert results[0] == results[1] == results[2]
+        assert results[0] is not results[1]
+
+        # callers get their own copy
+        results[0]['name'] = 'bar'
+        assert (await cache.fetch(route, None, ttl, request))['name'] == 'foo'
+        assert len(calls) == 1
+        assert cache.info().hits == 3
+
+        assert cache.ttl_for(Route('DELETE', '/users/{user_id}', user_id=1)) is None
+        assert cache.ttl_for(Route('GET', '/channels/{channel_id}/messages', channel_id=1)) is None
+
+    asyncio.run(run())
+
+
+def test_invalidation():
+    async def run():
+        cache = _ResponseCache(10)
+        route = Route('GET', '/channels/{channel_id}', channel_id=1)
+        responses = iter(['old', 'new', 'newer'])
+
+        async def request():
+            await asyncio.sleep(0.01)
+            return next(responses)
+
+        assert await cache.fetch(route, None, 30.0, request) == 'old'
+        cache.invalidate(route.url)
+        assert cache.info().currsize == 0
+
+        # an update arriving while the request is in flight is not overwritten
+        pending = asyncio.ensure_future(cache.fetch(route, None, 30.0, request))
+        await asyncio.sleep(0)
+        cache.invalidate(route.url)
+        assert await pending == 'new'
+        assert await cache.fetch(route, None, 30.0, request) == 'newer'
+
+    asyncio.run(run())
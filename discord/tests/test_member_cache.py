@@ -0,0 +1,205 @@
+from ..enums import Status
+from ..guild import Guild
+from ..member import _CompactMemberStore, _Presence
+from ..state import ConnectionState
+from ..user import ClientUser
+
+
+class FakeHTTP:
+    _response_cache = None
+
+
+def make_state(**options):
+    state = ConnectionState(dispatch=lambda *args: None, handlers={}, hooks={}, syncer=None,
+                            http=FakeHTTP(), loop=None, **options)
+    state._has_listeners = lambda event: False
+    state.user = ClientUser(state=state, data=user_data(1, 'bot'))
+    state._users[1] = state.user
+    return state
+
+
+def user_data(user_id, name=None):
+    return {'id': str(user_id), 'username': name or 'user%d' % user_id, 'discriminator': '0001', 'avatar': None}
+
+
+def make_guild(state, guild_id, member_ids, status='online', roles=()):
+    data = {
+        'id': str(guild_id),
+        'name': 'guild',
+        'member_count': len(member_ids),
+        'channels': [],
+        'roles': [{'id': str(role_id), 'name': 'role', 'permissions': 0, 'position': 0,
+                   'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}
+                  for role_id in (guild_id,) + tuple(roles)],
+        'members': [{'user': user_data(i), 'roles': [], 'joined_at': None} for i in member_ids],
+        'presences': [{'user': {'id': str(i)}, 'status': status, 'activities': []} for i in member_ids],
+    }
+    guild = Guild(data=data, state=state)
+    state._add_guild(guild)
+    return guild
+
+
+def test_own_presence_is_per_guild():
+    state = make_state()
+    first = make_guild(state, 100, [1, 2])
+    second = make_guild(state, 200, [1, 2])
+
+    # what AutoShardedClient.change_presence does for the guilds of one shard
+    first.me.status = Status.idle
+    assert first.me.status is Status.idle
+    assert second.me.status is Status.online
+    assert first.get_member(2).status is Status.online
+
+    # a presence update from the gateway replaces the local one again
+    state.parse_presence_update({'guild_id': '100', 'user': {'id': '1'}, 'status': 'dnd', 'activities': []})
+    assert first.me.status is Status.dnd
+
+
+def test_presences_are_pruned_with_the_last_guild():
+    state = make_state()
+    first = make_guild(state, 100, [1, 2, 3])
+    second = make_guild(state, 200, [1, 3])
+    assert set(state._presences) == {1, 2, 3}
+
+    state._remove_guild(first)
+    assert set(state._presences) == {1, 3}
+
+    second._remove_member(second.get_member(3))
+    assert set(state._presences) == {1}
+
+
+def compact_guild(monkeypatch, member_ids):
+    monkeypatch.setattr(_CompactMemberStore, 'max_live', 2)
+    state = make_state(compact_member_threshold=1)
+    guild = make_guild(state, 100, member_ids, roles=(10, 11))
+    assert isinstance(guild._members, _CompactMemberStore)
+    return state, guild
+
+
+def evict(guild, keep):
+    # materializing other members pushes the member out of the LRU
+    for member_id in guild._members:
+        if member_id != keep:
+            guild.get_member(member_id)
+    assert keep not in guild._members._live
+
+
+def test_compact_store_keeps_in_place_changes(monkeypatch):
+    state, guild = compact_guild(monkeypatch, [1, 2, 3, 4, 5])
+
+    member = guild.get_member(2)
+    assert guild.get_member(2) is member
+    member.nick = 'nick'
+    member._roles.add(10)
+    state.parse_presence_update({'guild_id': '100', 'user': user_data(2, 'renamed'),
+                                 'status': 'idle', 'activities': []})
+    del member
+    evict(guild, 2)
+
+    member = guild.get_member(2)
+    assert member.nick == 'nick'
+    assert member.name == 'renamed'
+    assert member.status is Status.idle
+    assert [role.id for role in member.roles] == [100, 10]
+
+
+def test_compact_store_keeps_own_presence(monkeypatch):
+    state, guild = compact_guild(monkeypatch, [1, 2, 3, 4])
+    guild.me.status = Status.dnd
+    evict(guild, 1)
+    assert guild.me.status is Status.dnd
+
+
+def test_compact_store_member_update(monkeypatch):
+    state, guild = compact_guild(monkeypatch, [1, 2, 3])
+    state.parse_guild_member_update({'guild_id': '100', 'user': user_data(3), 'nick': 'three', 'roles': ['11']})
+    evict(guild, 3)
+
+    member = guild.get_member(3)
+    assert member.nick == 'three'
+    assert [role.id for role in member.roles] == [100, 11]
+    assert guild.get_member_named('three') is member
+
+
+def test_compact_store_iteration_does_not_promote(monkeypatch):
+    state, guild = compact_guild(monkeypatch, [1, 2, 3, 4, 5, 6])
+    store = guild._members
+    assert all(isinstance(value, (int, str, bool, tuple, type(None))) or value is _Presence.EMPTY
+               for record in store._records.values() for value in record)
+
+    live = guild.get_member(5)
+    guild.get_member(6)
+    packed = []
+    original = _CompactMemberStore._pack
+    monkeypatch.setattr(_CompactMemberStore, '_pack', lambda self, member: packed.append(member) or original(self, member))
+
+    members = guild.members
+    assert len(members) == 6 > store.max_live
+    assert list(store._live) == [5, 6]
+    assert packed == []
+
+    # live members are shared, the others are detached snapshots
+    assert members[4] is live
+    members[4].nick = 'kept'
+    members[0].nick = 'lost'
+    assert guild.get_member(5).nick == 'kept'
+    assert guild.get_member(1).nick is None
+
+
+def test_compact_store_recreates_dropped_users(monkeypatch):
+    state, guild = compact_guild(monkeypatch, [1, 2, 3])
+    evict(guild, 2)
+    # the store does not keep users alive on its own
+    state._users._referenced.pop(2)
+
+    member = guild.get_member(2)
+    assert member.name == 'user2'
+    assert state.get_user(2) is member._user
+
+
+def test_member_named_with_index():
+    state = make_state()
+    guild = make_guild(state, 100, [1, 2, 3])
+    state.parse_guild_member_update({'guild_id': '100', 'user': user_data(3), 'nick': 'three', 'roles': []})
+
+    assert guild.get_member_named('user2').id == 2
+    assert guild.get_member_named('user2#0001').id == 2
+    assert guild.get_member_named('three').id == 3
+    assert guild.get_member_named('user2#0002') is None
+    assert guild.get_member_named('nobody') is None
+
+
+def test_member_named_follows_every_rename():
+    state = make_state()
+    guild = make_guild(state, 100, [1, 2, 3, 4, 5])
+    other = make_guild(state, 200, [2, 3])
+
+    def renamed(user_id, name):
+        return dict(user_data(user_id), username=name)
+
+    state.parse_presence_update({'guild_id': '100', 'user': renamed(2, 'presence'), 'status': 'online',
+                                 'activities': []})
+    state.parse_guild_member_update({'guild_id': '100', 'user': renamed(3, 'member'), 'nick': 'nick',
+                                     'roles': []})
+    state.parse_guild_members_chunk({'guild_id': '100', 'members': [
+        {'user': renamed(4, 'chunk'), 'roles': [], 'joined_at': None},
+    ]})
+    state.parse_user_update(renamed(1, 'me'))
+
+    for old, new, member_id in (('user2', 'presence', 2), ('user3', 'member', 3), ('user4', 'chunk', 4),
+                                ('bot', 'me', 1)):
+        assert guild.get_member_named(old) is None
+        assert guild.get_member_named(new).id == member_id
+        assert guild.get_member_named(new + '#0001').id == member_id
+    assert guild.get_member_named('nick').id == 3
+
+    # users are shared, so the other guild follows along
+    assert other.get_member_named('presence').id == 2
+    assert other.get_member_named('member').id == 3
+    assert other.get_member_named('user3') is None
+    assert [user.id for user in state._users.named('chunk')] == [4]
+    assert state._users.named('user4') == []
+
+    # a miss is final, the members are never scanned
+    guild._members = {}
+    assert guild.get_member_named('user5') is None
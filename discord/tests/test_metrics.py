@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+from ..http import HTTPClient, Route
+from ..metrics import LatencyHistogram, RequestMetrics, RequestTrace
+from ..ratelimits import MemoryRateLimitStore
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value in [0.001] * 90 + [0.2] * 9 + [3.0]:
+        histogram.add(value)
+
+    assert histogram.count == 100
+    assert histogram.max == 3.0
+    assert histogram.percentile(50) == 0.005
+    assert histogram.percentile(95) == 0.25
+    assert histogram.percentile(100) == 3.0
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def test_record_aggregates_per_route():
+    metrics = RequestMetrics()
+    for status, attempts in ((200, 1), (200, 3), (404, 1)):
+        trace = RequestTrace('GET', '/users/{user_id}')
+        trace.status = status
+        trace.attempts = attempts
+        trace.size = 10
+        metrics.record(trace)
+
+    route = metrics.routes['GET', '/users/{user_id}']
+    assert route.requests == 3
+    assert route.retries == 2
+    assert route.statuses == {200: 2, 404: 1}
+    assert route.bytes_received == 30
+    assert route.latency.count == 3
+    # none of them got as far as a rate limit bucket
+    assert metrics.buckets == {}
+
+
+def test_record_aggregates_per_bucket():
+    metrics = RequestMetrics()
+    for path, bucket in (('/a', 'shared'), ('/b', 'shared'), ('/a', 'other')):
+        trace = RequestTrace('GET', path)
+        trace.bucket = bucket
+        trace.status = 200
+        metrics.record(trace)
+
+    assert metrics.buckets['shared'].requests == 2
+    assert metrics.buckets['other'].requests == 1
+    assert metrics.routes['GET', '/a'].requests == 2
+
+    metrics.reset()
+    assert metrics.routes == metrics.buckets == {}
+
+
+def test_buckets_are_bounded():
+    metrics = RequestMetrics(max_buckets=2)
+    for bucket in ('a:1:None', 'b:1:None', 'a:1:None', 'a:2:None', 'a:1:None'):
+        trace = RequestTrace('GET', '/channels/{channel_id}/messages')
+        trace.bucket = bucket
+        metrics.record(trace)
+
+    # the least recently used bucket is discarded
+    assert list(metrics.buckets) == ['a:2:None', 'a:1:None']
+    assert metrics.buckets['a:1:None'].requests == 3
+    assert metrics.routes['GET', '/channels/{channel_id}/messages'].requests == 5
+
+
+class FakeResponse:
+    def __init__(self, status, data, headers):
+        self.status = status
+        self.headers = dict(headers, **{'content-type': 'application/json'})
+        self._body = json.dumps(data)
+
+    async def text(self, encoding):
+        return self._body
+
+    async def read(self):
+        return self._body.encode('utf-8')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = iter(responses)
+
+    def request(self, method, url, **kwargs):
+        return next(self.responses)
+
+
+def test_trace_splits_rate_limit_waits():
+    async def run():
+        metrics = RequestMetrics()
+        store = MemoryRateLimitStore(global_rate_limit=1000)
+        http = HTTPClient(loop=asyncio.get_event_loop(), rate_limit_store=store, request_metrics=metrics)
+        http._HTTPClient__session = FakeSession([
+            FakeResponse(429, {'retry_after': 50, 'global': False}, {'Via': '1.1 google'}),
+            FakeResponse(200, {}, {}),
+        ])
+        await http.request(Route('GET', '/gateway'))
+
+        bucket = next(iter(metrics.buckets.values()))
+        assert bucket.requests == bucket.rate_limited == bucket.retries == 1
+        assert bucket.retry_after_wait.count == 1
+        assert 0.04 <= bucket.retry_after_wait.total < 0.5
+        assert bucket.bucket_wait.total < 0.04
+        assert bucket.global_wait.count == 1
+
+    asyncio.run(run())
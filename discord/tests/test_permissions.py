@@ -0,0 +1,83 @@
+import random
+
+from ..guild import Guild
+from ..permissions import Permissions
+from ..state import ConnectionState
+
+
+class FakeHTTP:
+    _response_cache = None
+
+
+def random_permissions(rng):
+    # keep administrator rare so overwrites are actually exercised
+    value = rng.getrandbits(31) & ~Permissions(administrator=True).value
+    if rng.random() < 0.05:
+        value |= Permissions(administrator=True).value
+    return value
+
+
+def make_guild(rng, permission_cache_size=None):
+    state = ConnectionState(dispatch=lambda *args: None, handlers={}, hooks={}, syncer=None,
+                            http=FakeHTTP(), loop=None, permission_cache_size=permission_cache_size)
+    role_ids = list(range(10, 20))
+    member_ids = list(range(100, 160))
+
+    def overwrites():
+        targets = [(100, 'role')] + [(role_id, 'role') for role_id in role_ids] + [(m, 'member') for m in member_ids]
+        return [{'id': str(target), 'type': kind, 'allow': rng.getrandbits(31), 'deny': rng.getrandbits(31)}
+                for target, kind in rng.sample(targets, 8)]
+
+    data = {
+        'id': '100',
+        'name': 'guild',
+        'owner_id': '100',
+        'member_count': len(member_ids),
+        'roles': [{'id': str(role_id), 'name': 'role', 'permissions': random_permissions(rng), 'position': i,
+                   'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}
+                  for i, role_id in enumerate([100] + role_ids)],
+        'members': [{'user': {'id': str(i), 'username': 'user', 'discriminator': '0001', 'avatar': None},
+                     'roles': [str(r) for r in rng.sample(role_ids, rng.randint(0, 4))], 'joined_at': None}
+                    for i in member_ids],
+        'channels': [{'id': str(1000 + i), 'type': kind, 'name': 'channel', 'position': i,
+                      'permission_overwrites': overwrites()}
+                     for i, kind in enumerate([0, 2, 0, 2, 4])],
+    }
+    guild = Guild(data=data, state=state)
+    guild.owner_id = member_ids[0]
+    return guild
+
+
+def test_bulk_permissions_match_permissions_for():
+    rng = random.Random(0)
+    for _ in range(20):
+        guild = make_guild(rng)
+        for channel in guild.channels:
+            bulk = channel.bulk_permissions_for()
+            assert len(bulk) == len(guild.members)
+            for member, permissions in bulk.items():
+                assert permissions == channel.permissions_for(member), (channel, member)
+
+
+def test_members_with_permissions_match_permissions_for():
+    rng = random.Random(1)
+    guild = make_guild(rng, permission_cache_size=1000)
+    for channel in guild.text_channels:
+        expected = [m for m in guild.members if channel.permissions_for(m).read_messages]
+        assert channel.members_with_permissions(read_messages=True) == expected
+        assert channel.members == expected
+
+
+def test_resolver_does_not_walk_roles_per_member():
+    from ..abc import _PermissionResolver
+
+    rng = random.Random(2)
+    guild = make_guild(rng)
+    channel = guild.text_channels[0]
+    resolver = _PermissionResolver(channel)
+    expected = {member: channel.permissions_for(member) for member in guild.members}
+
+    # role values are precomputed, so the Role objects are no longer needed
+    guild._roles = {}
+    for member, permissions in expected.items():
+        assert resolver.resolve(member) == permissions
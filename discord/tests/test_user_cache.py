@@ -0,0 +1,84 @@
+import pytest
+
+from ..state import _UserCache
+
+
+class FakeUser:
+    def __init__(self, id, name=None):
+        self.id = id
+        self.name = name or 'user%d' % id
+
+
+@pytest.fixture
+def cache():
+    return _UserCache(2)
+
+
+def test_lru_eviction(cache: _UserCache):
+    users = [FakeUser(i) for i in range(3)]
+    for user in users:
+        cache[user.id] = user
+
+    assert len(cache) == 2
+    assert 0 not in cache
+    assert cache.get(1) is users[1]
+
+
+def test_evicted_user_is_reused_while_alive(cache: _UserCache):
+    user = FakeUser(0)
+    cache[0] = user
+    cache[1] = FakeUser(1)
+    cache[2] = FakeUser(2)
+
+    assert 0 not in cache
+    assert cache.get(0) is user
+    assert 0 in cache
+
+
+def test_referenced_users_are_not_evicted(cache: _UserCache):
+    user = FakeUser(0)
+    cache[0] = user
+    cache.reference(0)
+    for i in range(1, 5):
+        cache[i] = FakeUser(i)
+
+    assert cache.get(0) is user
+
+    cache.reference(0)
+    cache.release(0)
+    assert 0 in cache._referenced
+
+    cache.release(0)
+    assert 0 not in cache._referenced
+    assert cache.get(0) is user
+
+
+def test_hit_miss_counters(cache: _UserCache):
+    cache[0] = FakeUser(0)
+    cache.get(0)
+    cache.get(1)
+
+    info = cache.info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.maxsize == 2
+    assert info.currsize == 1
+
+
+def test_name_index(cache: _UserCache):
+    first = FakeUser(0, 'Jake')
+    second = FakeUser(1, 'Jake')
+    cache[0] = first
+    cache[1] = second
+
+    assert cache.named('Jake') == [first, second]
+
+    first.name = 'Jane'
+    cache.rename(0, 'Jake', 'Jane')
+    assert cache.named('Jake') == [second]
+    assert cache.named('Jane') == [first]
+
+    # evicted users are no longer found
+    cache[2] = FakeUser(2)
+    assert cache.named('Jane') == []
+    assert not cache.named('missing')
@@ -493,7 +493,9 @@ class ClientUser(BaseUser):
             except KeyError:
                 pass
 
+        before = self.name
         self._update(data)
+        self._state._rename_user(self.id, before, self.name)
 
     async def create_group(self, *recipients):
         r"""|coro|
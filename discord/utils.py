@@ -45,6 +45,8 @@ from .object import Object
 DISCORD_EPOCH = 1420070400000
 MAX_ASYNCIO_SECONDS = 3456000
 
+CacheInfo = collections.namedtuple('CacheInfo', 'hits misses maxsize currsize')
+
 class cached_property:
     def __init__(self, function):
         self.function = function
@@ -165,16 +165,38 @@ class AsyncWebhookAdapter(WebhookAdapter):
 
         You are responsible for cleaning up the client session.
 
+    .. versionchanged:: 1.5
+        A :class:`Client` can be passed to share its session.
+
     Parameters
     -----------
-    session: :class:`aiohttp.ClientSession`
-        The session to use to send requests.
+    session: Union[:class:`aiohttp.ClientSession`, :class:`Client`]
+        The session to use to send requests. If a :class:`Client` is passed then
+        the session of the client is used, which is available once it has logged in.
     """
 
     def __init__(self, session):
-        self.session = session
+        if isinstance(session, aiohttp.ClientSession):
+            self._http = None
+            self._session = session
+        else:
+            # a client (or its HTTP client) whose session is shared, it is
+            # looked up on every request since it is recreated on reconnects
+            self._http = getattr(session, 'http', session)
+            self._session = None
         self.loop = asyncio.get_event_loop()
 
+    @property
+    def session(self):
+        if self._http is not None:
+            return self._http._session
+        return self._session
+
+    @session.setter
+    def session(self, value):
+        self._http = None
+        self._session = value
+
     async def request(self, verb, url, payload=None, multipart=None, *, files=None, reason=None):
         headers = {}
         data = None
@@ -563,13 +585,11 @@ class Webhook(Hashable):
             }
         }
 
-        session = channel._state.http._HTTPClient__session
-        return cls(feed, adapter=AsyncWebhookAdapter(session=session))
+        return cls(feed, adapter=AsyncWebhookAdapter(session=channel._state.http))
 
     @classmethod
     def from_state(cls, data, state):
-        session = state.http._HTTPClient__session
-        return cls(data, adapter=AsyncWebhookAdapter(session=session), state=state)
+        return cls(data, adapter=AsyncWebhookAdapter(session=state.http), state=state)
 
     @property
     def guild(self):